@@ -1,23 +1,75 @@
 # ✅ UPDATED app.py (for Android WebView-compatible Read Aloud)
 
 import os
+import json
+import time
 import logging
-from flask import Flask, render_template, request, jsonify
+from itertools import chain
+from io import BytesIO
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from werkzeug.middleware.proxy_fix import ProxyFix
+from flask_sock import Sock
 
-# Utility imports
-from utils.braille_converter import text_to_braille, braille_to_text
-from utils.hindi_braille_converter import hindi_text_to_braille, get_detailed_hindi_braille_mapping
-from utils.image_processor import extract_text_from_image
-from utils.speech_processor import text_to_speech
-from utils.braille_image_processor import detect_braille_from_image
+# Utility imports; the image, OCR and batch modules pull in OpenCV, NumPy
+# and Tesseract, so routes import them on first use to keep cold starts fast
+from utils.conversion import convert_text, MAPPING_FORMATS, BRAILLE_GRADES
+from utils.document_stream import stream_braille
+from utils.brf_formatter import export_braille, EXPORT_FORMATS, BRF_CELLS_PER_LINE, BRF_LINES_PER_PAGE
+from utils.braille_cells import pack_cells, pack_cells_base64, CELL_ENCODING, UnpackableError
+from utils.http_compression import compress_response
+from utils.table_export import TABLES_VERSION, RENDERERS, read_tables
+from utils.speech_processor import text_to_speech, stream_speech
+from utils.job_queue import JobQueue, QueueFullError
+from utils.image_jobs import ocr_task, braille_image_task, ocr_cache_key, braille_image_cache_key, cache_result
+from utils.result_cache import result_cache
+from utils import metrics
 
 # Logging
 logging.basicConfig(level=logging.DEBUG)
 
+class TimedJSONProvider(DefaultJSONProvider):
+    # Records how long jsonify() takes to encode response bodies
+    def response(self, *args, **kwargs):
+        with metrics.timer("json_encode_seconds"):
+            return super().response(*args, **kwargs)
+
 app = Flask(__name__)
+app.json = TimedJSONProvider(app)
 app.secret_key = os.environ.get("SESSION_SECRET", "default_secret_key_for_development")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
+sock = Sock(app)
+
+# Background jobs for OCR and Braille image recognition
+job_queue = JobQueue()
+
+# Per-request latency, and the optional Server-Timing header
+@app.before_request
+def start_request_timer():
+    g.start_time = time.perf_counter()
+    metrics.begin_request()
+
+@app.after_request
+def record_request_timing(response):
+    server_timing = metrics.end_request()
+    if metrics.SERVER_TIMING and server_timing:
+        response.headers['Server-Timing'] = server_timing
+    endpoint = request.endpoint or 'unknown'
+    metrics.observe("http_request_seconds", time.perf_counter() - g.start_time,
+                    endpoint=endpoint, method=request.method)
+    metrics.increment("http_requests_total", endpoint=endpoint, status=response.status_code)
+    return response
+
+# gzip/brotli from Accept-Encoding; registered last so it runs first and
+# its time is part of the request timing above
+@app.after_request
+def compress(response):
+    return compress_response(response, request.accept_encodings)
+
+# Prometheus metrics, summed over all workers when METRICS_DIR is set
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 # Pages
 @app.route('/')
@@ -26,12 +78,28 @@ def index():
 
 @app.route('/text-to-braille')
 def text_to_braille_page():
-    return render_template('text_to_braille.html')
+    return render_template('text_to_braille.html', tables_version=TABLES_VERSION)
+
+# Translation tables for client-side conversion; the version is a hash
+# of the tables, so each URL's content never changes
+@app.route('/assets/braille_tables.<version>.<ext>')
+def braille_tables(version, ext):
+    if version != TABLES_VERSION or ext not in RENDERERS:
+        return jsonify({'error': 'Unknown table version', 'version': TABLES_VERSION}), 404
+    mimetype = 'application/javascript' if ext == 'js' else 'application/json'
+    response = Response(read_tables(ext), mimetype=mimetype)
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.set_etag(TABLES_VERSION)
+    return response.make_conditional(request)
 
 @app.route('/image-to-braille')
 def image_to_braille_page():
     return render_template('image_to_braille.html')
 
+@app.route('/braille-image-to-text')
+def braille_image_to_text_page():
+    return render_template('braille_image_to_text.html')
+
 # ✅ Image to Text & Braille
 @app.route('/api/image-to-text', methods=['POST'])
 def process_image():
@@ -43,65 +111,323 @@ def process_image():
         return jsonify({'error': 'No image selected'}), 400
 
     language = request.form.get('language', 'english')
+    mapping = request.form.get('mapping', 'legacy')
+    if mapping not in MAPPING_FORMATS:
+        return jsonify({'error': f'Unknown mapping format: {mapping}'}), 400
 
     try:
-        extracted_text = extract_text_from_image(image_file, lang='hin' if language == 'hindi' else 'eng')
+        # Re-uploads of the same image are served from the result cache
+        image_bytes = image_file.read()
+        cache_key = ocr_cache_key(image_bytes, language, mapping)
+        cached = result_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
+
+        from utils.image_processor import extract_text_from_image
+        extracted_text = extract_text_from_image(BytesIO(image_bytes), lang='hin' if language == 'hindi' else 'eng')
         if not extracted_text:
             return jsonify({'error': 'No text detected in the image'}), 400
 
-        if language == 'hindi':
-            braille = hindi_text_to_braille(extracted_text)
-            detailed_mapping = get_detailed_hindi_braille_mapping(extracted_text)
-        else:
-            braille = text_to_braille(extracted_text)
-            detailed_mapping = []
-            for i, char in enumerate(extracted_text):
-                detailed_mapping.append({
-                    'original': 'space' if char == ' ' else char,
-                    'braille': '⠀' if char == ' ' else braille[i] if i < len(braille) else '⠿'
-                })
+        braille, detailed_mapping = convert_text(extracted_text, language, mapping)
 
-        return jsonify({
+        result = {
             'text': extracted_text,
             'braille': braille,
             'detailed_mapping': detailed_mapping,
             'language': language
-        })
+        }
+        result_cache.set(cache_key, result)
+        return jsonify(result)
     except Exception as e:
         logging.error(f"Error processing image: {str(e)}")
         return jsonify({'error': f'Error processing image: {str(e)}'}), 500
 
+# ✅ Batch Image / PDF to Text & Braille
+@app.route('/api/batch/image-to-text', methods=['POST'])
+def process_image_batch():
+    images = [f for f in request.files.getlist('images') if f.filename != '']
+    pdf_file = request.files.get('pdf')
+    if not images and (pdf_file is None or pdf_file.filename == ''):
+        return jsonify({'error': 'No images or PDF provided'}), 400
+
+    language = request.form.get('language', 'english')
+    mapping = request.form.get('mapping', 'legacy')
+    if mapping not in MAPPING_FORMATS:
+        return jsonify({'error': f'Unknown mapping format: {mapping}'}), 400
+
+    from utils.batch_ocr import (
+        ocr_batch, check_batch_size, count_pdf_pages, iter_pdf_pages, BatchTooLargeError, PdfError
+    )
+    try:
+        # Counted up front so an oversized batch is rejected before any OCR
+        if pdf_file is not None and pdf_file.filename != '':
+            pdf_bytes = pdf_file.read()
+            check_batch_size(count_pdf_pages(pdf_bytes))
+            pages = iter_pdf_pages(pdf_bytes)
+        else:
+            check_batch_size(len(images))
+            pages = (image_file.read() for image_file in images)
+
+        batch = ocr_batch(pages, language, mapping)
+        batch['language'] = language
+        return jsonify(batch)
+    except BatchTooLargeError as e:
+        return jsonify({'error': str(e)}), 413
+    except PdfError as e:
+        return jsonify({'error': str(e)}), 400
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+    except Exception as e:
+        logging.error(f"Error processing image batch: {str(e)}")
+        return jsonify({'error': f'Error processing image batch: {str(e)}'}), 500
+
+# ✅ Live camera Braille recognition: the client sends encoded frames as
+# binary messages, one at a time after each reply, and gets the current
+# transcript back as JSON. Text messages are commands ({"type": "reset"}).
+# Each socket holds a server thread, so only LIVE_MAX_SESSIONS are served
+# at once and idle ones are closed (utils/live_recognition.py).
+@sock.route('/ws/braille-live')
+def braille_live(ws):
+    from utils.live_recognition import open_session, close_session, LIVE_IDLE_TIMEOUT
+    session = open_session()
+    if session is None:
+        # 1013: try again later
+        ws.close(reason=1013, message='Too many live sessions, please retry shortly')
+        return
+    try:
+        serve_live_session(ws, session, LIVE_IDLE_TIMEOUT)
+    finally:
+        close_session(session)
+
+def serve_live_session(ws, session, idle_timeout):
+    while True:
+        message = ws.receive(timeout=idle_timeout)
+        if message is None:
+            ws.close(reason=1000, message='Closed after no frames were sent')
+            return
+        if isinstance(message, str):
+            try:
+                command = json.loads(message).get('type')
+            except (ValueError, AttributeError):
+                command = None
+            if command == 'reset':
+                session.reset()
+                ws.send(json.dumps({'reset': True}))
+            else:
+                ws.send(json.dumps({'error': 'Unknown command'}))
+            continue
+
+        try:
+            result = session.process_frame(message)
+        except ValueError as e:
+            result = {'error': str(e)}
+        except Exception as e:
+            logging.error(f"Error in live Braille recognition: {str(e)}")
+            result = {'error': 'Could not process frame'}
+        ws.send(json.dumps(result, ensure_ascii=False))
+
+# ✅ Background jobs: submit returns a job id, poll /api/jobs/<job_id>
+def submit_image_job(field, task, cache_key, *args):
+    if field not in request.files:
+        return jsonify({'error': 'No image provided'}), 400
+
+    image_file = request.files[field]
+    if image_file.filename == '':
+        return jsonify({'error': 'No image selected'}), 400
+
+    image_bytes = image_file.read()
+
+    # A cached result skips the worker pool; the job is done at once
+    key = cache_key(image_bytes, *args)
+    cached = result_cache.get(key)
+    if cached is not None:
+        job_id = job_queue.add_done(cached)
+        return jsonify({
+            'job_id': job_id,
+            'status': 'done',
+            'status_url': f'/api/jobs/{job_id}'
+        }), 202
+
+    try:
+        # Cached here when done, so the next upload of the image hits above
+        job_id = job_queue.submit(
+            task, image_bytes, image_file.filename, *args,
+            on_result=lambda result: cache_result(key, result)
+        )
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
+
+    return jsonify({
+        'job_id': job_id,
+        'status': 'queued',
+        'status_url': f'/api/jobs/{job_id}'
+    }), 202
+
+@app.route('/api/jobs/image-to-text', methods=['POST'])
+def submit_image_to_text_job():
+    language = request.form.get('language', 'english')
+    mapping = request.form.get('mapping', 'legacy')
+    if mapping not in MAPPING_FORMATS:
+        return jsonify({'error': f'Unknown mapping format: {mapping}'}), 400
+    return submit_image_job('image', ocr_task, ocr_cache_key, language, mapping)
+
+@app.route('/api/jobs/braille-image-to-text', methods=['POST'])
+def submit_braille_image_job():
+    return submit_image_job('braille_image', braille_image_task, braille_image_cache_key)
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(status)
+
+# OCR engine pool health
+@app.route('/api/health/ocr', methods=['GET'])
+def ocr_health():
+    from utils.ocr_engine import engine_status
+    return jsonify(engine_status())
+
+# Result cache hit ratios for this worker process
+@app.route('/api/health/cache', methods=['GET'])
+def cache_health():
+    return jsonify(result_cache.stats())
+
+# Braille output for the conversion APIs: Unicode text, packed cells as
+# base64 inside the JSON, or the packed cells as the whole body
+OUTPUT_FORMATS = ('unicode', 'packed', 'binary')
+
+def wants_binary():
+    best = request.accept_mimetypes.best_match(['application/json', 'application/octet-stream'])
+    return best == 'application/octet-stream'
+
+def parse_grade(value):
+    # 1 or 2, as a number or a string; None if it is neither
+    try:
+        grade = int(value)
+    except (TypeError, ValueError):
+        return None
+    return grade if grade in BRAILLE_GRADES else None
+
+def packed_cells_response(chunks):
+    # One byte per cell, see utils/braille_cells.py
+    return Response(chunks, mimetype='application/octet-stream',
+                    headers={'X-Braille-Cell-Encoding': CELL_ENCODING})
+
 # ✅ Text to Braille API
 @app.route('/api/text-to-braille', methods=['POST'])
 def convert_text_to_braille():
     data = request.get_json()
     text = data.get('text', '')
     language = data.get('language', 'english')
+    mapping = data.get('mapping', 'legacy')
+    output = data.get('output', 'binary' if wants_binary() else 'unicode')
+    grade = parse_grade(data.get('grade', 1))
 
     if not text:
         return jsonify({'error': 'No text provided'}), 400
+    if mapping not in MAPPING_FORMATS:
+        return jsonify({'error': f'Unknown mapping format: {mapping}'}), 400
+    if output not in OUTPUT_FORMATS:
+        return jsonify({'error': f'Unknown output format: {output}'}), 400
+    if grade is None or (grade == 2 and language == 'hindi'):
+        return jsonify({'error': 'Grade must be 1, or 2 for English'}), 400
 
     try:
-        if language == 'hindi':
-            braille = hindi_text_to_braille(text)
-            detailed_mapping = get_detailed_hindi_braille_mapping(text)
-        else:
-            braille = text_to_braille(text)
-            detailed_mapping = []
-            for i, char in enumerate(text):
-                detailed_mapping.append({
-                    'original': 'space' if char == ' ' else char,
-                    'braille': '⠀' if char == ' ' else braille[i] if i < len(braille) else '⠿'
-                })
+        if output == 'binary':
+            # The body is just the cells, so there is no mapping to build
+            braille, _ = convert_text(text, language, 'none', grade)
+            return packed_cells_response(pack_cells(braille))
+
+        braille, detailed_mapping = convert_text(text, language, mapping, grade)
+        if output == 'packed':
+            # Offsets and lengths in the mapping count cells, as in the Unicode string
+            return jsonify({
+                'cells': pack_cells_base64(braille),
+                'cell_encoding': CELL_ENCODING,
+                'detailed_mapping': detailed_mapping
+            })
 
         return jsonify({
             'braille': braille,
             'detailed_mapping': detailed_mapping
         })
+    except UnpackableError as e:
+        # Characters left unconverted have no cell; the Unicode output keeps them
+        return jsonify({'error': f'{str(e)}; use output=unicode', 'unpackable': e.count}), 400
     except Exception as e:
         logging.error(f"Error converting text to braille: {str(e)}")
         return jsonify({'error': f'Error converting text to braille: {str(e)}'}), 500
 
+# ✅ Streaming Text to Braille for large documents
+@app.route('/api/text-to-braille/stream', methods=['POST'])
+def stream_text_to_braille():
+    # A .txt upload, or the raw request body as UTF-8 text
+    if 'file' in request.files:
+        source = request.files['file'].stream
+        options = request.form
+    else:
+        source = request.stream
+        options = request.args
+    language = options.get('language', 'english')
+    output = options.get('output', 'binary' if wants_binary() else 'unicode')
+    if output not in ('unicode', 'binary'):
+        return jsonify({'error': f'Unknown output format: {output}'}), 400
+
+    # No Content-Length, so the response is sent chunked; the request
+    # context stays open so the upload can be read while streaming
+    if output == 'binary':
+        cells = map(pack_cells, stream_braille(source, language))
+        # Pack the first segment now, so unpackable text at the start gets a
+        # 400; later on the stream is cut off instead of being sent short
+        try:
+            first = next(cells, b'')
+        except UnpackableError as e:
+            return jsonify({'error': f'{str(e)}; use output=unicode', 'unpackable': e.count}), 400
+        return packed_cells_response(stream_with_context(chain([first], cells)))
+    return Response(
+        stream_with_context(stream_braille(source, language)),
+        mimetype='text/plain'
+    )
+
+# ✅ Embosser export: word-wrapped, paginated BRF or Unicode Braille
+@app.route('/api/text-to-braille/export', methods=['POST'])
+def export_text_to_braille():
+    # Same input as the stream endpoint; options as form fields or query args
+    if 'file' in request.files:
+        source = request.files['file'].stream
+        options = request.form
+    else:
+        source = request.stream
+        options = request.args
+
+    language = options.get('language', 'english')
+    fmt = options.get('format', 'brf')
+    try:
+        width = int(options.get('cells', BRF_CELLS_PER_LINE))
+        lines_per_page = int(options.get('lines', BRF_LINES_PER_PAGE))
+        page_numbers = options.get('page_numbers', '1').lower() in ('1', 'true', 'yes')
+        grade = parse_grade(options.get('grade', 1))
+        if grade is None:
+            raise ValueError("Grade must be 1 or 2")
+        # Validate the options before the response starts streaming
+        pages = export_braille(source, language, fmt, width, lines_per_page, page_numbers, grade=grade)
+        first = next(pages, '')
+    except ValueError as e:
+        return jsonify({'error': str(e), 'formats': list(EXPORT_FORMATS)}), 400
+
+    def generate():
+        yield first
+        yield from pages
+
+    filename = 'braille.brf' if fmt == 'brf' else 'braille.txt'
+    charset = 'us-ascii' if fmt == 'brf' else 'utf-8'
+    return Response(
+        stream_with_context(generate()),
+        content_type=f'text/plain; charset={charset}',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
 # ✅ FIXED: Text to Speech that works in Android WebView
 @app.route('/api/text-to-speech', methods=['POST'])
 def convert_text_to_speech():
@@ -119,6 +445,32 @@ def convert_text_to_speech():
         logging.error(f"Error converting text to speech: {str(e)}")
         return jsonify({'error': f'Error converting text to speech: {str(e)}'}), 500
 
+# ✅ Streaming Text to Speech: audio starts after the first sentence
+@app.route('/api/text-to-speech/stream', methods=['POST'])
+def stream_text_to_speech():
+    # POST, so long texts are not limited by the URL length
+    data = request.get_json(silent=True) or request.form
+    text = data.get('text', '')
+    language = data.get('language', 'english')
+
+    if not text:
+        return jsonify({'error': 'No text provided'}), 400
+
+    # Wait for the first sentence, so a total failure still gets an error status
+    audio = stream_speech(text, language)
+    try:
+        first = next(audio)
+    except Exception as e:
+        logging.error(f"Error streaming text to speech: {str(e)}")
+        return jsonify({'error': f'Error converting text to speech: {str(e)}'}), 500
+
+    # No Content-Length, so the response is sent chunked
+    return Response(
+        chain([first], audio),
+        mimetype='audio/mpeg',
+        headers={'Cache-Control': 'no-store'}
+    )
+
 # Run the app
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,50 @@
+"""
+Compare braille_to_text throughput with the original decoder loop. The
+round-trip property is tested in tests/test_braille_roundtrip.py.
+
+Usage:
+    python -m benchmarks.bench_braille_decoder
+"""
+
+import time
+
+from utils.braille_converter import BRAILLE_TO_CHAR, braille_to_text, text_to_braille
+
+SIZES = [("1 KB", 1_000), ("100 KB", 100_000), ("1 MB", 1_000_000)]
+# The legacy decoder is quadratic; skip it above this size
+LEGACY_LIMIT = 100_000
+SAMPLE = "On 12 May, 3 of us (aged 40-45) met at home@city. Was it fun? Yes! It's 2x better; really: 10a. "
+
+
+def legacy_braille_to_text(braille):
+    result = ""
+    i = 0
+    while i < len(braille):
+        if braille[i:i + 2] == '⠼' and i + 1 < len(braille):
+            i += 1
+            if i < len(braille) and braille[i] in BRAILLE_TO_CHAR:
+                result += BRAILLE_TO_CHAR.get(braille[i], braille[i])
+        else:
+            result += BRAILLE_TO_CHAR.get(braille[i], braille[i])
+        i += 1
+    return result
+
+
+if __name__ == "__main__":
+    print(f"{'size':>7} {'legacy (MB/s)':>14} {'decoder (MB/s)':>15}  legacy correct  decoder correct")
+    for label, size in SIZES:
+        text = (SAMPLE * (size // len(SAMPLE) + 1))[:size].rstrip().lower()
+        braille = text_to_braille(text)
+        megabytes = len(braille.encode()) / 1e6
+        if size <= LEGACY_LIMIT:
+            start = time.perf_counter()
+            old = legacy_braille_to_text(braille)
+            legacy_speed = f"{megabytes / (time.perf_counter() - start):.1f}"
+            legacy_correct = str(old == text)
+        else:
+            legacy_speed = legacy_correct = "skipped"
+        start = time.perf_counter()
+        new = braille_to_text(braille)
+        new_time = time.perf_counter() - start
+        print(f"{label:>7} {legacy_speed:>14} {megabytes / new_time:>15.1f}  "
+              f"{legacy_correct:>14}  {str(new == text):>15}")
@@ -0,0 +1,122 @@
+"""
+Benchmark the vectorized dot-to-cell decoder on synthetic Braille pages
+against the original pairwise-distance grouping.
+
+Usage:
+    python -m benchmarks.bench_braille_grid
+"""
+
+import time
+
+import numpy as np
+
+from utils.braille_converter import text_to_braille
+from utils.braille_image_processor import dots_to_braille
+
+DOT_COUNTS = [100, 1_000, 3_000, 10_000]
+# The legacy decoder is quadratic; skip it above this many dots
+LEGACY_LIMIT = 3_000
+
+SAMPLE = "braille pages are read by touch; every cell has six dot positions. "
+CELLS_PER_LINE = 40
+DOT_SPACING = 10.0
+CELL_PITCH = 25.0
+LINE_PITCH = 40.0
+
+
+def synthetic_page(dot_count, seed=0):
+    """Lay out Braille cells on a page until ``dot_count`` dots are placed."""
+    rng = np.random.default_rng(seed)
+    cells = []
+    while sum(bin(ord(c) - 0x2800).count("1") for c in cells) < dot_count:
+        cells.extend(text_to_braille(SAMPLE))
+    dots = []
+    placed = []
+    for index, cell in enumerate(cells):
+        if len(dots) >= dot_count:
+            break
+        line, column = divmod(index, CELLS_PER_LINE)
+        pattern = ord(cell) - 0x2800
+        placed.append(cell)
+        for bit in range(6):
+            if pattern & (1 << bit):
+                x = 20 + column * CELL_PITCH + (bit // 3) * DOT_SPACING
+                y = 20 + line * LINE_PITCH + (bit % 3) * DOT_SPACING
+                dots.append((x, y))
+    dots = np.array(dots) + rng.normal(0, 0.8, size=(len(dots), 2))
+    return [tuple(d) for d in np.rint(dots).astype(int)], placed
+
+
+def legacy_dots_to_braille(braille_dots):
+    distances = []
+    for i in range(len(braille_dots)):
+        for j in range(i + 1, len(braille_dots)):
+            distances.append(np.sqrt((braille_dots[i][0] - braille_dots[j][0]) ** 2 +
+                                     (braille_dots[i][1] - braille_dots[j][1]) ** 2))
+    distances.sort()
+    n = max(1, len(distances) // 4)
+    dot_spacing = sum(distances[:n]) / n
+    cell_width = dot_spacing * 2
+    rows = {}
+    for dot in braille_dots:
+        for row_y in list(rows.keys()):
+            if abs(dot[1] - row_y) < dot_spacing / 2:
+                rows[row_y].append(dot)
+                break
+        else:
+            rows[dot[1]] = [dot]
+    chars = []
+    for _, row_dots in sorted(rows.items()):
+        row_dots.sort()
+        cells, current = [], []
+        for dot in row_dots:
+            if not current or dot[0] - current[-1][0] < cell_width:
+                current.append(dot)
+            else:
+                cells.append(current)
+                current = [dot]
+        cells.append(current)
+        for cell in cells:
+            cell_x = min(d[0] for d in cell)
+            cell_y = min(d[1] for d in cell)
+            pattern = 0
+            for position in range(6):
+                ex = cell_x + (position // 3) * dot_spacing
+                ey = cell_y + (position % 3) * dot_spacing
+                if any(abs(d[0] - ex) < dot_spacing / 2 and abs(d[1] - ey) < dot_spacing / 2
+                       for d in cell):
+                    pattern |= 1 << position
+            chars.append(chr(0x2800 + pattern))
+        chars.append(" ")
+    return "".join(chars)
+
+
+def cell_accuracy(decoded, expected):
+    """Fraction of placed cells decoded at the right line and column."""
+    lines = decoded.split(" ")
+    matches = 0
+    for index, cell in enumerate(expected):
+        line, column = divmod(index, CELLS_PER_LINE)
+        if line < len(lines) and column < len(lines[line]) and lines[line][column] == cell:
+            matches += 1
+        elif cell == "\u2800" and line < len(lines) and column >= len(lines[line]):
+            matches += 1
+    return matches / max(len(expected), 1)
+
+
+if __name__ == "__main__":
+    print(f"{'dots':>7} {'legacy (s)':>11} {'accuracy':>9} {'vectorized (s)':>15} {'accuracy':>9}")
+    for count in DOT_COUNTS:
+        dots, expected = synthetic_page(count)
+        if count <= LEGACY_LIMIT:
+            start = time.perf_counter()
+            legacy_decoded = legacy_dots_to_braille(dots)
+            legacy = f"{time.perf_counter() - start:.4f}"
+            legacy_accuracy = f"{cell_accuracy(legacy_decoded, expected):.3f}"
+        else:
+            legacy = legacy_accuracy = "skipped"
+        start = time.perf_counter()
+        decoded = dots_to_braille(dots)
+        elapsed = time.perf_counter() - start
+        accuracy = cell_accuracy(decoded, expected)
+        print(f"{count:>7} {legacy:>11} {legacy_accuracy:>9} {elapsed:>15.4f} {accuracy:>9.3f}")
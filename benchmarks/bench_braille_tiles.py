@@ -0,0 +1,114 @@
+"""
+Benchmark tiled full-resolution dot detection against the downscaled
+path on a synthetic 600 dpi embossed page scan.
+
+Dots use the standard physical layout (2.34 mm dot spacing, 6.2 mm
+cells, 10 mm lines) and are drawn as shadows on a noisy background, like
+an embossed page under a flatbed scanner. Faint and small dots are where
+the downscaled path starts to lose them.
+
+Usage:
+    python -m benchmarks.bench_braille_tiles
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from utils import braille_image_processor as detector
+from utils.braille_converter import text_to_braille
+
+DPI = 600
+PAGE_MM = (210, 297)
+DOT_SPACING_MM = 2.34
+CELL_PITCH_MM = 6.2
+LINE_PITCH_MM = 10.0
+MARGIN_MM = 15
+WORKER_COUNTS = [1, 2, 4, 8]
+# (label, shadow contrast in gray levels, dot diameter in mm)
+SCENARIOS = [
+    ("standard dots", 45, 1.44),
+    ("faint dots", 15, 1.44),
+    ("faint small dots", 15, 0.8),
+]
+
+SAMPLE = "braille pages are read by touch; every cell has six dot positions. "
+
+
+def synthetic_scan(seed=0, contrast=45, dot_mm=1.44):
+    """Render a page of Braille; returns (BGR image, true dot centres)."""
+    rng = np.random.default_rng(seed)
+    px = DPI / 25.4
+    width, height = int(PAGE_MM[0] * px), int(PAGE_MM[1] * px)
+    cells_per_line = int((PAGE_MM[0] - 2 * MARGIN_MM) / CELL_PITCH_MM)
+    lines = int((PAGE_MM[1] - 2 * MARGIN_MM) / LINE_PITCH_MM)
+
+    text = ""
+    while len(text) < cells_per_line * lines:
+        text += text_to_braille(SAMPLE)
+    page = np.full((height, width), 200, dtype=np.float32)
+    radius = int(dot_mm * px / 2)
+    dots = []
+    for index, cell in enumerate(text[:cells_per_line * lines]):
+        line, column = divmod(index, cells_per_line)
+        pattern = ord(cell) - 0x2800
+        for bit in range(6):
+            if pattern & (1 << bit):
+                x = (MARGIN_MM + column * CELL_PITCH_MM + (bit // 3) * DOT_SPACING_MM) * px
+                y = (MARGIN_MM + line * LINE_PITCH_MM + (bit % 3) * DOT_SPACING_MM) * px
+                dots.append((x, y))
+                cv2.circle(page, (int(x), int(y)), radius, 200 - contrast, -1, cv2.LINE_AA)
+    page += rng.normal(0, 12, size=page.shape)
+    page = cv2.GaussianBlur(np.clip(page, 0, 255).astype(np.uint8), (0, 0), radius / 4)
+    return cv2.cvtColor(page, cv2.COLOR_GRAY2BGR), np.array(dots)
+
+
+def recall_precision(found, truth, tolerance):
+    """Share of true dots found, and share of found dots that are real."""
+    if not len(found):
+        return 0.0, 0.0
+    found = np.asarray(found, dtype=np.float32)
+    truth = np.asarray(truth, dtype=np.float32)
+    index = cv2.flann_Index(truth, dict(algorithm=1, trees=4))
+    nearest, sq_distances = index.knnSearch(found, 1, params=dict(checks=32))
+    close = np.sqrt(sq_distances[:, 0]) <= tolerance
+    recall = np.unique(nearest[close, 0]).size / len(truth)
+    return recall, close.mean()
+
+
+def downscaled(image):
+    scale = detector.BRAILLE_MAX_DIMENSION / max(image.shape[:2])
+    small = cv2.resize(image, None, fx=scale, fy=scale)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return [(x / scale, y / scale) for x, y in detector.find_dots(gray)]
+
+
+def tiled(image, workers):
+    if detector._tile_executor is not None:
+        detector._tile_executor.shutdown()
+    detector._tile_executor = ThreadPoolExecutor(max_workers=workers)
+    scale = max(image.shape[:2]) / detector.BRAILLE_MAX_DIMENSION
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return detector.find_dots_tiled(gray, scale)
+
+
+def report(name, func, truth, tolerance):
+    func()  # warm up
+    start = time.perf_counter()
+    found = func()
+    elapsed = time.perf_counter() - start
+    recall, precision = recall_precision(found, truth, tolerance)
+    print(f"{name:<22} {elapsed:>9.3f} {len(found):>7} {recall:>7.3f} {precision:>9.3f}")
+
+
+if __name__ == "__main__":
+    tolerance = DOT_SPACING_MM * DPI / 25.4 / 3
+    for label, contrast, dot_mm in SCENARIOS:
+        image, truth = synthetic_scan(contrast=contrast, dot_mm=dot_mm)
+        print(f"\n{label}: page {image.shape[1]}x{image.shape[0]} px, {len(truth)} dots")
+        print(f"{'mode':<22} {'time (s)':>9} {'dots':>7} {'recall':>7} {'precision':>9}")
+        report(f"downscaled to {detector.BRAILLE_MAX_DIMENSION}", lambda: downscaled(image), truth, tolerance)
+        for workers in WORKER_COUNTS:
+            report(f"tiled, {workers} threads", lambda: tiled(image, workers), truth, tolerance)
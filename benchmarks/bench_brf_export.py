@@ -0,0 +1,66 @@
+"""
+Benchmark embosser export on book-length texts: time and peak memory of
+formatting the whole text to BRF pages, at growing sizes. Time should
+grow linearly and peak memory stay flat.
+
+The text is generated while it is read, as an upload would arrive, so
+the peak resident size reflects only the formatter.
+
+Usage:
+    python -m benchmarks.bench_brf_export
+"""
+
+import resource
+import time
+
+from utils.brf_formatter import export_braille
+
+PARAGRAPH = ("It was the best of times, it was the worst of times; it was the age of "
+             "wisdom (1859), it was the age of foolishness, it was the epoch of belief.\n")
+HINDI_PARAGRAPH = "भारत एक विशाल देश है। यहाँ अनेक भाषाएँ बोली जाती हैं, क्षेत्र और ज्ञान की परंपरा पुरानी है।\n"
+SIZES_MB = [1, 4, 16]
+
+
+class RepeatingReader:
+    """Binary file-like object repeating a paragraph up to ``size`` bytes."""
+
+    def __init__(self, paragraph, size):
+        self.block = paragraph.encode("utf-8") * 64
+        self.remaining = size // len(self.block) * len(self.block)
+        self.position = 0
+
+    def read(self, size=-1):
+        size = min(size, self.remaining)
+        if size <= 0:
+            return b""
+        out = bytearray()
+        while len(out) < size:
+            take = min(size - len(out), len(self.block) - self.position)
+            out += self.block[self.position:self.position + take]
+            self.position = (self.position + take) % len(self.block)
+        self.remaining -= size
+        return bytes(out)
+
+
+def run(paragraph, megabytes, language):
+    """Format text to BRF; returns (seconds, pages, output bytes)."""
+    start = time.perf_counter()
+    pages = size = 0
+    for page in export_braille(RepeatingReader(paragraph, megabytes * 1024 * 1024), language, "brf"):
+        pages += 1
+        size += len(page)
+    return time.perf_counter() - start, pages, size
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == "__main__":
+    print(f"{'language':<8} {'input (MB)':>10} {'time (s)':>9} {'MB/s':>7} {'pages':>8} "
+          f"{'BRF (MB)':>9} {'peak RSS (MB)':>14}")
+    for language, paragraph in (("english", PARAGRAPH), ("hindi", HINDI_PARAGRAPH)):
+        for megabytes in SIZES_MB:
+            elapsed, pages, size = run(paragraph, megabytes, language)
+            print(f"{language:<8} {megabytes:>10} {elapsed:>9.2f} {megabytes / elapsed:>7.2f} {pages:>8} "
+                  f"{size / 1024 / 1024:>9.1f} {peak_rss_mb():>14.0f}")
@@ -0,0 +1,78 @@
+"""
+Benchmark contracted (Grade 2) against uncontracted English Braille:
+output length in cells, throughput, and how time grows with input size.
+
+Contracted output is measured with a cold word cache (every word
+contracted through the trie) and a warm one (repeated words looked up).
+
+Usage:
+    python -m benchmarks.bench_contracted
+"""
+
+import random
+import time
+
+from utils.braille_converter import text_to_braille
+from utils.contracted_braille import contract_word, contracted_word_cells, text_to_contracted_braille
+
+SENTENCES = [
+    "It was the best of times, it was the worst of times.",
+    "The children were reading together in the library that afternoon.",
+    "Knowledge of Braille gives blind people independent access to information.",
+    "She said the question should be answered before the meeting tomorrow.",
+    "Every station along the line had a little shelter and a bench.",
+    "Although the weather was cold, the mother and father walked through the park.",
+    "There is enough time for one more chapter before dinner.",
+    "Which of these books would you like to borrow this week?",
+    "The government announced new funding for accessible education in 2024.",
+    "Something about the sound of rain makes reading much more pleasant.",
+    "Their friend had already finished the first part of the work.",
+    "Characters in the story ought to explain their motivation more clearly.",
+]
+SIZES = [10_000, 100_000, 1_000_000]
+REPEATS = 3
+
+
+def corpus(size, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:size]
+
+
+def best_time(func, text, cold=False):
+    best = float("inf")
+    for _ in range(REPEATS):
+        if cold:
+            contract_word.cache_clear()
+            contracted_word_cells.cache_clear()
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    print(f"{'chars':>10} {'grade 1 cells':>14} {'grade 2 cells':>14} {'saved':>7} "
+          f"{'grade 1 MB/s':>13} {'grade 2 cold MB/s':>18} {'grade 2 warm MB/s':>18}")
+    for size in SIZES:
+        text = corpus(size)
+        megabytes = len(text.encode("utf-8")) / 1e6
+        grade1_time, grade1 = best_time(text_to_braille, text)
+        cold_time, grade2 = best_time(text_to_contracted_braille, text, cold=True)
+        warm_time, _ = best_time(text_to_contracted_braille, text)
+        print(f"{size:>10,} {len(grade1):>14,} {len(grade2):>14,} {1 - len(grade2) / len(grade1):>7.1%} "
+              f"{megabytes / grade1_time:>13.1f} {megabytes / cold_time:>18.2f} {megabytes / warm_time:>18.2f}")
+
+    # Linear in input length: a text of distinct words, so nothing is cached
+    print(f"\n{'distinct words':>15} {'ms':>8} {'us/word':>8}")
+    rng = random.Random(1)
+    vocabulary = [word.strip(".,?").lower() for sentence in SENTENCES for word in sentence.split()]
+    for words in (10_000, 100_000):
+        text = " ".join(f"{rng.choice(vocabulary)}{index}x{rng.choice(vocabulary)}" for index in range(words))
+        seconds, _ = best_time(text_to_contracted_braille, text, cold=True)
+        print(f"{words:>15,} {seconds * 1000:>8.1f} {seconds / words * 1e6:>8.2f}")
@@ -0,0 +1,96 @@
+"""
+Benchmark the contour and connected-component dot extractors on noisy
+synthetic Braille pages.
+
+Each page holds Braille dots plus speckle noise, scratches and smudges,
+so the thresholded image has many non-dot blobs to reject. Both
+extractors get the same binary image from threshold_dots.
+
+Usage:
+    python -m benchmarks.bench_dot_extractors
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from utils.braille_converter import text_to_braille
+from utils.braille_image_processor import DOT_EXTRACTORS, threshold_dots
+
+PAGE_SIZE = (1200, 900)  # width, height
+DOT_RADIUS = 3
+DOT_SPACING = 10
+CELL_PITCH = 25
+LINE_PITCH = 40
+MARGIN = 30
+# Noise specks per megapixel
+NOISE_LEVELS = [0, 20_000, 100_000, 300_000]
+REPEATS = 5
+
+SAMPLE = "braille pages are read by touch; every cell has six dot positions. "
+
+
+def noisy_page(specks, seed=0):
+    """Render a page with Braille dots and noise; returns (gray, dots)."""
+    rng = np.random.default_rng(seed)
+    width, height = PAGE_SIZE
+    page = np.full((height, width), 220, dtype=np.uint8)
+    cells_per_line = (width - 2 * MARGIN) // CELL_PITCH
+    lines = (height - 2 * MARGIN) // LINE_PITCH
+
+    text = ""
+    while len(text) < cells_per_line * lines:
+        text += text_to_braille(SAMPLE)
+    dots = []
+    for index, cell in enumerate(text[:cells_per_line * lines]):
+        line, column = divmod(index, cells_per_line)
+        pattern = ord(cell) - 0x2800
+        for bit in range(6):
+            if pattern & (1 << bit):
+                x = MARGIN + column * CELL_PITCH + (bit // 3) * DOT_SPACING
+                y = MARGIN + line * LINE_PITCH + (bit % 3) * DOT_SPACING
+                dots.append((x, y))
+                cv2.circle(page, (x, y), DOT_RADIUS, 60, -1, cv2.LINE_AA)
+
+    count = specks * width * height // 1_000_000
+    # One- and two-pixel specks
+    ys, xs = rng.integers(0, height, count), rng.integers(0, width, count)
+    page[ys, xs] = rng.integers(40, 120, count)
+    # Thin scratches and larger smudges
+    for _ in range(count // 500):
+        x, y = int(rng.integers(0, width)), int(rng.integers(0, height))
+        length = int(rng.integers(10, 60))
+        cv2.line(page, (x, y), (x + length, y + int(rng.integers(-5, 6))), 90, 1)
+        cv2.ellipse(page, (int(rng.integers(0, width)), int(rng.integers(0, height))),
+                    (int(rng.integers(6, 20)), int(rng.integers(2, 5))), 0, 0, 360, 100, -1)
+    return page, np.array(dots, dtype=np.float32)
+
+
+def recall_precision(found, truth, tolerance=DOT_SPACING / 3):
+    """Share of true dots found, and share of found dots that are real."""
+    if not found:
+        return 0.0, 0.0
+    found = np.asarray(found, dtype=np.float32)
+    index = cv2.flann_Index(truth, dict(algorithm=1, trees=4))
+    nearest, sq_distances = index.knnSearch(found, 1, params=dict(checks=32))
+    close = np.sqrt(sq_distances[:, 0]) <= tolerance
+    return np.unique(nearest[close, 0]).size / len(truth), close.mean()
+
+
+if __name__ == "__main__":
+    print(f"{'specks/MP':>10} {'blobs':>7} {'extractor':>11} {'time (ms)':>10} "
+          f"{'dots':>6} {'recall':>7} {'precision':>9}")
+    for specks in NOISE_LEVELS:
+        gray, truth = noisy_page(specks)
+        binary = threshold_dots(gray)
+        blobs = cv2.connectedComponents(binary)[0] - 1
+        for name, extract in DOT_EXTRACTORS.items():
+            extract(binary)  # warm up
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                found = extract(binary)
+            elapsed = (time.perf_counter() - start) / REPEATS
+            recall, precision = recall_precision(found, truth)
+            print(f"{specks:>10} {blobs:>7} {name:>11} {elapsed * 1000:>10.2f} "
+                  f"{len(found):>6} {recall:>7.3f} {precision:>9.3f}")
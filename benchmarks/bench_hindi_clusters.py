@@ -0,0 +1,75 @@
+"""
+Benchmark the Hindi cluster translator (decomposition, longest-match
+sequences for conjuncts and nukta forms, then the character table)
+against the plain character table, on large Hindi corpora in composed
+(NFC) and decomposed (NFD) form.
+
+Usage:
+    python -m benchmarks.bench_hindi_clusters
+"""
+
+import random
+import time
+import unicodedata
+
+from utils.hindi_braille_converter import HINDI_TABLE, hindi_text_to_braille, hindi_text_to_braille_with_spans
+
+SENTENCES = [
+    "भारत एक विशाल देश है। यहाँ कई भाषाएँ बोली जाती हैं।",
+    "परीक्षा के बाद छात्रों ने विज्ञान की प्रदर्शनी देखी।",
+    "क़िले की दीवारों पर ज़रूरी सूचना लिखी थी।",
+    "उसने फ़ोन पर ख़बर सुनी और ग़लती सुधार ली।",
+    "क्षत्रिय राजा ने ज्ञान और शिक्षा को बढ़ावा दिया।",
+    "माँ ने बच्चों को कहानी सुनाई, फिर सब सो गए।",
+    "पुस्तकालय में १२ नई किताबें आई हैं!",
+    "सड़क के किनारे पेड़ों की छाँव में लोग बैठे थे।",
+]
+SIZES = [100_000, 1_000_000, 10_000_000]
+REPEATS = 3
+
+
+def corpus(size, seed=0):
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size:
+        sentence = rng.choice(SENTENCES)
+        parts.append(sentence)
+        length += len(sentence) + 1
+    return " ".join(parts)[:size]
+
+
+def best_time(func, text):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        result = func(text)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def character_table(text):
+    return text.translate(HINDI_TABLE)
+
+
+if __name__ == "__main__":
+    print(f"{'chars':>11} {'form':>5} {'table MB/s':>11} {'clusters MB/s':>14} {'spans MB/s':>11} "
+          f"{'ns/char':>8} {'cells':>11}")
+    for size in SIZES:
+        for form in ("NFC", "NFD"):
+            text = unicodedata.normalize(form, corpus(size))
+            megabytes = len(text.encode("utf-8")) / 1e6
+            table_time, _ = best_time(character_table, text)
+            cluster_time, braille = best_time(hindi_text_to_braille, text)
+            spans_time, (spans_braille, _, _) = best_time(hindi_text_to_braille_with_spans, text)
+            assert spans_braille == braille
+            print(f"{len(text):>11,} {form:>5} {megabytes / table_time:>11.1f} {megabytes / cluster_time:>14.1f} "
+                  f"{megabytes / spans_time:>11.1f} {cluster_time / len(text) * 1e9:>8.1f} {len(braille):>11,}")
+
+    # Precomposed nukta letters (U+0958-U+095F) go through the decomposition path
+    text = corpus(1_000_000).replace("क़", "क़").replace("ज़", "ज़")
+    megabytes = len(text.encode("utf-8")) / 1e6
+    cluster_time, _ = best_time(hindi_text_to_braille, text)
+    spans_time, _ = best_time(hindi_text_to_braille_with_spans, text)
+    print(f"\nprecomposed nukta letters, {len(text):,} chars: clusters {megabytes / cluster_time:.1f} MB/s, "
+          f"spans {megabytes / spans_time:.1f} MB/s")
@@ -0,0 +1,97 @@
+"""
+Benchmark live camera recognition: a full analysis of every frame versus
+a LiveSession, which re-decodes only the changed regions and seeds the
+lattice fit from the previous frame.
+
+The synthetic clip is a Braille page filmed by a hand-held camera: sensor
+noise on every frame, the camera mostly holding still with an occasional
+small shift, and a finger covering part of the page now and then.
+
+Usage:
+    python -m benchmarks.bench_live_recognition
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+from utils.braille_converter import braille_to_text, text_to_braille
+from utils.braille_image_processor import dots_to_braille, find_dots
+from utils.live_recognition import LiveSession, decode_frame
+
+FRAME_SIZE = (640, 480)  # width, height
+FRAMES = 120
+CELLS_PER_LINE = 22
+CELL_PITCH = 26
+LINE_PITCH = 42
+DOT_SPACING = 10
+TEXT = ("live braille recognition keeps the transcript steady while the camera "
+        "moves a little and a finger sometimes covers the page")
+
+
+def render(text, dx=0, dy=0, finger=None, rng=None):
+    """Encode one JPEG frame of the page, shifted by (dx, dy)."""
+    width, height = FRAME_SIZE
+    frame = np.full((height, width), 215, dtype=np.float32)
+    for index, cell in enumerate(text_to_braille(text)):
+        line, column = divmod(index, CELLS_PER_LINE)
+        pattern = ord(cell) - 0x2800
+        for bit in range(6):
+            if pattern & (1 << bit):
+                x = 30 + dx + column * CELL_PITCH + (bit // 3) * DOT_SPACING
+                y = 30 + dy + line * LINE_PITCH + (bit % 3) * DOT_SPACING
+                cv2.circle(frame, (int(x), int(y)), 3, 70, -1, cv2.LINE_AA)
+    if finger is not None:
+        cv2.ellipse(frame, finger, (40, 90), 20, 0, 360, 150, -1)
+    frame += rng.normal(0, 2.5, frame.shape)
+    return cv2.imencode(".jpg", np.clip(frame, 0, 255).astype(np.uint8),
+                        [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+
+def clip(seed=0):
+    """Frames of a hand-held recording of one page."""
+    rng = np.random.default_rng(seed)
+    dx = dy = 0
+    frames = []
+    for index in range(FRAMES):
+        if rng.random() < 0.1:
+            dx += int(rng.integers(-4, 5))
+            dy += int(rng.integers(-3, 4))
+        finger = (560, 380) if 40 <= index < 60 else None
+        frames.append(render(TEXT, dx, dy, finger, rng))
+    return frames
+
+
+def full_analysis(data):
+    """What a still-image request does for every frame."""
+    dots = find_dots(decode_frame(data))
+    return braille_to_text(dots_to_braille(dots)) if len(dots) >= 2 else ""
+
+
+def report(name, seconds, texts):
+    expected = braille_to_text(text_to_braille(TEXT))
+    changes = sum(1 for before, after in zip(texts, texts[1:]) if before != after)
+    # Line breaks in the rendered page become spaces in the transcript
+    correct = np.mean([text.replace(" ", "") == expected.replace(" ", "") for text in texts])
+    print(f"{name:<28} {seconds / len(texts) * 1000:>10.2f} {len(texts) / seconds:>8.0f} "
+          f"{changes:>17} {correct:>9.1%}")
+
+
+if __name__ == "__main__":
+    frames = clip()
+    print(f"{FRAMES} frames of {FRAME_SIZE[0]}x{FRAME_SIZE[1]}")
+    print(f"{'mode':<28} {'ms/frame':>10} {'fps':>8} {'transcript changes':>17} {'correct':>9}")
+
+    start = time.perf_counter()
+    texts = [full_analysis(frame) for frame in frames]
+    report("full analysis per frame", time.perf_counter() - start, texts)
+
+    session = LiveSession()
+    start = time.perf_counter()
+    results = [session.process_frame(frame) for frame in frames]
+    report("live session", time.perf_counter() - start, [result["text"] for result in results])
+    decoded = sum(result["regions_decoded"] for result in results)
+    reused = sum(result["lattice_reused"] for result in results)
+    print(f"\nlive session: {decoded / (len(frames) * results[0]['regions']):.0%} of regions decoded, "
+          f"lattice reused on {reused} of {len(frames)} frames")
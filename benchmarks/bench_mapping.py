@@ -0,0 +1,41 @@
+"""
+Compare detailed_mapping formats by JSON payload size and the time to
+convert and serialize a response.
+
+Usage:
+    python -m benchmarks.bench_mapping [size_in_bytes]
+"""
+
+import gzip
+import json
+import sys
+import time
+
+from utils.conversion import MAPPING_FORMATS, convert_text
+
+ENGLISH_SAMPLE = "Chapter 12 (the long road): she walked 3 miles, then 14 more! "
+HINDI_SAMPLE = "भारत एक विशाल देश है। यहाँ १२ महीने त्योहार होते हैं, और लोग खुश रहते हैं। "
+
+
+def make_text(sample, size):
+    return (sample * (size // len(sample) + 1))[:size]
+
+
+def run(name, text, language):
+    print(f"\n{name} ({len(text):,} characters)")
+    print(f"{'format':>9} {'JSON bytes':>12} {'gzip bytes':>11} {'convert (ms)':>13} {'serialize (ms)':>15}")
+    for mapping in MAPPING_FORMATS:
+        start = time.perf_counter()
+        braille, detailed_mapping = convert_text(text, language, mapping)
+        converted = time.perf_counter()
+        # Flask's jsonify escapes non-ASCII by default
+        payload = json.dumps({'braille': braille, 'detailed_mapping': detailed_mapping}).encode()
+        serialized = time.perf_counter()
+        print(f"{mapping:>9} {len(payload):>12,} {len(gzip.compress(payload)):>11,} "
+              f"{(converted - start) * 1000:>13.1f} {(serialized - converted) * 1000:>15.1f}")
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    run("English", make_text(ENGLISH_SAMPLE, size), "english")
+    run("Hindi", make_text(HINDI_SAMPLE, size), "hindi")
@@ -0,0 +1,65 @@
+"""
+Compare OCR latency of per-call pytesseract against the warm tesserocr
+engine pool. Needs Tesseract installed, plus tesserocr for the pool.
+
+Usage:
+    python -m benchmarks.bench_ocr_engine [requests] [concurrency]
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytesseract
+from PIL import Image, ImageDraw
+
+from utils import ocr_engine
+
+TEXT = [
+    "Braille is a tactile writing system",
+    "used by people who are visually impaired.",
+    "Each cell has six raised dot positions.",
+]
+
+
+def sample_page():
+    image = Image.new("L", (900, 200), 255)
+    draw = ImageDraw.Draw(image)
+    for line, text in enumerate(TEXT):
+        draw.text((20, 20 + line * 50), text, fill=0)
+    return image.resize((1800, 400))
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) * 1000
+
+
+def run(name, func, image, requests, concurrency):
+    def timed(_):
+        start = time.perf_counter()
+        func(image)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, range(requests)))
+    wall = time.perf_counter() - start
+    print(f"{name:<12} p50 {percentile(latencies, 50):8.1f} ms  "
+          f"p99 {percentile(latencies, 99):8.1f} ms  {requests / wall:6.1f} req/s")
+
+
+if __name__ == "__main__":
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else ocr_engine.OCR_POOL_SIZE
+    image = sample_page()
+
+    run("pytesseract", lambda im: pytesseract.image_to_string(im, lang="eng"),
+        image, requests, concurrency)
+
+    if ocr_engine.tesserocr is None:
+        print("tesserocr      not installed, skipping the pooled engine")
+    else:
+        ocr_engine.warm_up(("eng",))
+        run("tesserocr", lambda im: ocr_engine.get_pool("eng").recognize(im),
+            image, requests, concurrency)
@@ -0,0 +1,88 @@
+"""
+Measure the OCR pre-processing stages: time per stage, OCR time, and
+accuracy against the known text of a synthetic fixture set, with the
+regions OCRed one by one and stacked into one image (what the pytesseract
+path does, see stack_regions). Needs Tesseract installed.
+
+Usage:
+    python -m benchmarks.bench_ocr_preprocess
+"""
+
+import time
+from difflib import SequenceMatcher
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from utils.ocr_engine import recognize_text, use_pool
+from utils.ocr_preprocessor import ALL_STAGES, preprocess_image, stack_regions
+
+LINES = [
+    "Braille is a tactile writing system",
+    "used by people who are visually impaired",
+    "each cell has six raised dot positions",
+]
+
+# (name, canvas size, rotation in degrees, noise)
+FIXTURES = [
+    ("clean 2MP", (1600, 1200), 0, 0),
+    ("phone 12MP", (4000, 3000), 0, 8),
+    ("skewed 12MP", (4000, 3000), 4, 8),
+]
+
+# (name, stages, whether the regions are stacked into one OCR call)
+CONFIGURATIONS = [
+    ("raw", (), False),
+    ("downscale+gray", ("downscale", "grayscale"), False),
+    ("all stages", ALL_STAGES, False),
+    ("all, stacked", ALL_STAGES, True),
+]
+
+
+def load_font(size):
+    try:
+        return ImageFont.truetype("DejaVuSans.ttf", size)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def make_fixture(size, rotation, noise):
+    width, height = size
+    image = Image.new("L", size, 235)
+    draw = ImageDraw.Draw(image)
+    font = load_font(height // 40)
+    for index, line in enumerate(LINES):
+        draw.text((width // 8, height // 4 + index * height // 20), line, fill=20, font=font)
+    if rotation:
+        image = image.rotate(rotation, fillcolor=235)
+    if noise:
+        pixels = np.asarray(image, dtype=np.int16)
+        pixels = pixels + np.random.default_rng(0).normal(0, noise, pixels.shape)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    return image.filter(ImageFilter.GaussianBlur(0.6)).convert("RGB")
+
+
+def accuracy(text):
+    expected = " ".join(LINES).lower()
+    found = " ".join(text.split()).lower()
+    return SequenceMatcher(None, expected, found).ratio()
+
+
+if __name__ == "__main__":
+    print(f"OCR engine: {'tesserocr pool' if use_pool() else 'pytesseract (one process per call)'}")
+    for fixture_name, size, rotation, noise in FIXTURES:
+        image = make_fixture(size, rotation, noise)
+        print(f"\n{fixture_name}")
+        for config_name, stages, stacked in CONFIGURATIONS:
+            crops, timings = preprocess_image(image, stages=stages)
+            if stacked and len(crops) > 1:
+                start = time.perf_counter()
+                crops = [stack_regions(crops)]
+                timings["stack"] = time.perf_counter() - start
+            start = time.perf_counter()
+            text = "\n".join(recognize_text(crop, lang="eng") for crop in crops)
+            timings["ocr"] = time.perf_counter() - start
+            total = sum(timings.values())
+            detail = " ".join(f"{stage}={seconds * 1000:.0f}ms" for stage, seconds in timings.items())
+            print(f"  {config_name:<15} total {total * 1000:7.0f} ms  accuracy {accuracy(text):.3f}  "
+                  f"OCR calls {len(crops):>2}  [{detail}]")
@@ -0,0 +1,56 @@
+"""
+Compare /api/text-to-braille response size and latency across output
+formats (Unicode JSON, base64-packed JSON, binary) and content codings
+(identity, gzip, and brotli when the ``brotli`` package is installed).
+
+Usage:
+    python -m benchmarks.bench_packed_output
+"""
+
+import time
+
+from utils.http_compression import available_encodings
+
+SAMPLE = ("Braille is read by touch, one six-dot cell at a time; a page "
+          "holds about 1000 cells (25 lines of 40). ")
+SIZES = [10_000, 200_000]
+REPEATS = 5
+
+# (name, request fields)
+VARIANTS = [
+    ("unicode, legacy mapping", {"output": "unicode", "mapping": "legacy"}),
+    ("unicode, spans mapping", {"output": "unicode", "mapping": "spans"}),
+    ("unicode, no mapping", {"output": "unicode", "mapping": "none"}),
+    ("packed, spans mapping", {"output": "packed", "mapping": "spans"}),
+    ("packed, no mapping", {"output": "packed", "mapping": "none"}),
+    ("binary", {"output": "binary"}),
+]
+
+
+def measure(client, text, fields, encoding):
+    """Best-of latency and body size for one request shape."""
+    headers = {"Accept-Encoding": encoding}
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        response = client.post("/api/text-to-braille", json={"text": text, **fields}, headers=headers)
+        body = response.get_data()
+        best = min(best, time.perf_counter() - start)
+    return best, len(body)
+
+
+if __name__ == "__main__":
+    from app import app
+
+    client = app.test_client()
+    encodings = ("identity",) + available_encodings()
+    for size in SIZES:
+        text = (SAMPLE * (size // len(SAMPLE) + 1))[:size]
+        print(f"\n{size:,} characters")
+        print(f"{'output':<26} " + " ".join(f"{e + ' KB':>10} {e + ' ms':>10}" for e in encodings))
+        for name, fields in VARIANTS:
+            cells = []
+            for encoding in encodings:
+                seconds, length = measure(client, text, fields, encoding)
+                cells.append(f"{length / 1024:>10.1f} {seconds * 1000:>10.1f}")
+            print(f"{name:<26} " + " ".join(cells))
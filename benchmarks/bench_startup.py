@@ -0,0 +1,92 @@
+"""
+Benchmark cold start: app import time and first-request latency per
+endpoint, each measured in a fresh interpreter, with and without the
+warm-up from utils/warmup.py (what gunicorn_config.py runs before the
+workers take traffic).
+
+Usage:
+    python -m benchmarks.bench_startup
+"""
+
+import base64
+import json
+import subprocess
+import sys
+
+import cv2
+import numpy as np
+
+RUNS = 3
+
+# (name, method, path, request kwargs as Python source)
+ENDPOINTS = [
+    ("page", "get", "/", "{}"),
+    ("text-to-braille", "post", "/api/text-to-braille",
+     "{'json': {'text': 'Hello world 123', 'language': 'english'}}"),
+    ("text-to-braille hindi", "post", "/api/text-to-braille",
+     "{'json': {'text': 'नमस्ते दुनिया', 'language': 'hindi'}}"),
+    ("stream", "post", "/api/text-to-braille/stream?language=english",
+     "{'data': b'hello world ' * 1000}"),
+    ("ocr health", "get", "/api/health/ocr", "{}"),
+    ("image-to-text", "post", "/api/image-to-text",
+     "{'data': {'image': (io.BytesIO(PNG), 'page.png')}}"),
+]
+
+CHILD = """
+import base64, io, json, time
+PNG = base64.b64decode('{png}')
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+if {warm}:
+    from utils import warmup
+    warmup.preload()
+    warmup.warm_up_worker()
+client = app.app.test_client()
+start = time.perf_counter()
+response = client.{method}('{path}', **{kwargs})
+response.get_data()
+first = time.perf_counter() - start
+start = time.perf_counter()
+response = client.{method}('{path}', **{kwargs})
+response.get_data()
+second = time.perf_counter() - start
+print(json.dumps({{'import': imported, 'first': first, 'second': second,
+                  'status': response.status_code}}))
+"""
+
+IMPORT_ONLY = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter() - start
+heavy = [m for m in ('cv2', 'numpy', 'PIL', 'pytesseract', 'edge_tts') if m in sys.modules]
+print(json.dumps({'import': imported, 'heavy': heavy}))
+"""
+
+
+def run(code):
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def best_of(code):
+    results = [run(code) for _ in range(RUNS)]
+    return min(results, key=lambda result: result.get("first", result["import"]))
+
+
+if __name__ == "__main__":
+    # Encoded here so the child processes do not import OpenCV themselves
+    png = base64.b64encode(cv2.imencode(".png", np.full((200, 300), 255, np.uint8))[1]).decode()
+
+    result = best_of(IMPORT_ONLY)
+    print(f"import app: {result['import'] * 1000:.0f} ms, heavy modules loaded: "
+          f"{', '.join(result['heavy']) or 'none'}\n")
+
+    print(f"{'endpoint':<22} {'status':>6} {'cold first (ms)':>16} {'warm first (ms)':>16} {'steady (ms)':>12}")
+    for name, method, path, kwargs in ENDPOINTS:
+        cold = best_of(CHILD.format(png=png, warm=False, method=method, path=path, kwargs=kwargs))
+        warm = best_of(CHILD.format(png=png, warm=True, method=method, path=path, kwargs=kwargs))
+        print(f"{name:<22} {cold['status']:>6} {cold['first'] * 1000:>16.1f} "
+              f"{warm['first'] * 1000:>16.1f} {cold['second'] * 1000:>12.1f}")
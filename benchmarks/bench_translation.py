@@ -0,0 +1,63 @@
+"""
+Benchmark the compiled translation tables against the original
+per-character loops for English and Hindi text.
+
+Usage:
+    python -m benchmarks.bench_translation
+"""
+
+import time
+
+from utils.braille_converter import CHAR_TO_BRAILLE, text_to_braille
+from utils.hindi_braille_converter import HINDI_TO_BRAILLE, HINDI_TABLE
+from utils.translation_engine import translate
+
+SIZES = [("1 KB", 1_000), ("100 KB", 100_000), ("10 MB", 10_000_000)]
+
+ENGLISH_SAMPLE = "The quick brown fox (aged 12) jumps over the lazy dog; really? yes! "
+HINDI_SAMPLE = "भारत एक विशाल देश है। यहाँ कई भाषाएँ बोली जाती हैं, और १२ महीने त्योहार होते हैं। "
+
+
+def legacy_text_to_braille(text):
+    result = ""
+    for char in text.lower():
+        result += CHAR_TO_BRAILLE.get(char, char)
+    return result
+
+
+def legacy_hindi_text_to_braille(text):
+    braille_text = ""
+    for char in text:
+        if char in HINDI_TO_BRAILLE:
+            braille_text += HINDI_TO_BRAILLE[char]
+        else:
+            braille_text += char
+    return braille_text
+
+
+def make_text(sample, size):
+    return (sample * (size // len(sample) + 1))[:size]
+
+
+def timed(func, text):
+    start = time.perf_counter()
+    result = func(text)
+    return result, time.perf_counter() - start
+
+
+def run(name, sample, legacy, compiled):
+    print(f"\n{name}")
+    print(f"{'size':>8} {'legacy (s)':>12} {'compiled (s)':>13} {'speedup':>9}  identical")
+    for label, size in SIZES:
+        text = make_text(sample, size)
+        old, old_time = timed(legacy, text)
+        new, new_time = timed(compiled, text)
+        speedup = old_time / new_time if new_time else float("inf")
+        print(f"{label:>8} {old_time:>12.4f} {new_time:>13.4f} {speedup:>8.1f}x  {old == new}")
+
+
+if __name__ == "__main__":
+    run("English text_to_braille", ENGLISH_SAMPLE, legacy_text_to_braille, text_to_braille)
+    # The character table alone; conjuncts and nukta forms are measured in
+    # benchmarks/bench_hindi_clusters.py
+    run("Hindi character table", HINDI_SAMPLE, legacy_hindi_text_to_braille, lambda text: translate(text, HINDI_TABLE))
@@ -0,0 +1,81 @@
+"""
+Load test /api/text-to-speech under concurrent requests.
+
+edge-tts is replaced by a fake that waits SYNTHESIS_LATENCY seconds
+asynchronously and writes a few bytes, like a network round-trip, so
+the test needs no network and measures only the serving model:
+
+- sync worker: one request at a time, a new event loop per call (the
+  previous behaviour under gunicorn's default sync worker)
+- threaded worker, loop per call: handler threads, each calling
+  asyncio.run
+- threaded worker, shared loop: handler threads submitting to the
+  long-lived event loop thread, limited to TTS_MAX_CONCURRENCY
+
+Usage:
+    python -m benchmarks.bench_tts_concurrency
+"""
+
+import asyncio
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from utils import speech_processor
+
+REQUESTS = 64
+SYNTHESIS_LATENCY = 0.25
+HANDLER_THREADS = 16
+CONCURRENCY_LIMITS = [4, 8, 16]
+
+
+async def fake_generate_audio(text, voice, filename):
+    await asyncio.sleep(SYNTHESIS_LATENCY)
+    with open(filename, "wb") as f:
+        f.write(b"\xff\xfb" + text.encode("utf-8"))
+
+
+def loop_per_call(self, text, voice, filepath, timeout=None):
+    asyncio.run(asyncio.wait_for(speech_processor.generate_audio(text, voice, filepath), timeout))
+
+
+def load_test(client, threads):
+    """Send REQUESTS distinct texts; returns (seconds, failures)."""
+    texts = [f"sentence {uuid.uuid4().hex}" for _ in range(REQUESTS)]
+
+    def request(text):
+        response = client.post("/api/text-to-speech", json={"text": text, "language": "english"})
+        return response.status_code == 200
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(request, texts))
+    return time.perf_counter() - start, results.count(False)
+
+
+def report(name, seconds, failures):
+    print(f"{name:<40} {seconds:>8.2f} {REQUESTS / seconds:>10.1f} {failures:>9}")
+
+
+if __name__ == "__main__":
+    from app import app
+
+    speech_processor.AUDIO_DIR = tempfile.mkdtemp()
+    speech_processor.TTS_ENGINES = ["edge-tts"]
+    speech_processor.generate_audio = fake_generate_audio
+    client = app.test_client()
+    shared_loop = speech_processor.EdgeTTSEngine.synthesize
+
+    print(f"{REQUESTS} requests, {SYNTHESIS_LATENCY * 1000:.0f} ms per synthesis")
+    print(f"{'serving model':<40} {'time (s)':>8} {'req/s':>10} {'failures':>9}")
+
+    speech_processor.EdgeTTSEngine.synthesize = loop_per_call
+    report("sync worker, loop per call", *load_test(client, 1))
+    report(f"{HANDLER_THREADS} threads, loop per call", *load_test(client, HANDLER_THREADS))
+
+    speech_processor.EdgeTTSEngine.synthesize = shared_loop
+    speech_processor.get_event_loop()
+    for limit in CONCURRENCY_LIMITS:
+        speech_processor._synthesis_slots = asyncio.Semaphore(limit)
+        report(f"{HANDLER_THREADS} threads, shared loop, limit {limit}", *load_test(client, HANDLER_THREADS))
@@ -0,0 +1,49 @@
+"""
+Gunicorn settings for production:
+
+    gunicorn -c gunicorn_config.py app:app
+
+The app is loaded once in the master (``preload_app``) and warmed up there
+before the workers fork, so they start with the imports and translation
+tables already in memory. The worker then loads its own Tesseract
+engines and OpenCV state. See utils/warmup.py for the WARM_UP_* settings.
+"""
+
+import os
+import glob
+import tempfile
+
+# OCR runs in the job and batch worker processes, so /metrics only sees
+# their timings through files in METRICS_DIR (utils/metrics.py)
+os.environ.setdefault("METRICS_DIR", os.path.join(tempfile.gettempdir(), "braille-metrics"))
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '10000')}"
+# One worker: background job state lives in the memory of the process that
+# took the upload (utils/job_queue.py), so a poll landing on another worker
+# would not find the job. CPU-heavy image work still runs in parallel on the
+# job process pool (JOB_WORKERS); raise this only with a single-job setup.
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+# Threaded workers let requests waiting on text-to-speech overlap. A live
+# camera WebSocket holds a thread while it is open, so at most
+# LIVE_MAX_SESSIONS (default 2) of them run at once and idle ones are closed
+# after LIVE_IDLE_TIMEOUT seconds; keep that well below GUNICORN_THREADS.
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+# Leaves time for the per-worker warm-up and slow OCR pages
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+preload_app = True
+
+def on_starting(server):
+    # Metrics files of a previous run's workers would be summed with ours
+    from utils.metrics import METRICS_DIR
+    if METRICS_DIR:
+        for path in glob.glob(os.path.join(METRICS_DIR, "*.json")):
+            os.remove(path)
+
+def when_ready(server):
+    from utils.warmup import preload
+    preload()
+
+def post_fork(server, worker):
+    from utils.warmup import warm_up_worker
+    warm_up_worker()
@@ -0,0 +1,124 @@
+// Client-side Text to Braille, using the tables exported by utils/table_export.py.
+// Produces the same braille and detailed_mapping as /api/text-to-braille
+// (legacy mapping); returns null for input it cannot convert exactly, so
+// the caller falls back to the API.
+(function (root) {
+    function isDigit(ch) {
+        return ch >= '0' && ch <= '9';
+    }
+
+    // Tables with sequences (Hindi conjuncts, nukta forms): decompose, take
+    // the longest sequence at each position, and give every character of a
+    // sequence the sequence's braille, as translate_clusters_with_spans does
+    function convertClusters(text, rules, passthrough) {
+        const table = rules.table;
+        const sequences = rules.sequences;
+        const decompositions = rules.decompositions || {};
+        let longest = 1;
+        for (const key in sequences) longest = Math.max(longest, Array.from(key).length);
+
+        const source = Array.from(text);
+        const chars = [];
+        const sources = [];
+        source.forEach(function (ch, index) {
+            const decomposed = Object.prototype.hasOwnProperty.call(decompositions, ch) ? decompositions[ch] : ch;
+            for (const part of decomposed) {
+                chars.push(part);
+                sources.push(index);
+            }
+        });
+
+        // [first decomposed index, end, braille] for each symbol
+        const symbols = [];
+        for (let k = 0; k < chars.length;) {
+            let length = Math.min(longest, chars.length - k);
+            for (; length > 1; length--) {
+                if (Object.prototype.hasOwnProperty.call(sequences, chars.slice(k, k + length).join(''))) break;
+            }
+            const key = chars.slice(k, k + length).join('');
+            let braille;
+            if (length > 1) braille = sequences[key];
+            else if (Object.prototype.hasOwnProperty.call(table, key)) braille = table[key];
+            else if (passthrough.indexOf(key) !== -1) braille = key;
+            else return null;
+            symbols.push([k, k + length, braille]);
+            k += length;
+        }
+
+        const starts = new Array(source.length).fill(null);
+        const ends = new Array(source.length).fill(0);
+        let offset = 0;
+        for (const [first, last, braille] of symbols) {
+            for (let k = first; k < last; k++) {
+                const index = sources[k];
+                if (starts[index] === null) starts[index] = offset;
+                ends[index] = Math.max(ends[index], offset + braille.length);
+            }
+            offset += braille.length;
+        }
+
+        const cells = symbols.map(function (symbol) { return symbol[2]; }).join('');
+        const spans = starts.map(function (start, index) {
+            return start === null ? null : [start, ends[index]];
+        });
+        // Removed characters (joiners) take the span of the sequence around them
+        const following = new Array(source.length).fill(null);
+        for (let index = source.length - 1, span = null; index >= 0; index--) {
+            if (spans[index] === null) following[index] = span;
+            else span = spans[index];
+        }
+        const mapping = [];
+        let previous = null;
+        source.forEach(function (ch, index) {
+            let span = spans[index];
+            if (span === null) {
+                const next = following[index];
+                span = previous && next && previous[0] === next[0] && previous[1] === next[1] ? previous : [0, 0];
+            } else {
+                previous = span;
+            }
+            mapping.push(ch === ' ' ? { original: 'space', braille: '⠀' } : { original: ch, braille: cells.slice(span[0], span[1]) });
+        });
+
+        return { braille: cells, detailed_mapping: mapping };
+    }
+
+    function convert(text, language, tables) {
+        tables = tables || root.BRAILLE_TABLES;
+        if (!tables) return null;
+        const rules = language === 'hindi' ? tables.hindi : tables.english;
+        if (!rules) return null;
+        if (rules.sequences) return convertClusters(text, rules, tables.passthrough);
+
+        const table = rules.table;
+        const letterSignAfter = rules.letter_sign_after_digit || '';
+        const cells = [];
+        const mapping = [];
+        let previous = '';
+
+        // for...of walks code points, as Python iterates a str
+        for (const ch of text) {
+            const key = rules.lowercase ? ch.toLowerCase() : ch;
+            let braille;
+            if (Object.prototype.hasOwnProperty.call(table, key)) {
+                braille = table[key];
+                if (letterSignAfter && isDigit(previous) && letterSignAfter.indexOf(key) !== -1) {
+                    braille = rules.letter_sign + braille;
+                }
+            } else if (tables.passthrough.indexOf(ch) !== -1) {
+                braille = ch;
+            } else {
+                return null;
+            }
+            cells.push(braille);
+            mapping.push(ch === ' ' ? { original: 'space', braille: '⠀' } : { original: ch, braille: braille });
+            previous = key;
+        }
+
+        return { braille: cells.join(''), detailed_mapping: mapping };
+    }
+
+    const engine = { convert: convert };
+    root.BrailleEngine = engine;
+    if (typeof module !== 'undefined' && module.exports) module.exports = engine;
+})(typeof self !== 'undefined' ? self : this);
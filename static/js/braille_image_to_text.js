@@ -47,16 +47,15 @@ document.addEventListener('DOMContentLoaded', function() {
         const formData = new FormData();
         formData.append('braille_image', file);
         
-        // Send image to server for Braille recognition
-        fetch('/api/braille-image-to-text', {
+        // Recognition runs as a background job; poll until it finishes
+        fetch('/api/jobs/braille-image-to-text', {
             method: 'POST',
             body: formData
         })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Network response was not ok');
-            }
-            return response.json();
+        .then(response => response.json())
+        .then(job => {
+            if (job.error) return job;
+            return pollJob(job.status_url);
         })
         .then(data => {
             // Hide loading spinner
@@ -111,34 +110,29 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
     
-    // Function to read text aloud
+    // Resolves with the job result, or {error} if the job failed
+    function pollJob(statusUrl) {
+        return new Promise((resolve, reject) => {
+            const check = () => {
+                fetch(statusUrl)
+                    .then(response => response.json())
+                    .then(status => {
+                        if (status.status === 'done') resolve(status.result);
+                        else if (status.status === 'failed' || status.error) resolve({ error: status.error });
+                        else setTimeout(check, 1000);
+                    })
+                    .catch(reject);
+            };
+            check();
+        });
+    }
+    
+    // Function to read text aloud, streamed so playback starts after the
+    // first sentence
     function readAloud(text) {
-        fetch('/api/text-to-speech', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({ text: text }),
-        })
-        .then(response => {
-            if (!response.ok) {
-                throw new Error('Network response was not ok');
-            }
-            return response.json();
-        })
-        .then(data => {
-            if (data.error) {
-                showNotification('Error', data.error);
-                return;
-            }
-            
-            // Play the audio
-            const audio = new Audio('data:audio/mp3;base64,' + data.audio_data);
-            audio.play();
-            
+        SpeechStream.play(text, 'english').then(() => {
             showNotification('Success', 'Reading text aloud');
-        })
-        .catch(error => {
+        }).catch(error => {
             console.error('Error reading text aloud:', error);
             showNotification('Error', 'Failed to read text aloud: ' + error.message);
         });
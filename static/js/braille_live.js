@@ -0,0 +1,99 @@
+// Live camera Braille recognition over a WebSocket (see /ws/braille-live)
+
+document.addEventListener('DOMContentLoaded', function() {
+    const startButton = document.getElementById('live-start-button');
+    const stopButton = document.getElementById('live-stop-button');
+    const video = document.getElementById('live-video');
+    const liveBraille = document.getElementById('live-braille');
+    const liveText = document.getElementById('live-text');
+    const liveStatus = document.getElementById('live-status');
+
+    if (!startButton || !navigator.mediaDevices || !navigator.mediaDevices.getUserMedia) {
+        if (startButton) startButton.disabled = true;
+        return;
+    }
+
+    // Frames are downscaled before sending; the server keeps the rest
+    const MAX_DIMENSION = 640;
+    const JPEG_QUALITY = 0.7;
+    // At most this many frames per second, and never more than one in flight
+    const MAX_FPS = 10;
+
+    const canvas = document.createElement('canvas');
+    let socket = null;
+    let stream = null;
+    let lastSent = 0;
+
+    startButton.addEventListener('click', function() {
+        navigator.mediaDevices.getUserMedia({ video: { facingMode: 'environment' }, audio: false })
+            .then(function(mediaStream) {
+                stream = mediaStream;
+                video.srcObject = stream;
+                video.classList.remove('d-none');
+                startButton.classList.add('d-none');
+                stopButton.classList.remove('d-none');
+                openSocket();
+            })
+            .catch(function(error) {
+                console.error('Camera error:', error);
+                liveStatus.textContent = 'Camera not available: ' + error.message;
+            });
+    });
+
+    stopButton.addEventListener('click', stop);
+
+    function openSocket() {
+        const scheme = window.location.protocol === 'https:' ? 'wss://' : 'ws://';
+        socket = new WebSocket(scheme + window.location.host + '/ws/braille-live');
+        socket.binaryType = 'arraybuffer';
+        socket.onopen = function() {
+            liveStatus.textContent = 'Connected';
+            video.onloadeddata = sendFrame;
+            if (video.readyState >= 2) sendFrame();
+        };
+        socket.onmessage = function(event) {
+            const result = JSON.parse(event.data);
+            if (result.error) {
+                liveStatus.textContent = result.error;
+            } else if (!result.reset) {
+                if (result.updated) {
+                    liveBraille.textContent = result.braille;
+                    liveText.textContent = result.text;
+                }
+                liveStatus.textContent = `Frame ${result.frame}: ${result.regions_decoded}/${result.regions} regions decoded, ` +
+                    `${Math.round(result.seconds * 1000)} ms, unchanged for ${result.stable_frames} frames`;
+            }
+            // Pace frames on replies so a slow link never builds a backlog
+            const wait = Math.max(0, 1000 / MAX_FPS - (performance.now() - lastSent));
+            setTimeout(sendFrame, wait);
+        };
+        socket.onclose = function(event) {
+            // The server gives a reason when it is full or the socket was idle
+            liveStatus.textContent = event.reason || 'Disconnected';
+        };
+    }
+
+    function sendFrame() {
+        if (!socket || socket.readyState !== WebSocket.OPEN || !video.videoWidth) return;
+        const scale = Math.min(1, MAX_DIMENSION / Math.max(video.videoWidth, video.videoHeight));
+        canvas.width = Math.round(video.videoWidth * scale);
+        canvas.height = Math.round(video.videoHeight * scale);
+        canvas.getContext('2d').drawImage(video, 0, 0, canvas.width, canvas.height);
+        canvas.toBlob(function(blob) {
+            if (blob && socket && socket.readyState === WebSocket.OPEN) {
+                lastSent = performance.now();
+                socket.send(blob);
+            }
+        }, 'image/jpeg', JPEG_QUALITY);
+    }
+
+    function stop() {
+        if (socket) socket.close();
+        socket = null;
+        if (stream) stream.getTracks().forEach(track => track.stop());
+        stream = null;
+        video.classList.add('d-none');
+        stopButton.classList.add('d-none');
+        startButton.classList.remove('d-none');
+    }
+});
@@ -42,13 +42,15 @@ document.addEventListener('DOMContentLoaded', function () {
 
         loadingSpinner.classList.remove('d-none');
 
-        fetch('/api/image-to-text', {
+        // OCR runs as a background job; poll until it finishes
+        fetch('/api/jobs/image-to-text', {
             method: 'POST',
             body: formData,
         })
-            .then(response => {
-                if (!response.ok) throw new Error('Server error');
-                return response.json();
+            .then(response => response.json())
+            .then(job => {
+                if (job.error) return job;
+                return pollJob(job.status_url);
             })
             .then(data => {
                 loadingSpinner.classList.add('d-none');
@@ -82,30 +84,29 @@ document.addEventListener('DOMContentLoaded', function () {
                 return;
             }
 
-            fetch('/api/text-to-speech', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ text, language }),
-            })
-                .then(res => res.json())
-                .then(data => {
-                    if (data.error) {
-                        showNotification('Error', data.error);
-                        return;
-                    }
-
-                    const audio = new Audio(data.audio_url);
-                    audio.play().then(() => {
-                        showNotification('Success', 'Reading aloud...');
-                    }).catch(err => {
-                        console.error('Audio play error:', err);
-                        showNotification('Error', 'Unable to play audio.');
-                    });
-                })
-                .catch(err => {
-                    console.error('TTS Error:', err);
-                    showNotification('Error', 'Failed to convert text to speech.');
-                });
+            // Streamed so playback starts after the first sentence
+            SpeechStream.play(text, language).then(() => {
+                showNotification('Success', 'Reading aloud...');
+            }).catch(err => {
+                console.error('Audio play error:', err);
+                showNotification('Error', 'Unable to play audio.');
+            });
+        });
+    }
+
+    function pollJob(statusUrl) {
+        return new Promise((resolve, reject) => {
+            const check = () => {
+                fetch(statusUrl)
+                    .then(response => response.json())
+                    .then(status => {
+                        if (status.status === 'done') resolve(status.result);
+                        else if (status.status === 'failed' || status.error) resolve({ error: status.error });
+                        else setTimeout(check, 1000);
+                    })
+                    .catch(reject);
+            };
+            check();
         });
     }
 
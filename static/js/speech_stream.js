@@ -0,0 +1,64 @@
+// Read-aloud over POST /api/text-to-speech/stream. The text goes in the
+// request body, so long texts are not cut by the server's URL length limit.
+// Audio is fed to a MediaSource as it arrives, so playback starts after the
+// first sentence; browsers without MediaSource support for MP3 play it once
+// the whole response is in.
+(function (root) {
+    const MIME = 'audio/mpeg';
+
+    function requestSpeech(text, language) {
+        return fetch('/api/text-to-speech/stream', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ text: text, language: language })
+        }).then(response => {
+            if (response.ok) return response;
+            return response.json()
+                .catch(() => ({}))
+                .then(data => { throw new Error(data.error || 'Text-to-speech failed'); });
+        });
+    }
+
+    function playStreamed(response) {
+        const mediaSource = new MediaSource();
+        const audio = new Audio();
+        audio.src = URL.createObjectURL(mediaSource);
+
+        mediaSource.addEventListener('sourceopen', () => {
+            const buffer = mediaSource.addSourceBuffer(MIME);
+            const reader = response.body.getReader();
+            const appendNext = () => reader.read().then(({ done, value }) => {
+                if (done) {
+                    if (mediaSource.readyState === 'open') mediaSource.endOfStream();
+                    return;
+                }
+                buffer.addEventListener('updateend', appendNext, { once: true });
+                buffer.appendBuffer(value);
+            }).catch(err => {
+                console.error('Audio stream error:', err);
+                if (mediaSource.readyState === 'open') mediaSource.endOfStream('network');
+            });
+            appendNext();
+        }, { once: true });
+        audio.addEventListener('ended', () => URL.revokeObjectURL(audio.src), { once: true });
+        return audio.play().then(() => audio);
+    }
+
+    function playWhole(response) {
+        return response.blob().then(blob => {
+            const audio = new Audio(URL.createObjectURL(blob));
+            audio.addEventListener('ended', () => URL.revokeObjectURL(audio.src), { once: true });
+            return audio.play().then(() => audio);
+        });
+    }
+
+    // Resolves with the playing <audio> element once playback has started
+    function playSpeech(text, language) {
+        return requestSpeech(text, language || 'english').then(response => {
+            const streamable = root.MediaSource && MediaSource.isTypeSupported(MIME) && response.body;
+            return streamable ? playStreamed(response) : playWhole(response);
+        });
+    }
+
+    root.SpeechStream = { play: playSpeech };
+})(typeof self !== 'undefined' ? self : this);
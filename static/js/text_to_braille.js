@@ -80,31 +80,28 @@ document.addEventListener('DOMContentLoaded', function () {
         if (recognition && isRecording) recognition.stop();
     });
 
-    // ✅ Read Aloud (backend TTS)
+    // ✅ Read Aloud (backend TTS, streamed so playback starts after the first sentence)
     readAloudButton?.addEventListener('click', () => {
         const text = textInput.value.trim();
         if (!text) return showNotification('Error', 'No text to read');
 
-        fetch('/api/text-to-speech', {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ text: text, language: 'english' })
-        })
-            .then(res => res.json())
-            .then(data => {
-                if (data.error) return showNotification('Error', data.error);
-                const audio = new Audio(data.audio_url);
-                audio.play();
-                showNotification('Success', 'Reading text aloud');
-            })
+        SpeechStream.play(text, 'english')
+            .then(() => showNotification('Success', 'Reading text aloud'))
             .catch(err => {
                 console.error('TTS error:', err);
                 showNotification('Error', 'Text-to-speech failed');
             });
     });
 
-    // ✅ Braille Convert API
+    // ✅ Braille Convert: locally from the exported tables, the API otherwise
     function convertTextToBraille(text) {
+        const local = window.BrailleEngine && window.BrailleEngine.convert(text, 'english');
+        if (local) {
+            brailleOutput.textContent = local.braille;
+            displayDetailedMapping(local.detailed_mapping);
+            return;
+        }
+
         fetch('/api/text-to-braille', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
@@ -0,0 +1,34 @@
+"""
+braille_to_text must undo text_to_braille on lower-case text, number and
+letter signs and punctuation included (capitals are not marked in Braille
+here, so they read back lower-case).
+"""
+
+import random
+
+import pytest
+
+from utils.braille_converter import CHAR_TO_BRAILLE, braille_to_text, text_to_braille
+
+# '"' shares its cell with '?', so it cannot round-trip
+ALPHABET = "".join(char for char in CHAR_TO_BRAILLE if char != '"')
+RANDOM_CASES = 10_000
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "hello world",
+    "on 12 may, 3 of us (aged 40-45) met at home@city. was it fun? yes! it's 2x better; really: 10a.",
+    "1a 2b 9j 0k 5z",
+    "12abc34def",
+    "line one\nline two",
+])
+def test_round_trip_fixtures(text):
+    assert braille_to_text(text_to_braille(text)) == text
+
+
+def test_round_trip_random_text():
+    rng = random.Random(0)
+    for _ in range(RANDOM_CASES):
+        text = "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+        assert braille_to_text(text_to_braille(text)) == text
@@ -0,0 +1,50 @@
+"""
+The BRF export must not depend on how the input is read: the same text
+gives the same pages for every chunk size, and BRF pages keep their
+CR LF line breaks and form feeds.
+"""
+
+import io
+import random
+
+from utils.brf_formatter import export_braille
+
+RANDOM_CASES = 500
+CHUNK_SIZES = (1, 2, 3, 5, 7, 16, 64 * 1024)
+
+WORDS = {
+    "english": ["hello", "world,", "this", "is", "12ab", "a", "(quoted)", "supercalifragilisticexpialidocious",
+                "\n", "  ", "\n\n", "don't"],
+    "hindi": ["नमस्ते", "दुनिया", "क्षत्रिय", "ज्ञान", "क़िला", "यहाँ", "।", "\n", "  "],
+}
+
+
+def export(text, language, fmt, chunk_size, grade=1):
+    stream = io.BytesIO(text.encode("utf-8"))
+    return "".join(export_braille(stream, language, fmt, width=20, lines_per_page=4,
+                                  chunk_size=chunk_size, grade=grade))
+
+
+def random_text(rng, language):
+    return " ".join(rng.choice(WORDS[language]) for _ in range(rng.randint(1, 60)))
+
+
+def test_brf_pages_keep_line_breaks():
+    brf = export("Hello world\nsecond line 12ab", "english", "brf", 64 * 1024)
+    pages = brf.split("\f")[:-1]
+    assert pages
+    for page in pages:
+        lines = page.split("\r\n")
+        assert len(lines) == 5 and lines[-1] == "", page
+        assert not any("\n" in line or "\r" in line for line in lines[:-1]), page
+
+
+def test_chunk_size_does_not_change_output():
+    rng = random.Random(0)
+    for case in range(RANDOM_CASES):
+        language = "hindi" if case % 4 == 3 else "english"
+        grade = 2 if language == "english" and case % 2 else 1
+        fmt = "brf" if case % 3 else "unicode"
+        text = random_text(rng, language)
+        outputs = {export(text, language, fmt, size, grade) for size in CHUNK_SIZES}
+        assert len(outputs) == 1, (language, grade, fmt, text)
@@ -0,0 +1,89 @@
+"""
+The Hindi cluster translator against hand-written fixtures: conjunct
+signs, nukta forms in composed and decomposed Unicode, chandrabindu, ॠ and
+joiners. On random text, NFC and NFD input must convert the same, and the
+spans must agree with the plain conversion.
+"""
+
+import random
+import unicodedata
+
+import pytest
+
+from utils.hindi_braille_converter import (
+    HINDI_TO_BRAILLE, HINDI_SEQUENCES, hindi_text_to_braille, hindi_text_to_braille_with_spans
+)
+
+RANDOM_CASES = 5000
+
+# text -> braille
+FIXTURES = {
+    "नमस्ते": "⠝⠍⠎⠈⠞⠑",
+    "क्ष": "⠟",
+    "क्षत्रिय": "⠟⠞⠈⠗⠊⠽",
+    "ज्ञान": "⠱⠜⠝",
+    "विज्ञान": "⠧⠊⠱⠜⠝",
+    "परीक्षा": "⠏⠗⠔⠟⠜",
+    # Decomposed and precomposed nukta letters
+    "क\u093cिला": "⠠⠅⠊⠇⠜",
+    "\u0958िला": "⠠⠅⠊⠇⠜",
+    "ज\u093cरूर": "⠠⠚⠗⠳⠗",
+    "\u095bरूर": "⠠⠚⠗⠳⠗",
+    "फ़ोन": "⠠⠋⠕⠝",
+    "ख़बर ग़लत": "⠠⠨⠃⠗⠀⠠⠛⠇⠞",
+    "ड़ ढ़ य़": "⠠⠙⠀⠠⠮⠀⠠⠽",
+    "ऩ ऱ": "⠠⠝⠀⠠⠗",
+    # Chandrabindu and long vocalic r
+    "यहाँ": "⠽⠓⠜⠄",
+    "माँ": "⠍⠜⠄",
+    "ॠ": "⠐⠗",
+    "कॄ": "⠅⠐⠗",
+    # The joiner only picks a half form; the non-joiner breaks the conjunct
+    "क्‍ष": "⠟",
+    "क्‌ष": "⠅⠈⠯",
+    # A nukta on a consonant without a nukta form is kept as it is
+    "ल़": "⠇़",
+    "": "",
+}
+
+
+def span_problems(text):
+    braille, offsets, lengths = hindi_text_to_braille_with_spans(text)
+    problems = []
+    if braille != hindi_text_to_braille(text):
+        problems.append("spans braille differs from plain conversion")
+    if len(offsets) != len(text) or len(lengths) != len(text):
+        problems.append("one span per character expected")
+    # Spans never go backwards and together cover the whole braille
+    end = 0
+    for offset, length in zip(offsets, lengths):
+        if offset < end and offset + length != end:
+            problems.append(f"span ({offset}, {length}) overlaps the previous one")
+            break
+        end = max(end, offset + length)
+    if end != len(braille):
+        problems.append(f"spans cover {end} of {len(braille)} cells")
+    return problems
+
+
+def random_text(rng):
+    alphabet = list(HINDI_TO_BRAILLE) + list(HINDI_SEQUENCES) + [
+        "़", "‍", "क़", "ख़", "ज़", "फ़", "ऩ", "ळ",
+    ]
+    return "".join(rng.choices(alphabet, k=rng.randint(1, 40)))
+
+
+
+@pytest.mark.parametrize("text, braille", FIXTURES.items())
+def test_fixture(text, braille):
+    assert hindi_text_to_braille(text) == braille
+    assert span_problems(text) == []
+
+
+def test_random_text():
+    rng = random.Random(0)
+    for _ in range(RANDOM_CASES):
+        text = random_text(rng)
+        nfc, nfd = (hindi_text_to_braille(unicodedata.normalize(form, text)) for form in ("NFC", "NFD"))
+        assert nfc == nfd, text
+        assert span_problems(text) == [], text
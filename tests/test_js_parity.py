@@ -0,0 +1,97 @@
+"""
+static/js/braille_engine.js, fed the exported tables, must give exactly
+the braille and detailed mapping of /api/text-to-braille, and decline
+(so the page falls back to the API) only on input the tables do not
+cover. Needs Node.js.
+"""
+
+import os
+import json
+import random
+import shutil
+import subprocess
+
+import pytest
+
+from utils.conversion import convert_text
+from utils.braille_converter import CHAR_TO_BRAILLE
+from utils.hindi_braille_converter import HINDI_TO_BRAILLE, HINDI_SEQUENCES, hindi_symbols
+from utils.table_export import render_tables_js
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE = os.path.join(ROOT, "static", "js", "braille_engine.js")
+RANDOM_CASES = 2000
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs Node.js")
+
+FIXTURES = [
+    *(("english", text) for text in [
+        "Hello World", "HELLO, world!", "abc 123", "1a 2b 9j 0k 5z", "12abc34def",
+        "room 101a", "(quoted) \"text\" - it's @home", "line one\nline two\ttab",
+        "a" * 500, "Mixed CASE 42Jumps", " ", "",
+        # Not covered by the tables: the page must fall back to the API
+        "café", "naïve 100%", "emoji 🙂", "İstanbul", "ΣΟΦΙΑ", "x=1+2",
+    ]),
+    *(("hindi", text) for text in [
+        "नमस्ते", "नमस्ते दुनिया", "क्षत्रिय ज्ञान", "हिंदी में, ब्रेल!", "कृष्ण ऋषि",
+        "विद्यालय\nपुस्तकालय",
+        "क़िला", "क\u093cिला", "ज़रूर फ़ोन", "ऩ ऱ", "यहाँ ॠषि", "क्\u200dष क्\u200cष", "\u200dक्ष\u200d",
+        "नमस्ते 123", "hello नमस्ते", "ळ\u093c", "\u093c",
+    ]),
+]
+
+NODE = """
+const fs = require('fs');
+const tables = require(process.argv[1]);
+const engine = require(process.argv[2]);
+const cases = JSON.parse(fs.readFileSync(0, 'utf8'));
+process.stdout.write(JSON.stringify(cases.map(([language, text]) => engine.convert(text, language, tables))));
+"""
+
+
+def random_cases(rng):
+    """Strings drawn from each table plus digits, case and a few uncovered characters."""
+    cases = []
+    for language, table in (("english", CHAR_TO_BRAILLE), ("hindi", HINDI_TO_BRAILLE)):
+        alphabet = list(table) + list("ABCDEFGHIJ0123456789\n") + ["é", "€", "ß"]
+        if language == "hindi":
+            alphabet += list(HINDI_SEQUENCES) + ["\u093c", "\u200d", "\u0958", "\u095b"]
+        for _ in range(RANDOM_CASES):
+            cases.append((language, "".join(rng.choices(alphabet, k=rng.randint(1, 30)))))
+    return cases
+
+
+def expected(language, text):
+    """The API's answer, or None if the tables do not cover the text."""
+    if language == "hindi":
+        # Conjuncts and nukta forms are covered; the characters left over must be
+        symbols = [symbol for symbol in hindi_symbols(text) if len(symbol) == 1]
+        if any(symbol not in HINDI_TO_BRAILLE and symbol not in "\n\r\t" for symbol in symbols):
+            return None
+    elif any(char.lower() not in CHAR_TO_BRAILLE and char not in "\n\r\t" for char in text):
+        return None
+    braille, mapping = convert_text(text, language, "legacy")
+    return {"braille": braille, "detailed_mapping": mapping}
+
+
+def run_engine(cases, tmp_path):
+    tables = tmp_path / "braille_tables.js"
+    tables.write_text(render_tables_js(), encoding="utf-8")
+    output = subprocess.run(["node", "-e", NODE, str(tables), ENGINE], input=json.dumps(cases),
+                            capture_output=True, text=True, encoding="utf-8", check=True).stdout
+    return json.loads(output)
+
+
+@pytest.mark.parametrize("language, text", FIXTURES)
+def test_fixture_matches_api(language, text, tmp_path):
+    [actual] = run_engine([(language, text)], tmp_path)
+    assert actual == expected(language, text)
+
+
+def test_random_text_matches_api(tmp_path):
+    cases = random_cases(random.Random(0))
+    mismatches = [
+        (language, text) for (language, text), actual in zip(cases, run_engine(cases, tmp_path))
+        if actual != expected(language, text)
+    ]
+    assert mismatches == []
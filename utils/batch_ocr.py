@@ -0,0 +1,277 @@
+"""
+Batch OCR for many images or a multi-page PDF.
+
+Pages are fanned out over a process pool sized to the CPU count and the
+results are returned in page order. The pool is a JobQueue of its own, so
+each page has the same time limit from when it starts as a background job,
+and a page stuck past it gets its worker replaced. PDFs are rendered with
+poppler's ``pdftoppm`` through pipes, so no page images are written to disk.
+"""
+
+import os
+import time
+import logging
+import threading
+import subprocess
+from io import BytesIO
+from collections import deque
+import numpy as np
+from PIL import Image
+from utils.conversion import convert_text
+from utils.image_processor import ocr_image, OCR_PIPELINE_VERSION
+from utils.job_queue import JobQueue, JobTimeoutError, QueueFullError
+from utils.result_cache import result_cache
+
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", os.cpu_count() or 1))
+BATCH_MAX_PAGES = int(os.environ.get("BATCH_MAX_PAGES", 200))
+BATCH_PAGE_TIMEOUT = float(os.environ.get("BATCH_PAGE_TIMEOUT", 60))
+# Pages submitted but not yet collected; a rendered 300 dpi page is about
+# 8 MB, so this bounds the memory a long PDF can hold
+BATCH_MAX_IN_FLIGHT = int(os.environ.get("BATCH_MAX_IN_FLIGHT", 2 * BATCH_WORKERS))
+# Pages in flight across all batches running at once
+BATCH_MAX_PENDING = int(os.environ.get("BATCH_MAX_PENDING", 4 * BATCH_MAX_IN_FLIGHT))
+PDF_DPI = int(os.environ.get("PDF_DPI", 300))
+
+# Workers are started on the first batch
+batch_queue = JobQueue(max_workers=BATCH_WORKERS, max_pending=BATCH_MAX_PENDING,
+                       timeout=BATCH_PAGE_TIMEOUT)
+
+class BatchTooLargeError(Exception):
+    """Raised when a batch has more than BATCH_MAX_PAGES pages."""
+
+class PdfError(Exception):
+    """Raised when a PDF cannot be read or rendered."""
+
+def ocr_page_task(page, language='english', mapping='legacy'):
+    """
+    OCR one page and convert it to Braille.
+
+    Args:
+        page: Encoded image bytes, or a NumPy array for a rendered PDF page
+        language (str): 'english' or 'hindi'
+        mapping (str): detailed_mapping format, see MAPPING_FORMATS
+
+    Returns:
+        dict: 'text', 'braille', 'detailed_mapping' and 'seconds', or
+        'error' and 'seconds' if the page failed
+    """
+    start = time.perf_counter()
+    # Image pages share cache entries with /api/image-to-text; rendered PDF
+    # pages are keyed by their pixels and shape
+    if isinstance(page, bytes):
+        key = result_cache.key(page, OCR_PIPELINE_VERSION, language, mapping)
+    else:
+        key = result_cache.key(page.tobytes(), OCR_PIPELINE_VERSION, language, mapping,
+                               "x".join(map(str, page.shape)))
+    cached = result_cache.get(key)
+    if cached is not None:
+        cached.pop('language', None)
+        cached['seconds'] = round(time.perf_counter() - start, 4)
+        return cached
+
+    try:
+        image = Image.open(BytesIO(page)) if isinstance(page, bytes) else page
+        text = ocr_image(image, lang='hin' if language == 'hindi' else 'eng',
+                         timeout=BATCH_PAGE_TIMEOUT)
+        if not text:
+            result = {'error': 'No text detected in the image'}
+        else:
+            braille, detailed_mapping = convert_text(text, language, mapping)
+            result = {'text': text, 'braille': braille, 'detailed_mapping': detailed_mapping}
+            result_cache.set(key, {**result, 'language': language})
+    except JobTimeoutError:
+        result = {'error': f'Page timed out after {BATCH_PAGE_TIMEOUT:g} seconds'}
+    except Exception as e:
+        # pytesseract errors cannot be unpickled in the parent process
+        result = {'error': str(e)}
+    result['seconds'] = round(time.perf_counter() - start, 4)
+    return result
+
+def _read_exact(stream, size):
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise PdfError("Unexpected end of rendered PDF page")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+def _read_pnm(stream):
+    """Read one binary PGM/PPM image from a stream, or None at the end."""
+    tokens = []
+    token = b""
+    while len(tokens) < 4:
+        byte = stream.read(1)
+        if not byte:
+            if tokens or token:
+                raise PdfError("Truncated rendered PDF page header")
+            return None
+        if byte.isspace():
+            if token:
+                tokens.append(token)
+                token = b""
+        else:
+            token += byte
+    magic, width, height = tokens[0], int(tokens[1]), int(tokens[2])
+    channels = {b"P5": 1, b"P6": 3}.get(magic)
+    if channels is None or int(tokens[3]) > 255:
+        raise PdfError("Unsupported rendered PDF page format")
+    data = _read_exact(stream, width * height * channels)
+    shape = (height, width) if channels == 1 else (height, width, 3)
+    return np.frombuffer(data, dtype=np.uint8).reshape(shape)
+
+def check_batch_size(page_count):
+    """
+    Reject a batch before any of it is OCRed.
+
+    Raises:
+        BatchTooLargeError: If there are more than BATCH_MAX_PAGES pages
+    """
+    if page_count > BATCH_MAX_PAGES:
+        raise BatchTooLargeError(f"Batches are limited to {BATCH_MAX_PAGES} pages")
+
+def count_pdf_pages(pdf_bytes):
+    """
+    Count the pages of a PDF with poppler's ``pdfinfo``.
+
+    Raises:
+        PdfError: If the PDF cannot be read
+    """
+    info = subprocess.run(["pdfinfo", "-"], input=pdf_bytes, capture_output=True)
+    if info.returncode == 0:
+        for line in info.stdout.splitlines():
+            if line.startswith(b"Pages:"):
+                return int(line.split()[1])
+    error = info.stderr.decode("utf-8", "replace").strip()
+    raise PdfError(f"Could not read PDF: {error or 'no page count'}")
+
+def iter_pdf_pages(pdf_bytes, dpi=PDF_DPI):
+    """
+    Render a PDF to grayscale page images with pdftoppm.
+
+    Args:
+        pdf_bytes (bytes): The PDF document
+        dpi (int): Render resolution
+
+    Yields:
+        numpy.ndarray: One grayscale image per page, in order
+
+    Raises:
+        PdfError: If the PDF cannot be rendered
+    """
+    process = subprocess.Popen(
+        ["pdftoppm", "-r", str(dpi), "-gray", "-"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    def feed():
+        try:
+            process.stdin.write(pdf_bytes)
+        except BrokenPipeError:
+            pass
+        finally:
+            process.stdin.close()
+
+    # Write from a thread so a full stdout pipe cannot deadlock us
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    finished = False
+    try:
+        while True:
+            page = _read_pnm(process.stdout)
+            if page is None:
+                break
+            yield page
+        finished = True
+    finally:
+        if not finished:
+            # Stopped early, e.g. the batch failed; nothing more is wanted
+            process.kill()
+        process.stdout.close()
+        writer.join()
+        returncode = process.wait()
+    if returncode != 0:
+        error = process.stderr.read().decode("utf-8", "replace").strip()
+        raise PdfError(f"Could not render PDF: {error or 'pdftoppm failed'}")
+
+def ocr_batch(pages, language='english', mapping='legacy'):
+    """
+    OCR many pages in parallel and return the results in page order.
+
+    Pages are submitted as they arrive, so rendering a PDF overlaps with
+    the OCR of its earlier pages. At most BATCH_MAX_IN_FLIGHT pages are
+    submitted and not yet collected; the next page is only read once the
+    oldest one is done, which also holds back the PDF renderer.
+
+    Args:
+        pages: Iterable of encoded image bytes or NumPy page images
+        language (str): 'english' or 'hindi'
+        mapping (str): detailed_mapping format, see MAPPING_FORMATS
+
+    Returns:
+        dict: 'pages' (one result per page, with its 1-based 'page' number)
+        and 'timing' (a summary of the batch)
+
+    Raises:
+        BatchTooLargeError: If there are more than BATCH_MAX_PAGES pages;
+            callers should check with check_batch_size first when they can
+            count the pages, so no work is thrown away
+        QueueFullError: If other batches hold every slot of the pool
+    """
+    start = time.perf_counter()
+    in_flight = deque()
+    results = []
+
+    def collect():
+        job_id, submitted_at = in_flight.popleft()
+        status = batch_queue.wait(job_id)
+        if status is not None and status['status'] == 'done':
+            result = status['result']
+        else:
+            # Timed out, or stopped with another page that did
+            result = {'error': status['error'] if status else 'Page was lost',
+                      'seconds': round(time.perf_counter() - submitted_at, 4)}
+        result['page'] = len(results) + 1
+        results.append(result)
+
+    def submit(page):
+        while True:
+            try:
+                return batch_queue.submit(ocr_page_task, page, language, mapping)
+            except QueueFullError:
+                # Other batches fill the queue; wait on our own pages first
+                if not in_flight:
+                    raise
+                collect()
+
+    submitted = 0
+    try:
+        for page in pages:
+            if submitted >= BATCH_MAX_PAGES:
+                raise BatchTooLargeError(f"Batches are limited to {BATCH_MAX_PAGES} pages")
+            in_flight.append((submit(page), time.perf_counter()))
+            submitted += 1
+            if len(in_flight) >= max(BATCH_MAX_IN_FLIGHT, 1):
+                collect()
+        while in_flight:
+            collect()
+    except BaseException:
+        for job_id, submitted_at in in_flight:
+            batch_queue.cancel(job_id)
+        raise
+
+    total = time.perf_counter() - start
+    page_seconds = [result['seconds'] for result in results]
+    logging.debug(f"OCR batch of {len(results)} pages took {total:.2f}s")
+    return {
+        'pages': results,
+        'timing': {
+            'pages': len(results),
+            'workers': BATCH_WORKERS,
+            'total_seconds': round(total, 4),
+            'mean_page_seconds': round(sum(page_seconds) / len(page_seconds), 4) if page_seconds else 0,
+            'max_page_seconds': max(page_seconds, default=0),
+            'pages_per_second': round(len(results) / total, 2) if total else 0
+        }
+    }
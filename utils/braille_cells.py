@@ -0,0 +1,119 @@
+"""
+Packed Braille cells: one byte per cell.
+
+A cell's byte is its dot pattern, the offset of its code point from
+U+2800 (bit 0 is dot 1 ... bit 7 is dot 8), the same encoding
+utils/braille_image_processor.py builds cells from. Packed output is a
+third of the size of UTF-8 Braille and lines up one-to-one with the
+Unicode string, so mapping offsets and lengths apply to it unchanged.
+
+The converters only produce six-dot cells, so three eight-dot patterns
+are reserved for the characters they pass through: 0xFF is a line feed,
+0xFE a carriage return and 0xFD a tab. Anything else outside the Braille
+block cannot be packed.
+"""
+
+import re
+import base64
+from utils.braille_converter import BRAILLE_BASE
+
+# Name clients can check before decoding
+CELL_ENCODING = 'dots-u8'
+
+# In UTF-8, U+2800 + p is E2, A0 | p >> 6, 80 | p & 0x3F. Packing and
+# unpacking move those bits with slices and bytes.translate, which run in
+# C; a str.translate table would cost a dict lookup per cell.
+_HIGH_BITS = bytes((byte & 0x03) << 6 for byte in range(256))
+_LOW_BITS = bytes(byte & 0x3F for byte in range(256))
+_SECOND_BYTE = bytes(0xA0 | byte >> 6 for byte in range(256))
+_THIRD_BYTE = bytes(0x80 | byte & 0x3F for byte in range(256))
+
+# Pass-through characters and the byte each is packed as
+RESERVED_CELLS = {'\n': 0xFF, '\r': 0xFE, '\t': 0xFD}
+_RESERVED_TO_BRAILLE = str.maketrans({char: chr(BRAILLE_BASE + byte) for char, byte in RESERVED_CELLS.items()})
+_BRAILLE_TO_RESERVED = str.maketrans({chr(BRAILLE_BASE + byte): char for char, byte in RESERVED_CELLS.items()})
+# Characters with no byte: outside the Braille block and not reserved, or
+# one of the reserved patterns as a real cell
+UNPACKABLE = re.compile('[^⠀-⣼\n\r\t]')
+# Quick check for anything that needs more than the plain bit moves
+NOT_PLAIN = re.compile('[^⠀-⣼]')
+
+class UnpackableError(ValueError):
+    """
+    Raised for Braille with characters that have no packed byte.
+
+    Attributes:
+        count (int): How many characters could not be packed
+        offset (int): Offset of the first one
+    """
+
+    def __init__(self, count, offset, char):
+        super().__init__(
+            f"{count} character(s) have no packed Braille cell, the first {char!r} at offset {offset}"
+        )
+        self.count = count
+        self.offset = offset
+
+def pack_cells(braille):
+    """
+    Pack Unicode Braille into one byte per cell.
+
+    Line feeds, carriage returns and tabs are packed as their reserved
+    bytes, see RESERVED_CELLS.
+
+    Args:
+        braille (str): Unicode Braille
+
+    Returns:
+        bytes: The dot pattern of each cell
+
+    Raises:
+        UnpackableError: If a character has no packed byte
+    """
+    if NOT_PLAIN.search(braille):
+        first = UNPACKABLE.search(braille)
+        if first:
+            count = sum(1 for _ in UNPACKABLE.finditer(braille))
+            raise UnpackableError(count, first.start(), first.group())
+        braille = braille.translate(_RESERVED_TO_BRAILLE)
+    encoded = braille.encode('utf-8')
+    # The two halves of each pattern never share bits, so OR-ing them as
+    # big integers combines every cell at once
+    high = int.from_bytes(encoded[1::3].translate(_HIGH_BITS), 'big')
+    low = int.from_bytes(encoded[2::3].translate(_LOW_BITS), 'big')
+    return (high | low).to_bytes(len(braille), 'big')
+
+def unpack_cells(cells):
+    """
+    Unpack bytes from pack_cells back to Unicode Braille.
+
+    Args:
+        cells (bytes): One dot pattern per cell
+
+    Returns:
+        str: Unicode Braille
+    """
+    cells = bytes(cells)
+    encoded = bytearray(3 * len(cells))
+    encoded[0::3] = b'\xe2' * len(cells)
+    encoded[1::3] = cells.translate(_SECOND_BYTE)
+    encoded[2::3] = cells.translate(_THIRD_BYTE)
+    braille = encoded.decode('utf-8')
+    if any(bytes((byte,)) in cells for byte in RESERVED_CELLS.values()):
+        braille = braille.translate(_BRAILLE_TO_RESERVED)
+    return braille
+
+def pack_cells_base64(braille):
+    """
+    Pack Unicode Braille and encode it as base64 text for JSON bodies.
+
+    Args:
+        braille (str): Unicode Braille
+
+    Returns:
+        str: Base64 of the packed cells
+
+    Raises:
+        UnpackableError: If a character has no packed byte
+    """
+    return base64.b64encode(pack_cells(braille)).decode('ascii')
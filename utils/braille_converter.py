@@ -1,5 +1,9 @@
 # Braille Conversion Utility
 
+import re
+from utils.metrics import timed
+from utils.translation_engine import compile_table, translate, translate_with_spans
+
 # Mapping of English characters to Braille Unicode characters
 CHAR_TO_BRAILLE = {
     'a': '⠁', 'b': '⠃', 'c': '⠉', 'd': '⠙', 'e': '⠑',
@@ -18,6 +22,20 @@ CHAR_TO_BRAILLE = {
 # Mapping of Braille Unicode characters to English characters
 BRAILLE_TO_CHAR = {v: k for k, v in CHAR_TO_BRAILLE.items()}
 
+NUMBER_SIGN = '⠼'
+LETTER_SIGN = '⠰'
+BRAILLE_BASE = 0x2800
+
+# A letter a-j right after a digit needs the letter sign, otherwise it
+# reads as one more digit. A private-use marker is inserted before such
+# letters and translated to the letter sign.
+LETTER_AFTER_DIGIT = re.compile(r'(?<=[0-9])(?=[a-j])')
+LETTER_SIGN_MARKER = '\ue000'
+
+# Compiled once at import; see utils/translation_engine.py
+CHAR_TABLE = compile_table({**CHAR_TO_BRAILLE, LETTER_SIGN_MARKER: LETTER_SIGN})
+
+@timed("braille_conversion_seconds", language="english")
 def text_to_braille(text):
     """
     Convert English text to Braille characters.
@@ -28,41 +46,147 @@ def text_to_braille(text):
     Returns:
         str: The Braille representation of the text
     """
-    result = ""
+    return translate(LETTER_AFTER_DIGIT.sub(LETTER_SIGN_MARKER, text.lower()), CHAR_TABLE)
+
+@timed("braille_conversion_seconds", language="english")
+def text_to_braille_with_spans(text):
+    """
+    Convert English text to Braille and record each character's span.
     
-    for char in text.lower():
-        braille_char = CHAR_TO_BRAILLE.get(char, char)
-        result += braille_char
+    Args:
+        text (str): The English text to convert
+        
+    Returns:
+        tuple: (braille, offsets, lengths), see translate_with_spans
+    """
+    lowered = text.lower()
+    marked = LETTER_AFTER_DIGIT.sub(LETTER_SIGN_MARKER, lowered)
+    braille, offsets, lengths = translate_with_spans(marked, CHAR_TABLE)
+    if len(marked) != len(lowered):
+        # Fold each letter sign into the span of the letter that follows it
+        merged_offsets, merged_lengths = [], []
+        sign_offset = None
+        for char, offset, length in zip(marked, offsets, lengths):
+            if char == LETTER_SIGN_MARKER:
+                sign_offset = offset
+            elif sign_offset is not None:
+                merged_offsets.append(sign_offset)
+                merged_lengths.append(length + offset - sign_offset)
+                sign_offset = None
+            else:
+                merged_offsets.append(offset)
+                merged_lengths.append(length)
+        offsets, lengths = merged_offsets, merged_lengths
+    if len(lowered) == len(text):
+        return braille, offsets, lengths
+    
+    # A few characters lower-case to several (İ to i and a combining dot);
+    # give each source character the spans of all of its lower-case ones
+    source_offsets, source_lengths = [], []
+    position = 0
+    for char in text:
+        count = len(char.lower())
+        source_offsets.append(offsets[position])
+        source_lengths.append(offsets[position + count - 1] + lengths[position + count - 1] - offsets[position])
+        position += count
+    return braille, source_offsets, source_lengths
+
+# Decoder tables for braille_to_text
+
+def _build_decoder():
+    """
+    Compile CHAR_TO_BRAILLE into the tables used by braille_to_text.
     
-    return result
+    Returns:
+        tuple: (cells, digits, trie) where cells and digits are 256-entry
+        lists indexed by dot pattern, and trie holds multi-cell symbols as
+        nested dicts with the decoded character under the key None
+    """
+    cells = [None] * 256
+    digits = [None] * 256
+    trie = {}
+    for char, braille in CHAR_TO_BRAILLE.items():
+        if len(braille) == 2 and braille[0] == NUMBER_SIGN:
+            digits[ord(braille[1]) - BRAILLE_BASE] = char
+        elif len(braille) == 1:
+            # On collisions the first entry wins ('?' before '"')
+            if cells[ord(braille) - BRAILLE_BASE] is None:
+                cells[ord(braille) - BRAILLE_BASE] = char
+        else:
+            node = trie
+            for cell in braille:
+                node = node.setdefault(cell, {})
+            node[None] = char
+    return cells, digits, trie
+
+DECODE_CELLS, DECODE_DIGITS, DECODE_TRIE = _build_decoder()
 
 def braille_to_text(braille):
     """
     Convert Braille characters to English text.
     
+    Decodes in a single pass: cells are looked up by dot pattern,
+    multi-cell symbols such as ⠐⠣ are matched longest-first through a
+    prefix trie, and the number sign switches to digits until a space
+    or a non-digit cell. ⠦ is shared by '?' and '"' and reads as '?'.
+    
     Args:
         braille (str): The Braille text to convert
         
     Returns:
         str: The English representation of the Braille
     """
-    result = ""
+    cells, digits, trie = DECODE_CELLS, DECODE_DIGITS, DECODE_TRIE
+    result = []
+    number_mode = False
     i = 0
+    length = len(braille)
     
-    while i < len(braille):
-        # Check for number sign (⠼)
-        if braille[i:i+2] == '⠼' and i+1 < len(braille):
+    while i < length:
+        cell = braille[i]
+        
+        if cell == NUMBER_SIGN:
+            number_mode = True
             i += 1
-            if i < len(braille) and braille[i] in BRAILLE_TO_CHAR:
-                result += BRAILLE_TO_CHAR.get(braille[i], braille[i])
-        else:
-            if braille[i] in BRAILLE_TO_CHAR:
-                result += BRAILLE_TO_CHAR.get(braille[i], braille[i])
-            else:
-                result += braille[i]
+            continue
+        if cell == LETTER_SIGN:
+            number_mode = False
+            i += 1
+            continue
+        
+        index = ord(cell) - BRAILLE_BASE
+        if not 0 <= index < 256:
+            # Not a Braille cell (e.g. the ASCII space between detected rows)
+            number_mode = False
+            result.append(cell)
+            i += 1
+            continue
+        
+        if number_mode and digits[index] is not None:
+            result.append(digits[index])
+            i += 1
+            continue
+        number_mode = False
+        
+        # Longest match over multi-cell symbols
+        node = trie.get(cell)
+        match, match_end = None, i
+        j = i
+        while node is not None:
+            j += 1
+            if None in node:
+                match, match_end = node[None], j
+            node = node.get(braille[j]) if j < length else None
+        if match is not None:
+            result.append(match)
+            i = match_end
+            continue
+        
+        char = cells[index]
+        result.append(cell if char is None else char)
         i += 1
     
-    return result
+    return "".join(result)
 
 def get_detailed_braille_mapping(text):
     """
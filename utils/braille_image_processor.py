@@ -1,11 +1,14 @@
-import logging
-import tempfile
 import os
+import math
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import cv2
 import base64
 from PIL import Image
 from utils.braille_converter import braille_to_text
+from utils.metrics import timer
 
 # Standard Braille pattern (2x3 grid)
 # Each position is numbered:
@@ -13,216 +16,562 @@ from utils.braille_converter import braille_to_text
 # 2 5
 # 3 6
 
-def detect_braille_from_image(image_file):
+# Positions per cell along each axis
+CELL_COLUMNS = 2
+CELL_ROWS = 3
+
+# Gap between cells, as a multiple of the dot spacing, used when a page
+# has too few cells to measure it (roughly the standard embossed layout)
+DEFAULT_CELL_GAP = {CELL_COLUMNS: 1.5, CELL_ROWS: 2.0}
+# Largest relative difference between the cell pitch measured from the gaps
+# and the one the dot spacing implies; pages whose cells only use some dot
+# rows or columns (only a-j, say) measure a gap that is not the cell gap
+PITCH_TOLERANCE = 0.15
+
+# Dot filters, tuned for pages processed at BRAILLE_MAX_DIMENSION; the
+# area limits scale with the square of the resolution
+BRAILLE_MAX_DIMENSION = 1200
+MIN_DOT_AREA = 5
+MAX_DOT_AREA = 500
+CIRCULARITY_THRESHOLD = 0.7  # 1 is a perfect circle
+# Roundness limits for the connected-components extractor: shortest over
+# longest bounding box side, and 4*pi*area / perimeter**2 measured on
+# pixels (close to 1 for dots, lower for specks and scratches)
+MIN_DOT_ASPECT = 0.5
+MIN_DOT_ROUNDNESS = 0.8
+
+# Dot extractor: 'contours' or 'components', see DOT_EXTRACTORS
+BRAILLE_DOT_EXTRACTOR = os.environ.get("BRAILLE_DOT_EXTRACTOR", "contours")
+
+# Tiled mode ('auto' or 'off'): pages larger than BRAILLE_MAX_DIMENSION are
+# processed at full resolution in overlapping tiles on a thread pool
+# instead of being shrunk, so small dots on high-dpi scans survive
+BRAILLE_TILED = os.environ.get("BRAILLE_TILED", "auto")
+BRAILLE_TILE_SIZE = int(os.environ.get("BRAILLE_TILE_SIZE", 1024))
+BRAILLE_TILE_WORKERS = int(os.environ.get("BRAILLE_TILE_WORKERS", os.cpu_count() or 1))
+BRAILLE_TILED_MAX_DIMENSION = int(os.environ.get("BRAILLE_TILED_MAX_DIMENSION", 8000))
+
+# Identifies the detection pipeline in result cache keys; bump it when a
+# change alters the detected text or the preview image
+BRAILLE_PIPELINE_VERSION = f"braille-2:{BRAILLE_TILED}:{BRAILLE_DOT_EXTRACTOR}"
+
+_tile_executor = None
+_tile_executor_lock = threading.Lock()
+
+def estimate_dot_spacing(dots):
     """
-    Detect Braille patterns from an image and convert them to text.
+    Estimate the distance between adjacent dots inside a Braille cell.
+    
+    Uses the median nearest-neighbour distance, found with OpenCV's
+    FLANN KD-tree so dense pages do not need every pairwise distance.
     
     Args:
-        image_file: Flask file object containing the image
+        dots (numpy.ndarray): Array of shape (n, 2) with dot centres
         
     Returns:
-        tuple: (extracted_text, braille_dots_image_base64)
+        float: The estimated dot spacing in pixels
+    """
+    points = np.ascontiguousarray(dots, dtype=np.float32)
+    index = cv2.flann_Index(points, dict(algorithm=1, trees=4))
+    _, sq_distances = index.knnSearch(points, 2, params=dict(checks=32))
+    # Column 0 is the query point itself
+    nearest = np.sqrt(sq_distances[:, 1])
+    nearest = nearest[nearest > 0]
+    if nearest.size == 0:
+        raise ValueError("Could not estimate Braille dot spacing")
+    return float(np.median(nearest))
+
+def _cluster_positions(values, spacing):
     """
-    temp_filename = None
-    processed_image_path = None
+    Cluster 1-D dot coordinates into dot lines by gap analysis.
     
-    try:
-        # Create a temporary file to save the uploaded image
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.png') as temp:
-            temp_filename = temp.name
-            image_file.save(temp_filename)
-        
-        # Open the image with OpenCV
-        image = cv2.imread(temp_filename)
-        if image is None:
-            raise ValueError("Could not read image file")
-        
-        # Get image dimensions
-        height, width = image.shape[:2]
-        
-        # Resize if the image is too large
-        max_dimension = 1200
-        if height > max_dimension or width > max_dimension:
-            scale = max_dimension / max(height, width)
-            image = cv2.resize(image, None, fx=scale, fy=scale)
-            height, width = image.shape[:2]
+    Args:
+        values (numpy.ndarray): Dot coordinates along one axis
+        spacing (float): The estimated dot spacing
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # Apply Gaussian blur to reduce noise
-        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-        
-        # Apply adaptive thresholding to get binary image
-        binary = cv2.adaptiveThreshold(
-            blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY_INV, 11, 2
-        )
-        
-        # Find contours - these should represent the Braille dots
-        contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # Filter contours by size and shape to get only the Braille dots
-        min_area = 5  # Minimum area of a Braille dot
-        max_area = 500  # Maximum area of a Braille dot
-        circularity_threshold = 0.7  # Threshold for circularity (1 is perfect circle)
-        braille_dots = []
-        
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if min_area <= area <= max_area:
-                # Calculate circularity
-                perimeter = cv2.arcLength(contour, True)
-                if perimeter > 0:
-                    circularity = 4 * np.pi * area / (perimeter * perimeter)
-                    if circularity >= circularity_threshold:
-                        # Get the center of the contour
-                        M = cv2.moments(contour)
-                        if M["m00"] != 0:
-                            cX = int(M["m10"] / M["m00"])
-                            cY = int(M["m01"] / M["m00"])
-                            braille_dots.append((cX, cY))
-        
-        # Draw detected dots on the image for visualization
-        dot_image = image.copy()
-        for dot in braille_dots:
-            cv2.circle(dot_image, dot, 5, (0, 255, 0), -1)
-        
-        # Group dots into Braille cells
-        # First, estimate the average distance between dots
-        if len(braille_dots) < 2:
-            raise ValueError("Not enough Braille dots detected")
+    Returns:
+        numpy.ndarray: Sorted centre of each cluster
+    """
+    ordered = np.sort(values)
+    starts = np.flatnonzero(np.diff(ordered) > spacing / 2) + 1
+    starts = np.concatenate(([0], starts))
+    sums = np.add.reduceat(ordered, starts)
+    counts = np.diff(np.append(starts, ordered.size))
+    return sums / counts
+
+def _quantize(coords, origin, pitch, step, positions):
+    relative = coords - origin
+    cell_index = np.floor((relative + step / 2) / pitch)
+    offset = (relative - cell_index * pitch) / step
+    position = np.clip(np.rint(offset), 0, positions - 1)
+    return cell_index, position, np.abs(offset - position)
+
+def fit_lattice(values, spacing, positions, seed=None):
+    """
+    Fit the cell lattice along one axis.
+    
+    Dot lines are clustered from the coordinates, the dot step and the
+    gap between cells are measured from the gaps between dot lines, and
+    the lattice phase is chosen so that the most dot lines land on a dot
+    position. The measured pitch is checked against the one the dot step
+    implies (DEFAULT_CELL_GAP), and the implied one is used when they
+    disagree.
+    The fit is then refined by least squares so long lines do not drift
+    off the lattice.
+    
+    Args:
+        values (numpy.ndarray): Dot coordinates along one axis
+        spacing (float): The estimated dot spacing
+        positions (int): Dot positions per cell along this axis
+        seed (tuple): (origin, pitch, step) of an earlier fit of the same
+            page, e.g. the previous camera frame; its step and pitch are
+            used instead of measuring them again, and only the phase is
+            searched
+        
+    Returns:
+        tuple: ((origin, pitch, step), share of dot lines on the lattice)
+    """
+    centres = _cluster_positions(values, spacing)
+    
+    if seed is not None:
+        _, pitch, step = seed
+    else:
+        gaps = np.diff(centres)
+        
+        # Steps inside a cell are close to the dot spacing; measure them here
+        # since the cluster centres average out the jitter of single dots
+        steps = gaps[gaps <= spacing * 1.25]
+        step = float(np.median(steps)) if steps.size else spacing
         
-        # Calculate the distances between each pair of dots
-        distances = []
-        for i in range(len(braille_dots)):
-            for j in range(i+1, len(braille_dots)):
-                dist = np.sqrt((braille_dots[i][0] - braille_dots[j][0])**2 + 
-                              (braille_dots[i][1] - braille_dots[j][1])**2)
-                distances.append(dist)
-        
-        # Estimate the distance between adjacent dots in a Braille cell
-        distances.sort()
-        cell_height = 0
-        cell_width = 0
-        
-        # Take the smallest 25% of distances to estimate dot spacing within a cell
-        n = max(1, len(distances) // 4)
-        dot_spacing = sum(distances[:n]) / n
-        
-        # Vertical and horizontal spacing between cells
-        cell_height = dot_spacing * 3  # 3 positions high
-        cell_width = dot_spacing * 2   # 2 positions wide
-        
-        # Group dots into rows
-        rows = {}
-        row_tolerance = dot_spacing / 2
-        
-        for dot in braille_dots:
-            assigned = False
-            for row_y in list(rows.keys()):
-                if abs(dot[1] - row_y) < row_tolerance:
-                    rows[row_y].append(dot)
-                    assigned = True
+        # Gaps between cells are the smallest gaps clearly wider than a dot step
+        expected = step * (positions - 1 + DEFAULT_CELL_GAP[positions])
+        pitch = expected
+        cell_gaps = gaps[gaps > step * 1.25]
+        if cell_gaps.size:
+            base = np.percentile(cell_gaps, 10)
+            cell_gap = float(np.median(cell_gaps[cell_gaps <= base * 1.3]))
+            # The gap follows the last dot position the cells use, which is
+            # the last one unless the page only uses some rows or columns
+            for last in range(positions - 1, -1, -1):
+                if abs(step * last + cell_gap - expected) <= expected * PITCH_TOLERANCE:
+                    pitch = step * last + cell_gap
                     break
-            
-            if not assigned:
-                rows[dot[1]] = [dot]
+    
+    # Try every dot line within the first cell as the lattice origin
+    candidates = centres[centres < centres[0] + pitch]
+    offsets = np.mod(centres[None, :] - candidates[:, None], pitch) / step
+    nearest = np.clip(np.rint(offsets), 0, positions - 1)
+    fits = (np.abs(offsets - nearest) < 1 / 3).sum(axis=1)
+    origin = candidates[int(np.argmax(fits))]
+    
+    # Refine origin, pitch and step against the dot lines that fit
+    for _ in range(2):
+        cell_index, position, error = _quantize(centres, origin, pitch, step, positions)
+        fitted = error < 1 / 3
+        if np.unique(cell_index[fitted]).size < 2:
+            break
+        design = np.column_stack((np.ones(fitted.sum()), cell_index[fitted], position[fitted]))
+        if np.unique(position[fitted]).size < 2:
+            design = design[:, :2]
+        solution = np.linalg.lstsq(design, centres[fitted], rcond=None)[0]
+        origin, pitch = solution[0], solution[1]
+        if solution.size > 2:
+            step = solution[2]
+    
+    # Shift the origin back a whole cell if dots sit before it
+    origin -= pitch * np.ceil(max(origin - centres[0] - step / 2, 0) / pitch)
+    
+    _, _, error = _quantize(centres, origin, pitch, step, positions)
+    return (float(origin), float(pitch), float(step)), float(np.mean(error < 1 / 3))
+
+def fit_lattice_axis(values, spacing, positions):
+    """
+    Fit the cell lattice along one axis and quantize dots onto it.
+    
+    Args:
+        values (numpy.ndarray): Dot coordinates along one axis
+        spacing (float): The estimated dot spacing
+        positions (int): Dot positions per cell along this axis
         
-        # Sort rows by y-coordinate
-        sorted_rows = sorted(rows.items(), key=lambda x: x[0])
+    Returns:
+        tuple: (cell_index, position_index) arrays, one entry per dot
+    """
+    lattice, _ = fit_lattice(values, spacing, positions)
+    return quantize_axis(values, lattice, positions)
+
+def quantize_axis(values, lattice, positions):
+    """
+    Quantize dot coordinates onto a fitted lattice.
+    
+    Args:
+        values (numpy.ndarray): Dot coordinates along one axis
+        lattice (tuple): (origin, pitch, step) from fit_lattice
+        positions (int): Dot positions per cell along this axis
         
-        # Define a function to determine if a dot is present at a specific position in a cell
-        def is_dot_at_position(dots, cell_x, cell_y, position):
-            # Calculate expected coordinates based on position
-            x_offset = 0 if position in [1, 2, 3] else dot_spacing
-            y_offset = 0 if position in [1, 4] else (dot_spacing if position in [2, 5] else 2*dot_spacing)
-            
-            expected_x = cell_x + x_offset
-            expected_y = cell_y + y_offset
-            
-            # Check if any dot is close to the expected position
-            for dot in dots:
-                if (abs(dot[0] - expected_x) < dot_spacing/2 and 
-                    abs(dot[1] - expected_y) < dot_spacing/2):
-                    return True
-            return False
-        
-        # Group dots into cells and convert to Braille
-        braille_chars = []
-        
-        # Process each row
-        for row_y, row_dots in sorted_rows:
-            # Sort dots in row by x-coordinate
-            row_dots.sort(key=lambda dot: dot[0])
-            
-            # Group dots into cells (adjacent groups)
-            cells = []
-            cell_start_x = row_dots[0][0]
-            current_cell = []
-            
-            for dot in row_dots:
-                if not current_cell or dot[0] - current_cell[-1][0] < cell_width:
-                    current_cell.append(dot)
-                else:
-                    cells.append(current_cell)
-                    current_cell = [dot]
-            
-            if current_cell:
-                cells.append(current_cell)
+    Returns:
+        tuple: (cell_index, position_index) arrays, one entry per dot
+    """
+    origin, pitch, step = lattice
+    cell_index, position, _ = _quantize(np.asarray(values, dtype=np.float64), origin, pitch, step, positions)
+    return cell_index.astype(np.int64), position.astype(np.int64)
+
+def cells_from_dots(dots, lattice):
+    """
+    Build the grid of cell dot patterns from dots and a fitted lattice.
+    
+    Args:
+        dots (numpy.ndarray): Array of shape (n, 2) with dot centres
+        lattice (dict): 'x' and 'y' (origin, pitch, step) tuples
+        
+    Returns:
+        numpy.ndarray: Dot pattern of each cell, one row per line
+    """
+    cell_col, dot_col = quantize_axis(dots[:, 0], lattice['x'], CELL_COLUMNS)
+    cell_row, dot_row = quantize_axis(dots[:, 1], lattice['y'], CELL_ROWS)
+    
+    # Dots before a seeded lattice's origin would get negative indices
+    keep = (cell_col >= 0) & (cell_row >= 0)
+    cell_col, dot_col, cell_row, dot_row = cell_col[keep], dot_col[keep], cell_row[keep], dot_row[keep]
+    if cell_col.size == 0:
+        return np.zeros((0, 0), dtype=np.int64)
+    
+    # Dots 1-3 are bits 0-2 (left column), dots 4-6 are bits 3-5
+    bits = np.left_shift(1, dot_row + CELL_ROWS * dot_col)
+    grid = np.zeros((cell_row.max() + 1, cell_col.max() + 1), dtype=np.int64)
+    np.bitwise_or.at(grid, (cell_row, cell_col), bits)
+    return grid
+
+def grid_to_braille(grid):
+    """
+    Unicode Braille for a grid of cell dot patterns.
+    
+    Lines are separated by a space, and blank cells inside a line become
+    Braille spaces.
+    """
+    lines = []
+    for row in grid:
+        filled = np.flatnonzero(row)
+        if filled.size == 0:
+            continue
+        lines.append("".join(map(chr, 0x2800 + row[:filled[-1] + 1])))
+    
+    # Add a space between rows
+    return " ".join(lines) + " "
+
+def fit_page_lattice(dots, seed=None):
+    """
+    Fit the cell lattice of a page along both axes.
+    
+    Args:
+        dots (numpy.ndarray): Array of shape (n, 2) with dot centres
+        seed (dict): An earlier result of this function to start from
+        
+    Returns:
+        tuple: (lattice, fit) where lattice holds 'spacing', 'x' and 'y',
+        and fit is the smaller share of dot lines on the lattice
+    """
+    spacing = seed['spacing'] if seed else estimate_dot_spacing(dots)
+    x, x_fit = fit_lattice(dots[:, 0], spacing, CELL_COLUMNS, seed and seed['x'])
+    y, y_fit = fit_lattice(dots[:, 1], spacing, CELL_ROWS, seed and seed['y'])
+    return {'spacing': spacing, 'x': x, 'y': y}, min(x_fit, y_fit)
+
+def dots_to_braille(dots):
+    """
+    Convert detected dot centres into Unicode Braille text.
+    
+    Every dot is quantized to a (line, cell, dot position) lattice in one
+    vectorized pass. Lines are separated by a space, and blank cells
+    inside a line become Braille spaces.
+    
+    Args:
+        dots (list): List of (x, y) dot centres
+        
+    Returns:
+        str: The Braille characters read from the dots
+    """
+    points = np.asarray(dots, dtype=np.float64).reshape(-1, 2)
+    lattice, _ = fit_page_lattice(points)
+    return grid_to_braille(cells_from_dots(points, lattice))
+
+def _odd(value):
+    # OpenCV kernel and block sizes must be odd
+    return int(value) // 2 * 2 + 1
+
+def threshold_dots(gray, scale=1.0):
+    """
+    Binarize a grayscale page so the dots are white on black.
+    
+    Args:
+        gray (numpy.ndarray): Grayscale page or tile
+        scale (float): Resolution relative to BRAILLE_MAX_DIMENSION
+        
+    Returns:
+        numpy.ndarray: The binary image
+    """
+    # Apply Gaussian blur to reduce noise
+    blur = _odd(5 * scale)
+    blurred = cv2.GaussianBlur(gray, (blur, blur), 0)
+    
+    # Apply adaptive thresholding to get binary image
+    binary = cv2.adaptiveThreshold(
+        blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+        cv2.THRESH_BINARY_INV, _odd(11 * scale), 2
+    )
+    if scale > 1:
+        # At high resolution noise makes dot edges ragged, which inflates
+        # their perimeter and fails the circularity test; smooth them
+        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (_odd(scale), _odd(scale)))
+        binary = cv2.morphologyEx(binary, cv2.MORPH_OPEN, kernel)
+    return binary
+
+def extract_dots_contours(binary, scale=1.0):
+    """
+    Find the centres of round blobs of dot size with contours.
+    
+    Args:
+        binary (numpy.ndarray): Binary image from threshold_dots
+        scale (float): Resolution relative to BRAILLE_MAX_DIMENSION
+        
+    Returns:
+        list: (x, y) dot centres
+    """
+    min_area = MIN_DOT_AREA * scale ** 2
+    max_area = MAX_DOT_AREA * scale ** 2
+    
+    # Find contours - these should represent the Braille dots
+    contours, _ = cv2.findContours(binary, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    
+    # Filter contours by size and shape to get only the Braille dots
+    braille_dots = []
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if min_area <= area <= max_area:
+            # Calculate circularity
+            perimeter = cv2.arcLength(contour, True)
+            if perimeter > 0:
+                circularity = 4 * np.pi * area / (perimeter * perimeter)
+                if circularity >= CIRCULARITY_THRESHOLD:
+                    # Get the center of the contour
+                    M = cv2.moments(contour)
+                    if M["m00"] != 0:
+                        cX = int(M["m10"] / M["m00"])
+                        cY = int(M["m01"] / M["m00"])
+                        braille_dots.append((cX, cY))
+    return braille_dots
+
+def extract_dots_components(binary, scale=1.0):
+    """
+    Find the centres of round blobs of dot size with connected components.
+    
+    Every blob's area, bounding box and centroid come from one call to
+    connectedComponentsWithStats, and each blob's perimeter is the count
+    of its edge pixels, so the filters run as NumPy array operations and
+    noisy pages with many blobs cost no Python loop.
+    
+    Args:
+        binary (numpy.ndarray): Binary image from threshold_dots
+        scale (float): Resolution relative to BRAILLE_MAX_DIMENSION
+        
+    Returns:
+        list: (x, y) dot centres
+    """
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    
+    # Edge pixels touch the background on one of their four sides
+    inner = cv2.erode(binary, cv2.getStructuringElement(cv2.MORPH_CROSS, (3, 3)))
+    edges = labels[(binary > 0) & (inner == 0)]
+    perimeter = np.bincount(edges, minlength=count)[1:]
+    
+    # Label 0 is the background
+    stats, centroids = stats[1:], centroids[1:]
+    width = stats[:, cv2.CC_STAT_WIDTH]
+    height = stats[:, cv2.CC_STAT_HEIGHT]
+    # Dot areas are tuned for contourArea, which runs through the centres
+    # of the boundary pixels; the pixel count exceeds it by about w + h - 1
+    area = stats[:, cv2.CC_STAT_AREA] - width - height + 1
+    
+    keep = (area >= MIN_DOT_AREA * scale ** 2) & (area <= MAX_DOT_AREA * scale ** 2)
+    keep &= np.minimum(width, height) >= MIN_DOT_ASPECT * np.maximum(width, height)
+    keep &= 4 * np.pi * area >= MIN_DOT_ROUNDNESS * np.maximum(perimeter, 1) ** 2
+    return [tuple(dot) for dot in centroids[keep].astype(np.int64).tolist()]
+
+DOT_EXTRACTORS = {
+    "contours": extract_dots_contours,
+    "components": extract_dots_components,
+}
+
+def extract_dots(binary, scale=1.0, method=None):
+    """
+    Find dot centres in a binary image with the configured extractor.
+    
+    Args:
+        binary (numpy.ndarray): Binary image from threshold_dots
+        scale (float): Resolution relative to BRAILLE_MAX_DIMENSION
+        method (str): A DOT_EXTRACTORS name (defaults to BRAILLE_DOT_EXTRACTOR)
+        
+    Returns:
+        list: (x, y) dot centres
+    """
+    return DOT_EXTRACTORS[method or BRAILLE_DOT_EXTRACTOR](binary, scale)
+
+def find_dots(gray, scale=1.0):
+    """Threshold a grayscale page or tile and return its dot centres."""
+    return extract_dots(threshold_dots(gray, scale), scale)
+
+def _reset_tile_executor():
+    # The pool's threads do not survive a fork; children start their own
+    global _tile_executor, _tile_executor_lock
+    _tile_executor = None
+    _tile_executor_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reset_tile_executor)
+
+def get_tile_executor():
+    global _tile_executor
+    with _tile_executor_lock:
+        if _tile_executor is None:
+            _tile_executor = ThreadPoolExecutor(max_workers=BRAILLE_TILE_WORKERS)
+        return _tile_executor
+
+def find_dots_tiled(gray, scale=1.0, tile_size=BRAILLE_TILE_SIZE):
+    """
+    Find dots on a large page tile by tile on a thread pool.
+    
+    The page is cut into tiles of ``tile_size`` pixels, each read with a
+    margin around it wider than a dot plus the threshold neighbourhood.
+    A dot is kept only by the tile whose core contains its centre, so
+    dots in the overlaps are counted once, and every kept dot was seen
+    whole with the same threshold it would get on the full page. OpenCV
+    releases the GIL, so tiles run on several cores.
+    
+    Args:
+        gray (numpy.ndarray): Grayscale page
+        scale (float): Resolution relative to BRAILLE_MAX_DIMENSION
+        tile_size (int): Tile core size in pixels
+        
+    Returns:
+        list: (x, y) dot centres in page coordinates
+    """
+    height, width = gray.shape[:2]
+    cores = tile_cores(width, height, tile_size)
+    braille_dots = []
+    for dots in get_tile_executor().map(lambda core: find_dots_in_core(gray, core, scale), cores):
+        braille_dots.extend(dots)
+    return braille_dots
+
+def tile_cores(width, height, tile_size):
+    """(x0, y0, x1, y1) of each tile core, row by row."""
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in range(0, height, tile_size)
+        for x in range(0, width, tile_size)
+    ]
+
+def find_dots_in_core(gray, core, scale=1.0):
+    """
+    Find the dots whose centres lie in one tile core.
+    
+    The core is read with a margin wider than a dot plus the threshold
+    neighbourhood, so the result matches thresholding the whole page.
+    
+    Args:
+        gray (numpy.ndarray): Grayscale page
+        core (tuple): (x0, y0, x1, y1) of the core
+        scale (float): Resolution relative to BRAILLE_MAX_DIMENSION
+        
+    Returns:
+        list: (x, y) dot centres in page coordinates
+    """
+    height, width = gray.shape[:2]
+    max_diameter = 2 * math.sqrt(MAX_DOT_AREA * scale ** 2 / math.pi)
+    margin = int(math.ceil(max_diameter + _odd(11 * scale) + _odd(5 * scale) + _odd(scale)))
+    
+    x0, y0, x1, y1 = core
+    left, top = max(x0 - margin, 0), max(y0 - margin, 0)
+    right, bottom = min(x1 + margin, width), min(y1 + margin, height)
+    dots = find_dots(gray[top:bottom, left:right], scale)
+    return [
+        (x + left, y + top) for x, y in dots
+        if x0 <= x + left < x1 and y0 <= y + top < y1
+    ]
+
+def detect_braille_from_image(image_file):
+    """
+    Detect Braille patterns from an image and convert them to text.
+    
+    Args:
+        image_file: Flask file object (or any file-like object) containing the image
+        
+    Returns:
+        tuple: (extracted_text, braille_dots_image_base64)
+    """
+    try:
+        with timer("braille_image_stage_seconds", stage="decode"):
+            # Decode the upload straight from memory
+            image_data = np.frombuffer(image_file.read(), dtype=np.uint8)
+            image = cv2.imdecode(image_data, cv2.IMREAD_COLOR) if image_data.size else None
+            if image is None:
+                raise ValueError("Could not read image file")
             
-            # Convert each cell to a Braille character
-            for cell_dots in cells:
-                # Find the top-left corner of the cell
-                cell_x = min(dot[0] for dot in cell_dots)
-                cell_y = min(dot[1] for dot in cell_dots)
-                
-                # Determine which positions have dots
-                dot_pattern = 0
-                if is_dot_at_position(cell_dots, cell_x, cell_y, 1): dot_pattern |= 0x01
-                if is_dot_at_position(cell_dots, cell_x, cell_y, 2): dot_pattern |= 0x02
-                if is_dot_at_position(cell_dots, cell_x, cell_y, 3): dot_pattern |= 0x04
-                if is_dot_at_position(cell_dots, cell_x, cell_y, 4): dot_pattern |= 0x08
-                if is_dot_at_position(cell_dots, cell_x, cell_y, 5): dot_pattern |= 0x10
-                if is_dot_at_position(cell_dots, cell_x, cell_y, 6): dot_pattern |= 0x20
-                
-                # Convert dot pattern to Unicode Braille character
-                braille_char = chr(0x2800 + dot_pattern)
-                braille_chars.append(braille_char)
+            # Get image dimensions
+            height, width = image.shape[:2]
             
-            # Add a space between rows
-            braille_chars.append(" ")
+            # Large pages are tiled at full resolution, or else resized
+            tiled = BRAILLE_TILED != "off" and max(height, width) > BRAILLE_MAX_DIMENSION
+            max_dimension = BRAILLE_TILED_MAX_DIMENSION if tiled else BRAILLE_MAX_DIMENSION
+            if height > max_dimension or width > max_dimension:
+                scale = max_dimension / max(height, width)
+                image = cv2.resize(image, None, fx=scale, fy=scale)
+                height, width = image.shape[:2]
+            scale = max(height, width) / BRAILLE_MAX_DIMENSION if tiled else 1.0
         
-        # Convert the Braille characters to text
-        braille_text = "".join(braille_chars)
-        detected_text = braille_to_text(braille_text)
+        if tiled:
+            with timer("braille_image_stage_seconds", stage="tiles"):
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                braille_dots = find_dots_tiled(gray, scale)
+        else:
+            with timer("braille_image_stage_seconds", stage="threshold"):
+                # Convert to grayscale
+                gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+                binary = threshold_dots(gray)
+            
+            with timer("braille_image_stage_seconds", stage="contours"):
+                braille_dots = extract_dots(binary)
         
-        # Draw cell boundaries on the image
-        cell_image = dot_image.copy()
+        # Group dots into Braille cells on a fitted lattice
+        if len(braille_dots) < 2:
+            raise ValueError("Not enough Braille dots detected")
         
-        # Save the processed image with detected dots
-        processed_image_path = temp_filename + "_processed.png"
-        cv2.imwrite(processed_image_path, dot_image)
+        with timer("braille_image_stage_seconds", stage="grid_fit"):
+            braille_text = dots_to_braille(braille_dots)
         
-        # Convert to Base64 for web display
-        with open(processed_image_path, "rb") as img_file:
-            processed_image_base64 = base64.b64encode(img_file.read()).decode('utf-8')
+        with timer("braille_image_stage_seconds", stage="text"):
+            detected_text = braille_to_text(braille_text)
         
-        # Clean up temporary files
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        if os.path.exists(processed_image_path):
-            os.remove(processed_image_path)
+        with timer("braille_image_stage_seconds", stage="encode"):
+            # Draw detected dots on the image for visualization; tiled
+            # pages are previewed at the usual size
+            if tiled:
+                dot_image = cv2.resize(image, None, fx=1 / scale, fy=1 / scale,
+                                       interpolation=cv2.INTER_AREA)
+                braille_dots = [(int(x / scale), int(y / scale)) for x, y in braille_dots]
+            else:
+                dot_image = image.copy()
+            for dot in braille_dots:
+                cv2.circle(dot_image, dot, 5, (0, 255, 0), -1)
+            
+            # Encode the processed image with detected dots in memory
+            encoded, png = cv2.imencode(".png", dot_image)
+            if not encoded:
+                raise ValueError("Could not encode processed image")
+            
+            # Convert to Base64 for web display
+            processed_image_base64 = base64.b64encode(png.tobytes()).decode('utf-8')
             
         return detected_text, processed_image_base64
         
     except Exception as e:
         logging.error(f"Error in detect_braille_from_image: {str(e)}")
-        # Clean up temporary files if they exist
-        if temp_filename and os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        if processed_image_path and os.path.exists(processed_image_path):
-            os.remove(processed_image_path)
         
         # Return a helpful error message and empty image
         error_message = f"Could not process Braille image: {str(e)}"
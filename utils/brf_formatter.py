@@ -0,0 +1,218 @@
+"""
+Embosser-ready Braille: word-wrapped lines, numbered pages, and North
+American ASCII Braille (BRF) output.
+
+Everything is a generator over the text segments from
+utils/document_stream.py, so a book is formatted one page at a time in
+linear time and constant memory.
+"""
+
+import re
+from utils.braille_converter import CHAR_TO_BRAILLE, NUMBER_SIGN, text_to_braille_with_spans
+from utils.hindi_braille_converter import hindi_text_to_braille_with_spans
+from utils.contracted_braille import text_to_contracted_braille_with_spans
+from utils.document_stream import STREAM_CHUNK_BYTES, iter_decoded_chunks, iter_segments
+
+# Standard embosser page
+BRF_CELLS_PER_LINE = 40
+BRF_LINES_PER_PAGE = 25
+
+BLANK_CELL = '⠀'
+
+# North American ASCII Braille, indexed by dot pattern (dots 1-6)
+ASCII_BRAILLE = " A1B'K2L@CIF/MSP\"E3H9O6R^DJG>NTQ,*5<-U8V.%[$+X!&;:4\\0Z7(_?W]#Y)="
+BRF_TABLE = str.maketrans({chr(0x2800 + pattern): char for pattern, char in enumerate(ASCII_BRAILLE)})
+# Anything else has no BRF form and is embossed as a blank cell
+NOT_SIX_DOT = re.compile('[^⠀-⠿]')
+
+EXPORT_FORMATS = ('brf', 'unicode')
+
+# Words are runs of non-space characters; each line break is kept
+TOKEN = re.compile(r'[^\s]+|\n')
+
+def _symbol_ends(offsets, lengths, start, end, word_start):
+    return [offset + length - word_start for offset, length in zip(offsets[start:end], lengths[start:end])]
+
+def iter_words(segments, language='english', width=BRF_CELLS_PER_LINE, grade=1):
+    """
+    Convert text segments to Braille words.
+
+    A word cut across two segments is joined back together.
+
+    Yields:
+        tuple: (braille, symbol_ends) for a word, where symbol_ends are
+        the offsets at which the word may be broken (only worked out for
+        words longer than ``width``, None otherwise), or None for a line
+        break in the text
+    """
+    if language == 'hindi':
+        convert = hindi_text_to_braille_with_spans
+    elif grade == 2:
+        convert = text_to_contracted_braille_with_spans
+    else:
+        convert = text_to_braille_with_spans
+    pending = None
+    for segment in segments:
+        if pending is not None and (not segment or segment[0].isspace()):
+            # The word ended at the previous segment's edge
+            yield pending
+            pending = None
+        braille, offsets, lengths = convert(segment)
+        last = len(segment)
+        for match in TOKEN.finditer(segment):
+            start, end = match.span()
+            if end - start == 1 and segment[start] == '\n':
+                if pending is not None:
+                    yield pending
+                    pending = None
+                yield None
+                continue
+
+            word_start = offsets[start]
+            word = braille[word_start:offsets[end - 1] + lengths[end - 1]]
+            ends = None
+            if pending is not None:
+                if start == 0:
+                    # Continues the last word of the previous segment
+                    ends = pending[1] + _symbol_ends(offsets, lengths, start, end, word_start - len(pending[0]))
+                    word = pending[0] + word
+                else:
+                    yield pending
+                pending = None
+            if end == last:
+                # May continue in the next segment, so keep its boundaries
+                if ends is None:
+                    ends = _symbol_ends(offsets, lengths, start, end, word_start)
+                pending = (word, ends)
+            elif len(word) > width:
+                if ends is None:
+                    ends = _symbol_ends(offsets, lengths, start, end, word_start)
+                yield word, ends
+            else:
+                yield word, None
+    if pending is not None:
+        yield pending
+
+def _break_word(word, ends, width):
+    # Cut at the last symbol boundary that fits, so no symbol is split
+    pieces = []
+    start = 0
+    for index, end in enumerate(ends):
+        next_end = ends[index + 1] if index + 1 < len(ends) else None
+        if next_end is None or next_end - start > width:
+            pieces.append(word[start:end])
+            start = end
+    return pieces
+
+def iter_lines(words, width=BRF_CELLS_PER_LINE):
+    """
+    Word-wrap Braille words into lines of at most ``width`` cells.
+
+    Words longer than a line are broken between symbols.
+
+    Yields:
+        str: One line of Braille cells
+    """
+    line = ''
+    for word in words:
+        if word is None:
+            yield line
+            line = ''
+            continue
+        cells, ends = word
+        if not cells:
+            continue
+        if line and len(line) + 1 + len(cells) <= width:
+            line += BLANK_CELL + cells
+            continue
+        if line:
+            yield line
+        if len(cells) <= width:
+            line = cells
+            continue
+        *full, line = _break_word(cells, ends, width)
+        yield from full
+    if line:
+        yield line
+
+def page_number_cells(number):
+    """Braille for a page number: the number sign, then the digits."""
+    return NUMBER_SIGN + ''.join(CHAR_TO_BRAILLE[digit][1:] for digit in str(number))
+
+def iter_pages(lines, width=BRF_CELLS_PER_LINE, lines_per_page=BRF_LINES_PER_PAGE, page_numbers=True):
+    """
+    Group lines into pages.
+
+    With ``page_numbers``, the last line of each page holds the page
+    number at its right margin.
+
+    Yields:
+        list: The lines of one page
+    """
+    body = lines_per_page - 1 if page_numbers else lines_per_page
+    page = []
+    number = 1
+
+    def finish(page, number):
+        if page_numbers:
+            page = page + [''] * (body - len(page))
+            label = page_number_cells(number)
+            page.append(BLANK_CELL * (width - len(label)) + label)
+        return page
+
+    for line in lines:
+        page.append(line)
+        if len(page) == body:
+            yield finish(page, number)
+            page = []
+            number += 1
+    if page:
+        yield finish(page, number)
+
+def to_brf(line):
+    """
+    Encode one line of Unicode Braille as North American ASCII Braille.
+
+    Anything that is not a six-dot cell, line breaks included, becomes a
+    blank cell, so line and page breaks are added after encoding.
+    """
+    return NOT_SIX_DOT.sub(BLANK_CELL, line).translate(BRF_TABLE)
+
+def export_braille(stream, language='english', fmt='brf', width=BRF_CELLS_PER_LINE,
+                   lines_per_page=BRF_LINES_PER_PAGE, page_numbers=True,
+                   chunk_size=STREAM_CHUNK_BYTES, grade=1):
+    """
+    Format a UTF-8 text stream as paginated Braille, one page at a time.
+
+    BRF lines end with CR LF and pages with a form feed, as embossers
+    expect; Unicode output uses LF and a form feed.
+
+    Args:
+        stream: Binary file-like object with the text
+        language (str): 'english' or 'hindi'
+        fmt (str): One of EXPORT_FORMATS
+        width (int): Cells per line
+        lines_per_page (int): Lines per page, including the page number line
+        page_numbers (bool): Whether to number the pages
+        chunk_size (int): Bytes read at a time
+        grade (int): 2 for contracted English
+
+    Yields:
+        str: The text of each page
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}")
+    if grade == 2 and language == 'hindi':
+        raise ValueError("Grade 2 Braille is only available for English")
+    if width < 4 or lines_per_page < 2:
+        raise ValueError("Pages need at least 4 cells per line and 2 lines")
+
+    # Contractions depend on the whole word, so grade 2 is only cut between words
+    segments = iter_segments(iter_decoded_chunks(stream, chunk_size), whole_words=grade == 2)
+    words = iter_words(segments, language, width, grade)
+    for page in iter_pages(iter_lines(words, width), width, lines_per_page, page_numbers):
+        if fmt == 'brf':
+            # Encoded line by line, so the line and page breaks are kept
+            yield '\r\n'.join(map(to_brf, page)) + '\r\n\f'
+        else:
+            yield '\n'.join(page) + '\n\f'
@@ -0,0 +1,302 @@
+"""
+Contracted (Grade 2) English Braille.
+
+Follows the contractions of Unified English Braille: wordsigns and
+shortforms for whole words, and groupsigns for letter groups inside
+words. Whole words are looked up in a dict; inside a word, groupsigns
+are matched longest-first through a prefix trie compiled at import, so
+translation is one linear pass over the text. Each groupsign carries
+the word positions it may be used in (e.g. 'ing' never starts a word,
+'ea' is only used in the middle of one).
+
+Capitals are not marked, as in the uncontracted converter.
+"""
+
+import re
+from functools import lru_cache
+from utils.metrics import timed
+from utils.braille_converter import CHAR_TABLE, CHAR_TO_BRAILLE, NUMBER_SIGN, LETTER_SIGN
+
+# Where in a word a groupsign may be used
+ANYWHERE = 'anywhere'
+START = 'start'          # begins the word, and is not the whole word
+NOT_START = 'not_start'  # middle or end of the word
+MIDDLE = 'middle'        # neither the first nor the last letters
+
+# Whole words only
+ALPHABETIC_WORDSIGNS = {
+    'but': '⠃', 'can': '⠉', 'do': '⠙', 'every': '⠑', 'from': '⠋', 'go': '⠛',
+    'have': '⠓', 'just': '⠚', 'knowledge': '⠅', 'like': '⠇', 'more': '⠍',
+    'not': '⠝', 'people': '⠏', 'quite': '⠟', 'rather': '⠗', 'so': '⠎',
+    'that': '⠞', 'us': '⠥', 'very': '⠧', 'will': '⠺', 'it': '⠭', 'you': '⠽',
+    'as': '⠵',
+}
+STRONG_WORDSIGNS = {
+    'child': '⠡', 'shall': '⠩', 'this': '⠹', 'which': '⠱', 'out': '⠳', 'still': '⠌',
+}
+LOWER_WORDSIGNS = {
+    'be': '⠆', 'enough': '⠢', 'were': '⠶', 'his': '⠦', 'in': '⠔', 'was': '⠴',
+}
+SHORTFORMS = {
+    'about': '⠁⠃', 'above': '⠁⠃⠧', 'according': '⠁⠉', 'across': '⠁⠉⠗',
+    'after': '⠁⠋', 'afternoon': '⠁⠋⠝', 'afterward': '⠁⠋⠺', 'again': '⠁⠛',
+    'against': '⠁⠛⠌', 'almost': '⠁⠇⠍', 'already': '⠁⠇⠗', 'also': '⠁⠇',
+    'although': '⠁⠇⠹', 'altogether': '⠁⠇⠞', 'always': '⠁⠇⠺',
+    'because': '⠆⠉', 'before': '⠆⠋', 'behind': '⠆⠓', 'below': '⠆⠇',
+    'beneath': '⠆⠝', 'beside': '⠆⠎', 'between': '⠆⠞', 'beyond': '⠆⠽',
+    'blind': '⠃⠇', 'braille': '⠃⠗⠇', 'children': '⠡⠝', 'could': '⠉⠙',
+    'deceive': '⠙⠉⠧', 'declare': '⠙⠉⠇', 'either': '⠑⠊', 'first': '⠋⠌',
+    'friend': '⠋⠗', 'good': '⠛⠙', 'great': '⠛⠗⠞', 'herself': '⠓⠻⠋',
+    'him': '⠓⠍', 'himself': '⠓⠍⠋', 'immediate': '⠊⠍⠍', 'its': '⠭⠎',
+    'itself': '⠭⠋', 'letter': '⠇⠗', 'little': '⠇⠇', 'much': '⠍⠡',
+    'must': '⠍⠌', 'myself': '⠍⠽⠋', 'necessary': '⠝⠑⠉', 'neither': '⠝⠑⠊',
+    'oneself': '⠐⠕⠋', 'ourselves': '⠳⠗⠧⠎', 'paid': '⠏⠙', 'perceive': '⠏⠻⠉⠧',
+    'quick': '⠟⠅', 'receive': '⠗⠉⠧', 'rejoice': '⠗⠚⠉', 'said': '⠎⠙',
+    'should': '⠩⠙', 'such': '⠎⠡', 'themselves': '⠮⠍⠧⠎', 'thyself': '⠹⠽⠋',
+    'today': '⠞⠙', 'together': '⠞⠛⠗', 'tomorrow': '⠞⠍', 'tonight': '⠞⠝',
+    'would': '⠺⠙', 'your': '⠽⠗', 'yourself': '⠽⠗⠋', 'yourselves': '⠽⠗⠧⠎',
+}
+
+# (letters, cells, position)
+GROUPSIGNS = [
+    # Strong contractions, also wordsigns for the whole word
+    ('and', '⠯', ANYWHERE), ('for', '⠿', ANYWHERE), ('of', '⠷', ANYWHERE),
+    ('the', '⠮', ANYWHERE), ('with', '⠾', ANYWHERE),
+    # Strong groupsigns
+    ('ch', '⠡', ANYWHERE), ('gh', '⠣', ANYWHERE), ('sh', '⠩', ANYWHERE),
+    ('th', '⠹', ANYWHERE), ('wh', '⠱', ANYWHERE), ('ed', '⠫', ANYWHERE),
+    ('er', '⠻', ANYWHERE), ('ou', '⠳', ANYWHERE), ('ow', '⠪', ANYWHERE),
+    ('st', '⠌', ANYWHERE), ('ar', '⠜', ANYWHERE), ('ing', '⠬', NOT_START),
+    # Lower groupsigns
+    ('en', '⠢', ANYWHERE), ('in', '⠔', ANYWHERE),
+    ('ea', '⠂', MIDDLE), ('bb', '⠆', MIDDLE), ('cc', '⠒', MIDDLE),
+    ('ff', '⠖', MIDDLE), ('gg', '⠶', MIDDLE),
+    ('be', '⠆', START), ('con', '⠒', START), ('dis', '⠲', START),
+    # Initial-letter contractions
+    ('day', '⠐⠙', ANYWHERE), ('ever', '⠐⠑', ANYWHERE), ('father', '⠐⠋', ANYWHERE),
+    ('here', '⠐⠓', ANYWHERE), ('know', '⠐⠅', ANYWHERE), ('lord', '⠐⠇', ANYWHERE),
+    ('mother', '⠐⠍', ANYWHERE), ('name', '⠐⠝', ANYWHERE), ('one', '⠐⠕', ANYWHERE),
+    ('part', '⠐⠏', ANYWHERE), ('question', '⠐⠟', ANYWHERE), ('right', '⠐⠗', ANYWHERE),
+    ('some', '⠐⠎', ANYWHERE), ('time', '⠐⠞', ANYWHERE), ('under', '⠐⠥', ANYWHERE),
+    ('work', '⠐⠺', ANYWHERE), ('young', '⠐⠽', ANYWHERE), ('there', '⠐⠮', ANYWHERE),
+    ('character', '⠐⠡', ANYWHERE), ('through', '⠐⠹', ANYWHERE), ('where', '⠐⠱', ANYWHERE),
+    ('ought', '⠐⠳', ANYWHERE),
+    ('upon', '⠘⠥', ANYWHERE), ('word', '⠘⠺', ANYWHERE), ('these', '⠘⠮', ANYWHERE),
+    ('those', '⠘⠹', ANYWHERE), ('whose', '⠘⠱', ANYWHERE),
+    ('cannot', '⠸⠉', ANYWHERE), ('had', '⠸⠓', ANYWHERE), ('many', '⠸⠍', ANYWHERE),
+    ('spirit', '⠸⠎', ANYWHERE), ('world', '⠸⠺', ANYWHERE), ('their', '⠸⠮', ANYWHERE),
+    # Final-letter groupsigns
+    ('ound', '⠨⠙', NOT_START), ('ance', '⠨⠑', NOT_START), ('sion', '⠨⠝', NOT_START),
+    ('less', '⠨⠎', NOT_START), ('ount', '⠨⠞', NOT_START),
+    ('ence', '⠰⠑', NOT_START), ('ong', '⠰⠛', NOT_START), ('ful', '⠰⠇', NOT_START),
+    ('tion', '⠰⠝', NOT_START), ('ness', '⠰⠎', NOT_START), ('ment', '⠰⠞', NOT_START),
+    ('ity', '⠰⠽', NOT_START),
+]
+
+WHOLE_WORDS = {
+    **{letters: cells for letters, cells, _ in GROUPSIGNS[:5]},
+    **ALPHABETIC_WORDSIGNS, **STRONG_WORDSIGNS, **LOWER_WORDSIGNS, **SHORTFORMS,
+}
+
+# Endings after an apostrophe that keep a wordsign usable ("it's", "you'll")
+APOSTROPHE_ENDINGS = ('s', 'd', 'll', 're', 've', 'm', 't')
+
+# Single letters other than a, i and o would read as wordsigns, so they
+# take the letter sign (Grade 1 indicator)
+WORDSIGN_LETTERS = set('bcdefghjklmnpqrstuvwxyz')
+
+# Cells that read as digits right after a number
+DIGIT_CELLS = {CHAR_TO_BRAILLE[digit][1] for digit in '1234567890'}
+
+# Words, with apostrophes inside them, and runs of digits
+TOKEN = re.compile(r"[a-z]+(?:'[a-z]+)*|[0-9]+")
+
+def _build_trie(groupsigns):
+    """
+    Compile groupsigns into a prefix trie of nested dicts, with
+    (cells, position) under the key None where a groupsign ends.
+    """
+    trie = {}
+    for letters, cells, position in groupsigns:
+        node = trie
+        for letter in letters:
+            node = node.setdefault(letter, {})
+        node[None] = (cells, position)
+    return trie
+
+GROUPSIGN_TRIE = _build_trie(GROUPSIGNS)
+
+def _allowed(position, start, end, length):
+    if position == ANYWHERE:
+        return True
+    if position == START:
+        return start == 0 and end < length
+    if position == NOT_START:
+        return start > 0
+    return start > 0 and end < length
+
+@lru_cache(maxsize=65536)
+def contract_word(word):
+    """
+    Contract one lower-case word.
+
+    Args:
+        word (str): Letters, possibly with apostrophes inside
+
+    Returns:
+        tuple: (start, end, cells) for each symbol, covering the word
+    """
+    if word in WHOLE_WORDS:
+        return ((0, len(word), WHOLE_WORDS[word]),)
+    if len(word) == 1:
+        letter = CHAR_TO_BRAILLE[word]
+        return ((0, 1, LETTER_SIGN + letter if word in WORDSIGN_LETTERS else letter),)
+
+    base, apostrophe, ending = word.partition("'")
+    if apostrophe and base in WHOLE_WORDS and ending in APOSTROPHE_ENDINGS:
+        symbols = [(0, len(base), WHOLE_WORDS[base])]
+        symbols.extend((index, index + 1, CHAR_TABLE[ord(word[index])]) for index in range(len(base), len(word)))
+        return tuple(symbols)
+
+    # Longest groupsign allowed at each position, else the letter itself
+    symbols = []
+    length = len(word)
+    index = 0
+    while index < length:
+        node = GROUPSIGN_TRIE
+        match = None
+        end = index
+        while end < length:
+            node = node.get(word[end])
+            if node is None:
+                break
+            end += 1
+            if None in node:
+                cells, position = node[None]
+                if _allowed(position, index, end, length):
+                    match = (end, cells)
+        if match is not None:
+            symbols.append((index, match[0], match[1]))
+            index = match[0]
+        else:
+            symbols.append((index, index + 1, CHAR_TABLE[ord(word[index])]))
+            index += 1
+    return tuple(symbols)
+
+@lru_cache(maxsize=65536)
+def contracted_word_cells(word):
+    """The cells of contract_word joined into one string."""
+    return ''.join(cells for _, _, cells in contract_word(word))
+
+def _number_cells(digits):
+    # One number sign for the whole run of digits
+    return NUMBER_SIGN + ''.join(CHAR_TO_BRAILLE[digit][1] for digit in digits)
+
+def _lower(text):
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # A few characters lower-case to several; keep those as they are
+        lowered = ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+    return lowered
+
+def contracted_symbols(text):
+    """
+    Translate text to contracted Braille symbol by symbol.
+
+    Args:
+        text (str): The English text to convert
+
+    Yields:
+        tuple: (start, end, cells) for each symbol, in order, covering
+        the whole text; characters without a mapping are kept as they are
+    """
+    lowered = _lower(text)
+    position = 0
+    after_number = False
+    for match in TOKEN.finditer(lowered):
+        start, end = match.span()
+        for index in range(position, start):
+            yield index, index + 1, CHAR_TABLE.get(ord(lowered[index]), lowered[index])
+        if start > position:
+            after_number = False
+
+        token = match.group()
+        if token[0].isdigit():
+            yield start, end, _number_cells(token)
+            after_number = True
+        else:
+            for index, (symbol_start, symbol_end, cells) in enumerate(contract_word(token)):
+                if index == 0 and after_number and cells[0] in DIGIT_CELLS:
+                    # Would read as more digits of the number
+                    cells = LETTER_SIGN + cells
+                yield start + symbol_start, start + symbol_end, cells
+            after_number = False
+        position = end
+
+    for index in range(position, len(lowered)):
+        yield index, index + 1, CHAR_TABLE.get(ord(lowered[index]), lowered[index])
+
+@timed("braille_conversion_seconds", language="english-grade2")
+def text_to_contracted_braille(text):
+    """
+    Convert English text to contracted (Grade 2) Braille.
+
+    Same output as joining contracted_symbols, but whole words are taken
+    from a cache and the text between words is translated in one call.
+
+    Args:
+        text (str): The English text to convert
+
+    Returns:
+        str: The contracted Braille
+    """
+    lowered = _lower(text)
+    pieces = []
+    position = 0
+    after_number = False
+    for match in TOKEN.finditer(lowered):
+        start, end = match.span()
+        if start > position:
+            pieces.append(lowered[position:start].translate(CHAR_TABLE))
+            after_number = False
+
+        token = match.group()
+        if token[0].isdigit():
+            pieces.append(_number_cells(token))
+            after_number = True
+        else:
+            cells = contracted_word_cells(token)
+            if after_number and cells[0] in DIGIT_CELLS:
+                cells = LETTER_SIGN + cells
+            pieces.append(cells)
+            after_number = False
+        position = end
+    pieces.append(lowered[position:].translate(CHAR_TABLE))
+    return ''.join(pieces)
+
+@timed("braille_conversion_seconds", language="english-grade2")
+def text_to_contracted_braille_with_spans(text):
+    """
+    Convert English text to contracted Braille and record each
+    character's span.
+
+    Every character of a contraction gets the span of the whole
+    contraction, so the spans can be used like those of the
+    uncontracted converter.
+
+    Args:
+        text (str): The English text to convert
+
+    Returns:
+        tuple: (braille, offsets, lengths), see translate_with_spans
+    """
+    pieces = []
+    offsets = []
+    lengths = []
+    offset = 0
+    for start, end, cells in contracted_symbols(text):
+        pieces.append(cells)
+        offsets.extend([offset] * (end - start))
+        lengths.extend([len(cells)] * (end - start))
+        offset += len(cells)
+    return ''.join(pieces), offsets, lengths
@@ -0,0 +1,89 @@
+"""
+Text to Braille conversion shared by the API endpoints and background jobs.
+"""
+
+from utils.braille_converter import CHAR_TABLE, text_to_braille, text_to_braille_with_spans
+from utils.hindi_braille_converter import hindi_symbols, hindi_text_to_braille, hindi_text_to_braille_with_spans
+from utils.contracted_braille import contracted_symbols, text_to_contracted_braille, text_to_contracted_braille_with_spans
+
+# detailed_mapping formats:
+#   legacy   - one {'original', 'braille'} dict per character
+#   spans    - parallel 'offsets'/'lengths' arrays into the braille string
+#   distinct - one entry per distinct character
+#   none     - no mapping
+MAPPING_FORMATS = ('legacy', 'spans', 'distinct', 'none')
+
+# 1 is letter by letter; 2 is contracted English, see utils/contracted_braille.py
+BRAILLE_GRADES = (1, 2)
+
+def convert_text(text, language='english', mapping='legacy', grade=1):
+    """
+    Convert text to Braille along with its per-character mapping.
+
+    Args:
+        text (str): The text to convert
+        language (str): 'english' or 'hindi'
+        mapping (str): One of MAPPING_FORMATS
+        grade (int): One of BRAILLE_GRADES; grade 2 is English only
+
+    Returns:
+        tuple: (braille, detailed_mapping)
+    """
+    if mapping not in MAPPING_FORMATS:
+        raise ValueError(f"Unknown mapping format '{mapping}', expected one of {', '.join(MAPPING_FORMATS)}")
+    if grade not in BRAILLE_GRADES:
+        raise ValueError(f"Unknown Braille grade '{grade}', expected one of {', '.join(map(str, BRAILLE_GRADES))}")
+
+    hindi = language == 'hindi'
+    if grade == 2:
+        if hindi:
+            raise ValueError("Grade 2 Braille is only available for English")
+        return _convert_contracted(text, mapping)
+
+    if mapping in ('none', 'distinct'):
+        braille = hindi_text_to_braille(text) if hindi else text_to_braille(text)
+        if mapping == 'none':
+            return braille, None
+        # Every character always maps to the same cells, so one entry each is
+        # enough; Hindi conjuncts and nukta forms get an entry of their own
+        if hindi:
+            symbols = hindi_symbols(text)
+        else:
+            symbols = {char: CHAR_TABLE.get(ord(char), char) for char in set(text.lower())}
+        return braille, {'format': 'distinct', 'symbols': symbols}
+
+    if hindi:
+        braille, offsets, lengths = hindi_text_to_braille_with_spans(text)
+    else:
+        braille, offsets, lengths = text_to_braille_with_spans(text)
+
+    if mapping == 'spans':
+        return braille, {'format': 'spans', 'offsets': offsets, 'lengths': lengths}
+
+    detailed_mapping = [
+        {'original': 'space', 'braille': '⠀'} if char == ' ' else
+        {'original': char, 'braille': braille[offset:offset + length]}
+        for char, offset, length in zip(text, offsets, lengths)
+    ]
+    return braille, detailed_mapping
+
+def _convert_contracted(text, mapping):
+    if mapping == 'none':
+        return text_to_contracted_braille(text), None
+    if mapping == 'distinct':
+        # One entry per distinct contraction or character, e.g. 'the': '⠮'
+        pieces = []
+        symbols = {}
+        for start, end, cells in contracted_symbols(text):
+            pieces.append(cells)
+            symbols.setdefault(text[start:end].lower(), cells)
+        return ''.join(pieces), {'format': 'distinct', 'symbols': symbols}
+
+    braille, offsets, lengths = text_to_contracted_braille_with_spans(text)
+    if mapping == 'spans':
+        return braille, {'format': 'spans', 'offsets': offsets, 'lengths': lengths}
+    return braille, [
+        {'original': 'space', 'braille': '⠀'} if char == ' ' else
+        {'original': char, 'braille': braille[offset:offset + length]}
+        for char, offset, length in zip(text, offsets, lengths)
+    ]
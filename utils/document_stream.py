@@ -0,0 +1,125 @@
+"""
+Streaming text to Braille conversion for large documents.
+
+The input is read in bounded chunks, decoded incrementally as UTF-8, cut
+only at boundaries where no character cluster or context rule spans the
+cut, and converted piece by piece. Memory use depends on the chunk size,
+not on the document size.
+"""
+
+import os
+import codecs
+import unicodedata
+from utils.braille_converter import text_to_braille
+from utils.hindi_braille_converter import hindi_text_to_braille
+
+STREAM_CHUNK_BYTES = int(os.environ.get("STREAM_CHUNK_BYTES", 64 * 1024))
+# Longest text carried over while waiting for a boundary; a longer run
+# with no whitespace (base64, URLs, CJK) is cut at the nearest safe point
+STREAM_MAX_CARRY_CHARS = int(os.environ.get("STREAM_MAX_CARRY_CHARS", 4096))
+
+VIRAMA = '\u094d'
+JOINERS = ('\u200c', '\u200d')
+
+def iter_decoded_chunks(stream, chunk_size=STREAM_CHUNK_BYTES):
+    """
+    Read a binary stream and decode it as UTF-8, chunk by chunk.
+
+    A multi-byte character split across two reads is held back by the
+    incremental decoder until its remaining bytes arrive.
+
+    Yields:
+        str: Decoded text
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    first = True
+    while True:
+        data = stream.read(chunk_size)
+        if not data:
+            break
+        text = decoder.decode(data)
+        if first and text:
+            # Drop a UTF-8 byte order mark left by some editors
+            text = text.lstrip('\ufeff')
+            first = False
+        if text:
+            yield text
+    tail = decoder.decode(b'', final=True)
+    if tail:
+        yield tail
+
+def is_safe_boundary(text, index):
+    """
+    Whether text can be cut before ``text[index]`` without changing the
+    conversion of either side.
+
+    Cuts are not allowed before a combining mark (matras, nukta,
+    anusvara), after a virama or next to a joiner, since those belong to
+    one Devanagari cluster. A cut between a digit and a letter is not
+    allowed either, since the letter may need the letter sign.
+    """
+    if index <= 0 or index >= len(text):
+        return False
+    before, after = text[index - 1], text[index]
+    if unicodedata.category(after).startswith('M'):
+        return False
+    if before == VIRAMA or before in JOINERS or after in JOINERS:
+        return False
+    if before.isdigit() and after.isalpha():
+        return False
+    return True
+
+def _split_point(text, whole_words=False):
+    # Prefer cutting after the last whitespace, which is always safe
+    for index in range(len(text) - 1, 0, -1):
+        if text[index - 1].isspace():
+            return index
+    if whole_words:
+        return 0
+    for index in range(len(text) - 1, 0, -1):
+        if is_safe_boundary(text, index):
+            return index
+    return 0
+
+def iter_segments(chunks, whole_words=False, max_carry=STREAM_MAX_CARRY_CHARS):
+    """
+    Re-cut decoded chunks at safe boundaries.
+
+    The text after the last safe boundary of a chunk is carried over to
+    the next one. With ``whole_words`` the cut is only made after
+    whitespace, for conversions that depend on the whole word (contracted
+    Braille), so a word is carried over until it is complete. Text with
+    no boundary is carried over up to ``max_carry`` characters, after
+    which it is cut anyway, so buffering and re-scanning stay bounded.
+
+    Yields:
+        str: Text segments that can be converted independently
+    """
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk
+        cut = _split_point(text, whole_words)
+        if not cut and len(text) > max_carry:
+            cut = _split_point(text) if whole_words else 0
+            cut = cut or len(text)
+        if cut:
+            yield text[:cut]
+        carry = text[cut:]
+    if carry:
+        yield carry
+
+def stream_braille(stream, language='english', chunk_size=STREAM_CHUNK_BYTES):
+    """
+    Convert a UTF-8 text stream to Braille incrementally.
+
+    Args:
+        stream: Binary file-like object with the text
+        language (str): 'english' or 'hindi'
+        chunk_size (int): Bytes read at a time
+
+    Yields:
+        str: Braille for each segment, in order
+    """
+    convert = hindi_text_to_braille if language == 'hindi' else text_to_braille
+    for segment in iter_segments(iter_decoded_chunks(stream, chunk_size)):
+        yield convert(segment)
@@ -1,8 +1,13 @@
 """
 Hindi to Braille conversion utility.
-Supports Hindi text including vowels and matras (vowel signs).
+Supports Hindi text including vowels and matras (vowel signs), conjuncts
+with their own signs (क्ष, ज्ञ) and nukta forms (क़, ज़), whether the
+text is in composed or decomposed Unicode form.
 """
 
+from utils.metrics import timed
+from utils.translation_engine import compile_clusters, translate_clusters, translate_clusters_with_spans
+
 # Hindi to Braille mapping including consonants, vowels, and matras
 HINDI_TO_BRAILLE = {
     # Vowels (Swar)
@@ -13,6 +18,7 @@ HINDI_TO_BRAILLE = {
     'उ': '⠥',  # u
     'ऊ': '⠳',  # uu
     'ऋ': '⠗',  # ri
+    'ॠ': '⠐⠗',  # rii
     'ए': '⠑',  # e
     'ऐ': '⠌',  # ai
     'ओ': '⠕',  # o
@@ -65,6 +71,7 @@ HINDI_TO_BRAILLE = {
     'ु': '⠥',  # u matra
     'ू': '⠳',  # uu matra
     'ृ': '⠗',  # ri matra
+    'ॄ': '⠐⠗',  # rii matra
     'े': '⠑',  # e matra
     'ै': '⠌',  # ai matra
     'ो': '⠕',  # o matra
@@ -86,8 +93,10 @@ HINDI_TO_BRAILLE = {
     '।': '⠲',  # Devanagari danda (full stop)
     '॥': '⠲⠲',  # Double danda
     'ं': '⠰',  # Anusvara
+    'ँ': '⠄',  # Chandrabindu
     'ः': '⠱',  # Visarga
     '्': '⠈',  # Halant (virama)
+    '\u200c': '',  # Zero-width non-joiner: keeps the halant visible, no cell
     
     # Punctuation
     ' ': '⠀',  # Space
@@ -102,6 +111,31 @@ HINDI_TO_BRAILLE = {
     "'": '⠄',
 }
 
+NUKTA = '\u093c'
+NUKTA_SIGN = '⠠'
+
+# Symbols written with several code points, in decomposed (NFD) form
+HINDI_SEQUENCES = {
+    # Conjuncts with a sign of their own
+    'क्ष': '⠟',  # ksha
+    'ज्ञ': '⠱',  # gya
+}
+# Nukta forms: the nukta sign, then the consonant
+HINDI_SEQUENCES.update(
+    (consonant + NUKTA, NUKTA_SIGN + HINDI_TO_BRAILLE[consonant])
+    for consonant in 'कखगजडढफयनर'
+)
+
+# Compiled once at import; see utils/translation_engine.py. Precomposed
+# nukta letters (क़ U+0958, ऩ U+0929, ...) are decomposed so both forms
+# meet the same sequence; the zero-width joiner only picks a half form and
+# is dropped, while the non-joiner stays to break a conjunct
+HINDI_CLUSTERS = compile_clusters(
+    HINDI_TO_BRAILLE, HINDI_SEQUENCES, chars=map(chr, range(0x0900, 0x0980)), dropped='\u200d'
+)
+HINDI_TABLE = HINDI_CLUSTERS.table
+
+@timed("braille_conversion_seconds", language="hindi")
 def hindi_text_to_braille(text):
     """
     Convert Hindi text to Braille characters.
@@ -112,16 +146,39 @@ def hindi_text_to_braille(text):
     Returns:
         str: The Braille representation of the text
     """
-    braille_text = ""
-    
-    for char in text:
-        if char in HINDI_TO_BRAILLE:
-            braille_text += HINDI_TO_BRAILLE[char]
-        else:
-            # If character not found, keep it as is or use default
-            braille_text += char
+    # Characters without a mapping are kept as they are
+    return translate_clusters(text, HINDI_CLUSTERS)
+
+@timed("braille_conversion_seconds", language="hindi")
+def hindi_text_to_braille_with_spans(text):
+    """
+    Convert Hindi text to Braille and record each character's span.
     
-    return braille_text
+    Args:
+        text (str): The Hindi text to convert
+        
+    Returns:
+        tuple: (braille, offsets, lengths), see translate_clusters_with_spans
+    """
+    return translate_clusters_with_spans(text, HINDI_CLUSTERS)
+
+def hindi_symbols(text):
+    """
+    The Braille for each distinct symbol of the text.
+
+    Args:
+        text (str): The Hindi text
+
+    Returns:
+        dict: Each sequence (e.g. 'क्ष') and each character outside a
+        sequence mapped to its Braille
+    """
+    decomposed = text.translate(HINDI_CLUSTERS.decompositions)
+    pattern = HINDI_CLUSTERS.pattern
+    symbols = {match.group(): HINDI_SEQUENCES[match.group()] for match in pattern.finditer(decomposed)}
+    for char in set(pattern.sub('', decomposed)):
+        symbols[char] = HINDI_TABLE.get(ord(char), char)
+    return symbols
 
 def get_detailed_hindi_braille_mapping(text):
     """
@@ -133,23 +190,21 @@ def get_detailed_hindi_braille_mapping(text):
     Returns:
         list: A list of dictionaries with 'original' and 'braille' keys
     """
+    braille, offsets, lengths = hindi_text_to_braille_with_spans(text)
     mapping = []
     
-    for char in text:
+    for char, offset, length in zip(text, offsets, lengths):
         if char == ' ':
             mapping.append({
                 'original': 'space',
                 'braille': '⠀'
             })
-        elif char in HINDI_TO_BRAILLE:
-            mapping.append({
-                'original': char,
-                'braille': HINDI_TO_BRAILLE[char]
-            })
         else:
+            # Characters of a conjunct or nukta form share its Braille;
+            # unmapped characters are kept as they are
             mapping.append({
                 'original': char,
-                'braille': char  # Keep original if no mapping found
+                'braille': braille[offset:offset + length]
             })
     
     return mapping
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Response compression negotiated from Accept-Encoding.
+
+Brotli is used when the optional ``brotli`` package is installed and the
+client accepts it, gzip otherwise. Streamed responses are left alone, so
+their chunks still go out as soon as they are produced.
+"""
+
+import os
+import gzip
+from utils.metrics import timer
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION = os.environ.get("COMPRESSION", "1").lower() in ("1", "true", "yes")
+# Smaller bodies fit in a packet either way
+COMPRESS_MIN_BYTES = int(os.environ.get("COMPRESS_MIN_BYTES", 1024))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.environ.get("BROTLI_QUALITY", 5))
+
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/octet-stream', 'text/plain',
+    'text/html', 'text/css', 'application/javascript', 'text/javascript',
+)
+
+def available_encodings():
+    """Content codings this server can produce, best first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+def compress(data, encoding):
+    """
+    Compress a body with the given content coding.
+
+    Args:
+        data (bytes): The body
+        encoding (str): 'br' or 'gzip'
+
+    Returns:
+        bytes: The compressed body
+    """
+    with timer("compression_seconds", encoding=encoding):
+        if encoding == 'br':
+            return brotli.compress(data, quality=BROTLI_QUALITY)
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+def compress_response(response, accept_encodings):
+    """
+    Compress a Flask response in place if the client accepts it.
+
+    Args:
+        response: The Flask response
+        accept_encodings: The request's parsed Accept-Encoding header
+
+    Returns:
+        The same response
+    """
+    if (not COMPRESSION or response.is_streamed or response.direct_passthrough
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = accept_encodings.best_match(available_encodings())
+    data = response.get_data()
+    if encoding is None or len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    response.set_data(compress(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,102 @@
+"""
+Image processing tasks run by the background job queue.
+
+Tasks take the raw upload bytes so they can be sent to worker processes.
+Results are cached by image content, see utils/result_cache.py. The web
+process stores a finished job's result with ``cache_result`` (the
+worker's own memory cache would never be asked again), and tasks only
+read the cache, for results another process put in its disk tier.
+
+The OCR and OpenCV modules are imported on first use, so importing this
+module (and the app) stays fast.
+"""
+
+from io import BytesIO
+from utils.conversion import convert_text
+from utils.job_queue import JOB_TIMEOUT
+from utils.result_cache import result_cache
+
+def ocr_cache_key(image_bytes, language='english', mapping='legacy'):
+    """Result cache key for ocr_task."""
+    from utils.image_processor import OCR_PIPELINE_VERSION
+    return result_cache.key(image_bytes, OCR_PIPELINE_VERSION, language, mapping)
+
+def braille_image_cache_key(image_bytes):
+    """Result cache key for braille_image_task."""
+    from utils.braille_image_processor import BRAILLE_PIPELINE_VERSION
+    return result_cache.key(image_bytes, BRAILLE_PIPELINE_VERSION)
+
+def cache_result(key, result):
+    """
+    Store a task result in the result cache.
+
+    A Braille image result with an empty preview means detection failed,
+    so it is not cached.
+    """
+    if 'processed_image' in result and not result['processed_image']:
+        return
+    result_cache.set(key, result)
+
+def ocr_task(image_bytes, filename, language='english', mapping='legacy'):
+    """
+    Extract text from an image and convert it to Braille.
+    
+    Args:
+        image_bytes (bytes): The uploaded image
+        filename (str): The original upload filename
+        language (str): 'english' or 'hindi'
+        mapping (str): detailed_mapping format, see MAPPING_FORMATS
+        
+    Returns:
+        dict: 'text', 'braille', 'detailed_mapping' and 'language'
+    """
+    key = ocr_cache_key(image_bytes, language, mapping)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    from utils.image_processor import extract_text_from_image
+    image_file = BytesIO(image_bytes)
+    try:
+        # Tesseract is killed if it runs past the job timeout
+        extracted_text = extract_text_from_image(
+            image_file, lang='hin' if language == 'hindi' else 'eng', timeout=JOB_TIMEOUT
+        )
+    except Exception as e:
+        # pytesseract errors cannot be unpickled in the parent process
+        raise RuntimeError(str(e)) from None
+    if not extracted_text:
+        raise ValueError('No text detected in the image')
+    
+    braille, detailed_mapping = convert_text(extracted_text, language, mapping)
+    result = {
+        'text': extracted_text,
+        'braille': braille,
+        'detailed_mapping': detailed_mapping,
+        'language': language
+    }
+    return result
+
+def braille_image_task(image_bytes, filename):
+    """
+    Detect Braille dots in an image and convert them to text.
+    
+    Args:
+        image_bytes (bytes): The uploaded image
+        filename (str): The original upload filename
+        
+    Returns:
+        dict: 'text' and 'processed_image' (base64 PNG)
+    """
+    key = braille_image_cache_key(image_bytes)
+    cached = result_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    from utils.braille_image_processor import detect_braille_from_image
+    image_file = BytesIO(image_bytes)
+    text, processed_image = detect_braille_from_image(image_file)
+    return {
+        'text': text,
+        'processed_image': processed_image
+    }
@@ -0,0 +1,323 @@
+"""
+Background job queue for slow image processing.
+
+Jobs run on a bounded pool of worker processes so a slow OCR page does not
+hold the web worker. Job state lives in this process only, so no external
+broker is needed; clients poll with the job id returned by ``submit``.
+
+The time limit is enforced inside the worker: a timer started when the job
+begins running interrupts it, so queued jobs are not failed for waiting. A
+job stuck where the timer cannot interrupt it (inside a C call) is caught
+by the parent, which replaces the worker pool and requeues the jobs that
+had not started.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from utils import metrics
+
+# Defaults, overridable through the environment
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_MAX_PENDING = int(os.environ.get("JOB_MAX_PENDING", 32))
+JOB_TIMEOUT = float(os.environ.get("JOB_TIMEOUT", 60))
+JOB_RESULT_TTL = float(os.environ.get("JOB_RESULT_TTL", 600))
+# Extra seconds a job gets past its timeout before its pool is replaced
+JOB_KILL_GRACE = float(os.environ.get("JOB_KILL_GRACE", 10))
+
+class QueueFullError(Exception):
+    """Raised when the queue already holds the maximum number of pending jobs."""
+
+class JobTimeoutError(Exception):
+    """Raised inside a worker when a job runs past its time limit."""
+
+# Start time of the job in each slot, shared with the worker processes
+_started = None
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+def _on_alarm(signum, frame):
+    raise JobTimeoutError("Job timed out")
+
+def _run_job(slot, timeout, func, *args):
+    # Runs in a worker process, on its main thread, so SIGALRM reaches it
+    _started[slot] = time.time()
+    limited = timeout and hasattr(signal, "setitimer")
+    if limited:
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(*args)
+    except JobTimeoutError:
+        raise JobTimeoutError(f"Job timed out after {timeout:g} seconds") from None
+    finally:
+        if limited:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        # Workers may sit idle, and do not run atexit handlers, so write
+        # this job's timings for /metrics now
+        metrics.flush()
+
+class JobQueue:
+    """
+    A bounded process pool with job status tracking.
+
+    Args:
+        max_workers (int): Number of worker processes
+        max_pending (int): Maximum number of queued or running jobs
+        timeout (float): Seconds a job may run once it has started
+        result_ttl (float): Seconds a finished job is kept for polling
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING,
+                 timeout=JOB_TIMEOUT, result_ttl=JOB_RESULT_TTL):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.result_ttl = result_ttl
+        self._executor = None
+        # One start-time slot per pending job, written by the workers
+        self._started = multiprocessing.Array('d', max_pending, lock=False)
+        self._jobs = {}
+        # Re-entrant: cancelling a future runs its done callback immediately
+        self._lock = threading.RLock()
+
+    def _get_executor(self):
+        # Created on first use so importing the app does not fork workers
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker, initargs=(self._started,)
+            )
+        return self._executor
+
+    def _start(self, job):
+        # Caller holds the lock
+        self._started[job['slot']] = 0
+        func, args = job['call']
+        try:
+            future = self._get_executor().submit(_run_job, job['slot'], self.timeout, func, *args)
+        except BrokenProcessPool:
+            logging.warning("Job worker pool was broken, restarting it")
+            self._executor = None
+            future = self._get_executor().submit(_run_job, job['slot'], self.timeout, func, *args)
+        job['future'] = future
+        return future
+
+    def submit(self, func, *args, on_result=None):
+        """
+        Queue ``func(*args)`` to run in a worker process.
+
+        Args:
+            on_result (callable): Called in this process with the result
+                when the job succeeds, e.g. to cache it here
+
+        Returns:
+            str: The job id to poll
+
+        Raises:
+            QueueFullError: If too many jobs are already pending
+        """
+        with self._lock:
+            self._expire()
+            used = {job['slot'] for job in self._jobs.values() if job['status'] in ('queued', 'running')}
+            if len(used) >= self.max_pending:
+                raise QueueFullError("Too many jobs in progress, please retry shortly")
+
+            job_id = uuid.uuid4().hex
+            job = {
+                'status': 'queued',
+                'submitted_at': time.time(),
+                'finished_at': None,
+                'slot': min(set(range(self.max_pending)) - used),
+                'call': (func, args),
+                'future': None,
+                'on_result': on_result,
+                'result': None,
+                'error': None,
+            }
+            self._jobs[job_id] = job
+            future = self._start(job)
+
+        future.add_done_callback(lambda done: self._finish(job_id, done))
+        return job_id
+
+    def add_done(self, result):
+        """
+        Record a job that is already finished, such as a cached result,
+        so clients poll it like any other job.
+
+        Returns:
+            str: The job id to poll
+        """
+        now = time.time()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._jobs[job_id] = {
+                'status': 'done',
+                'submitted_at': now,
+                'finished_at': now,
+                'slot': None,
+                'call': None,
+                'future': None,
+                'on_result': None,
+                'result': result,
+                'error': None,
+            }
+        return job_id
+
+    def cancel(self, job_id):
+        """
+        Drop a job whose result is no longer wanted. A job that has not
+        started is not run; one already running finishes and expires as
+        usual.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            if job['future'] is not None and not job['future'].cancel():
+                job['on_result'] = None
+                return
+            del self._jobs[job_id]
+
+    def _finish(self, job_id, future):
+        on_result = None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # A job requeued on a new pool has moved on to another future
+            if job is None or job['future'] is not future or job['status'] not in ('queued', 'running'):
+                return
+            job['finished_at'] = time.time()
+            job['future'] = None
+            job['call'] = None
+            if future.cancelled():
+                job['status'] = 'failed'
+                job['error'] = 'Job was cancelled'
+                return
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool) and self._executor is not None:
+                # A worker died; start a fresh pool for the next job
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if error is not None:
+                logging.error(f"Job {job_id} failed: {str(error)}")
+                job['status'] = 'failed'
+                job['error'] = str(error)
+            else:
+                job['status'] = 'done'
+                job['result'] = future.result()
+                on_result = job.pop('on_result', None)
+        if on_result is not None:
+            try:
+                on_result(job['result'])
+            except Exception as e:
+                logging.error(f"Job {job_id} result callback failed: {str(e)}")
+
+    def _recycle(self, stuck_ids):
+        # Caller holds the lock. The stuck jobs ignored their timer, so the
+        # only way to free their workers is to replace the pool; jobs that
+        # were running on it fail, jobs that had not started are requeued
+        executor, self._executor = self._executor, None
+        now = time.time()
+        requeue = []
+        for job_id, job in self._jobs.items():
+            if job['status'] not in ('queued', 'running'):
+                continue
+            if job['status'] == 'queued' and job_id not in stuck_ids:
+                requeue.append(job_id)
+                continue
+            job['status'] = 'failed'
+            job['error'] = (f'Job timed out after {self.timeout:g} seconds' if job_id in stuck_ids
+                            else 'Job was stopped with a job that timed out')
+            job['finished_at'] = now
+            job['future'] = None
+            job['call'] = None
+        if executor is not None:
+            # There is no public way to kill running tasks
+            for process in list(getattr(executor, '_processes', {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+        for job_id in requeue:
+            future = self._start(self._jobs[job_id])
+            future.add_done_callback(lambda done, job_id=job_id: self._finish(job_id, done))
+        logging.warning(f"Replaced the job worker pool after {len(stuck_ids)} job(s) ignored their timeout, "
+                        f"requeued {len(requeue)}")
+
+    def _expire(self):
+        # Caller holds the lock
+        now = time.time()
+        stuck = []
+        for job_id, job in list(self._jobs.items()):
+            if job['status'] in ('queued', 'running'):
+                started = self._started[job['slot']]
+                if started:
+                    job['status'] = 'running'
+                    if self.timeout and now - started > self.timeout + JOB_KILL_GRACE:
+                        stuck.append(job_id)
+            elif now - job['finished_at'] > self.result_ttl:
+                del self._jobs[job_id]
+        if stuck:
+            self._recycle(set(stuck))
+
+    def wait(self, job_id, poll=1.0):
+        """
+        Block until a job has finished and hand over its final status.
+
+        Jobs that outlive their timeout are still caught while waiting. The
+        finished job is removed, so it cannot be polled afterwards.
+
+        Args:
+            poll (float): Seconds between checks for stuck jobs
+
+        Returns:
+            dict: As for ``status``, or None if the job is unknown
+        """
+        while True:
+            with self._lock:
+                self._expire()
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                if job['status'] not in ('queued', 'running'):
+                    del self._jobs[job_id]
+                    break
+                future = job['future']
+            # A requeued job moves to a new future, so look it up again
+            if future is not None:
+                wait_futures([future], timeout=poll)
+            else:
+                time.sleep(poll)
+        status = {'job_id': job_id, 'status': job['status']}
+        if job['status'] == 'done':
+            status['result'] = job['result']
+        else:
+            status['error'] = job['error']
+        return status
+
+    def status(self, job_id):
+        """
+        Get the status of a job.
+
+        Returns:
+            dict: 'job_id' and 'status', plus 'result' or 'error' once the
+            job has finished, or None if the job is unknown or expired
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            status = {'job_id': job_id, 'status': job['status']}
+            if job['status'] == 'done':
+                status['result'] = job['result']
+            elif job['status'] == 'failed':
+                status['error'] = job['error']
+            return status
@@ -0,0 +1,197 @@
+"""
+Live Braille recognition from a stream of camera frames.
+
+Each WebSocket connection gets a LiveSession. The frame is split into a
+grid of regions, and while the camera holds still only the regions that
+changed since they were last decoded are thresholded again; the other
+regions keep their dots. When the camera moves, every region is decoded. The
+cell lattice fitted on one frame seeds the fit on the next, so the dot
+spacing is not re-estimated and the cell grid does not jump between
+frames. A full fit is done again only when the seeded lattice no longer
+matches the dots, e.g. after the camera moved to another page.
+
+An open connection holds a web server thread for as long as it lasts, so
+at most LIVE_MAX_SESSIONS connections are served at once and a connection
+that sends nothing for LIVE_IDLE_TIMEOUT seconds is closed.
+"""
+
+import os
+import threading
+import time
+import numpy as np
+import cv2
+from utils.braille_converter import braille_to_text
+from utils.braille_image_processor import (
+    find_dots_in_core, fit_page_lattice, cells_from_dots, grid_to_braille,
+    get_tile_executor, tile_cores
+)
+from utils.metrics import observe
+
+# Frames are downscaled on the client; larger ones are shrunk to this
+LIVE_MAX_DIMENSION = int(os.environ.get("LIVE_MAX_DIMENSION", 960))
+LIVE_MAX_FRAME_BYTES = int(os.environ.get("LIVE_MAX_FRAME_BYTES", 2 * 1024 * 1024))
+# Regions per side that are checked for changes
+LIVE_REGION_GRID = int(os.environ.get("LIVE_REGION_GRID", 4))
+# Mean grey-level change that makes a region be decoded again
+LIVE_CHANGE_THRESHOLD = float(os.environ.get("LIVE_CHANGE_THRESHOLD", 4.0))
+# Camera movement, in pixels, past which every region is decoded again:
+# regions keeping dots from before the move would no longer line up
+LIVE_MOTION_PIXELS = float(os.environ.get("LIVE_MOTION_PIXELS", 0.5))
+# Share of dot lines a seeded lattice must fit before it is refitted
+LIVE_MIN_LATTICE_FIT = float(os.environ.get("LIVE_MIN_LATTICE_FIT", 0.8))
+# Connections served at once; keep well below the gunicorn thread count
+LIVE_MAX_SESSIONS = int(os.environ.get("LIVE_MAX_SESSIONS", 2))
+# Seconds without a message after which a connection is closed
+LIVE_IDLE_TIMEOUT = float(os.environ.get("LIVE_IDLE_TIMEOUT", 30))
+
+_session_slots = threading.BoundedSemaphore(LIVE_MAX_SESSIONS)
+
+def open_session():
+    """
+    Start a live session if one of the LIVE_MAX_SESSIONS slots is free.
+
+    Returns:
+        LiveSession: The new session, or None if all slots are taken.
+        Pass a returned session to close_session when the connection ends.
+    """
+    if not _session_slots.acquire(blocking=False):
+        return None
+    return LiveSession()
+
+def close_session(session):
+    """Free the slot held by a session from open_session."""
+    _session_slots.release()
+
+def decode_frame(data):
+    """
+    Decode an encoded camera frame (JPEG, PNG or WebP) to grayscale.
+
+    Args:
+        data (bytes): The encoded frame
+
+    Returns:
+        numpy.ndarray: Grayscale frame no larger than LIVE_MAX_DIMENSION
+    """
+    if len(data) > LIVE_MAX_FRAME_BYTES:
+        raise ValueError(f"Frame larger than {LIVE_MAX_FRAME_BYTES} bytes")
+    gray = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_GRAYSCALE) if data else None
+    if gray is None:
+        raise ValueError("Could not decode frame")
+    height, width = gray.shape
+    if max(height, width) > LIVE_MAX_DIMENSION:
+        scale = LIVE_MAX_DIMENSION / max(height, width)
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return gray
+
+class LiveSession:
+    """Recognition state carried from one frame of a connection to the next."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Forget the previous frames, e.g. when the client turns to a new page."""
+        # Each region's pixels and dots as of its last decode
+        self.reference = None
+        self.cores = []
+        self.region_dots = []
+        self.lattice = None
+        self.braille = ""
+        self.text = ""
+        self.stable_frames = 0
+        self.frames = 0
+
+    def _changed_regions(self, gray):
+        height, width = gray.shape
+        if self.reference is None or self.reference.shape != gray.shape:
+            size = -(-max(height, width) // LIVE_REGION_GRID)
+            self.cores = tile_cores(width, height, size)
+            self.region_dots = [[] for _ in self.cores]
+            self.reference = gray.copy()
+            return list(range(len(self.cores)))
+
+        # Global shift from phase correlation, at half size to keep it cheap
+        halves = [
+            cv2.resize(image, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA).astype(np.float32)
+            for image in (self.reference, gray)
+        ]
+        (dx, dy), _ = cv2.phaseCorrelate(*halves)
+        if 2 * np.hypot(dx, dy) > LIVE_MOTION_PIXELS:
+            self.reference = gray.copy()
+            return list(range(len(self.cores)))
+
+        difference = cv2.absdiff(gray, self.reference)
+        changed = []
+        for index, (x0, y0, x1, y1) in enumerate(self.cores):
+            if cv2.mean(difference[y0:y1, x0:x1])[0] > LIVE_CHANGE_THRESHOLD:
+                changed.append(index)
+        return changed
+
+    def _fit_lattice(self, points):
+        if self.lattice is not None:
+            lattice, fit = fit_page_lattice(points, seed=self.lattice)
+            if fit >= LIVE_MIN_LATTICE_FIT:
+                return lattice, True
+        lattice, _ = fit_page_lattice(points)
+        return lattice, False
+
+    def process_frame(self, data):
+        """
+        Recognize one camera frame.
+
+        Args:
+            data (bytes): The encoded frame
+
+        Returns:
+            dict: braille, text, whether the transcript changed, how many
+            regions were decoded, whether the lattice was reused, and how
+            many frames in a row gave the same text
+        """
+        start = time.perf_counter()
+        gray = decode_frame(data)
+        self.frames += 1
+
+        changed = self._changed_regions(gray)
+        if changed:
+            # Regions are independent, so they run on the tile thread pool
+            cores = [self.cores[index] for index in changed]
+            results = get_tile_executor().map(lambda core: find_dots_in_core(gray, core), cores)
+            for index, dots in zip(changed, results):
+                self.region_dots[index] = dots
+                x0, y0, x1, y1 = self.cores[index]
+                self.reference[y0:y1, x0:x1] = gray[y0:y1, x0:x1]
+
+        lattice_reused = self.lattice is not None and not changed
+        updated = False
+        if changed:
+            points = np.array([dot for dots in self.region_dots for dot in dots], dtype=np.float64).reshape(-1, 2)
+            braille = ""
+            if len(points) >= 2:
+                try:
+                    self.lattice, lattice_reused = self._fit_lattice(points)
+                    braille = grid_to_braille(cells_from_dots(points, self.lattice))
+                except ValueError:
+                    self.lattice = None
+            else:
+                self.lattice = None
+
+            if braille != self.braille:
+                self.braille = braille
+                self.text = braille_to_text(braille) if braille else ""
+                self.stable_frames = 0
+                updated = True
+
+        self.stable_frames += 1
+        seconds = time.perf_counter() - start
+        observe("live_frame_seconds", seconds, decoded="yes" if changed else "no")
+        return {
+            'braille': self.braille,
+            'text': self.text,
+            'updated': updated,
+            'regions_decoded': len(changed),
+            'regions': len(self.cores),
+            'lattice_reused': lattice_reused,
+            'stable_frames': self.stable_frames,
+            'frame': self.frames,
+            'seconds': round(seconds, 4),
+        }
@@ -0,0 +1,243 @@
+"""
+Lightweight latency instrumentation.
+
+Timers feed Prometheus-style histograms and counters kept in memory per
+process. When METRICS_DIR is set (gunicorn_config.py and the Dockerfile
+set it by default), every process (gunicorn workers and the job and batch
+worker processes) writes its totals to ``METRICS_DIR/<pid>.json`` at most
+every METRICS_FLUSH_INTERVAL seconds, and job workers also after each job,
+and ``/metrics`` sums all the files so it reports the whole server, not
+just the worker that answered. Clear the directory when the server
+starts, since totals of exited processes are kept.
+
+With SERVER_TIMING enabled, the timings recorded while handling a request
+are also returned in its ``Server-Timing`` header.
+"""
+
+import os
+import json
+import time
+import atexit
+import logging
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+METRICS_DIR = os.environ.get("METRICS_DIR", "")
+METRICS_FLUSH_INTERVAL = float(os.environ.get("METRICS_FLUSH_INTERVAL", 5))
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "").lower() in ("1", "true", "yes")
+
+# Histogram bucket upper bounds in seconds; conversions take well under a
+# millisecond, OCR pages several seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+DESCRIPTIONS = {
+    "http_request_seconds": "Time to handle a request, by endpoint",
+    "http_requests_total": "Requests handled, by endpoint and status",
+    "ocr_seconds": "Time to OCR one image",
+    "ocr_stage_seconds": "Time spent in each OCR stage",
+    "braille_image_stage_seconds": "Time spent in each Braille image detection stage",
+    "braille_conversion_seconds": "Time to convert text to Braille",
+    "tts_seconds": "Time to return a text-to-speech audio URL",
+    "tts_synthesis_seconds": "Time one TTS engine took to synthesize audio",
+    "tts_requests_total": "Text-to-speech requests, by outcome",
+    "json_encode_seconds": "Time to encode JSON responses",
+    "live_frame_seconds": "Time to recognize one live camera frame, by whether any region was decoded",
+    "compression_seconds": "Time to compress response bodies, by content coding",
+}
+
+_lock = threading.Lock()
+# (name, labels) -> [bucket counts..., +Inf count, sum]
+_histograms = {}
+# (name, labels) -> value
+_counters = {}
+_last_flush = 0.0
+_request = threading.local()
+
+def _reset():
+    # A forked worker starts from zero so its file does not repeat the parent's totals
+    global _lock, _last_flush
+    _lock = threading.Lock()
+    _histograms.clear()
+    _counters.clear()
+    _last_flush = 0.0
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def observe(name, seconds, **labels):
+    """
+    Record one duration in a histogram.
+
+    Args:
+        name (str): Metric name, ending in _seconds
+        seconds (float): The duration
+        **labels: Label values, e.g. stage='deskew'
+    """
+    key = (name, _label_key(labels))
+    with _lock:
+        values = _histograms.get(key)
+        if values is None:
+            values = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                values[index] += 1
+                break
+        else:
+            values[len(BUCKETS)] += 1
+        values[-1] += seconds
+
+    entries = getattr(_request, "timings", None)
+    if entries is not None:
+        entry = "_".join([name.removesuffix("_seconds"), *map(str, labels.values())])
+        entries[entry] = entries.get(entry, 0.0) + seconds
+    _maybe_flush()
+
+def increment(name, amount=1, **labels):
+    """Add to a counter; the name should end in _total."""
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + amount
+    _maybe_flush()
+
+@contextmanager
+def timer(name, **labels):
+    """Time the body of a with block, see observe."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+def timed(name, **labels):
+    """Decorator that times every call of a function, see observe."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(name, time.perf_counter() - start, **labels)
+        return wrapper
+    return decorator
+
+def begin_request():
+    """Start collecting Server-Timing entries for the current thread."""
+    _request.timings = {}
+
+def end_request():
+    """
+    Stop collecting and format the Server-Timing header value.
+
+    Returns:
+        str: e.g. 'ocr_stage_deskew;dur=12.3, json_encode;dur=0.4', or ''
+    """
+    entries = getattr(_request, "timings", None) or {}
+    _request.timings = None
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in entries.items())
+
+def _snapshot():
+    with _lock:
+        return {
+            "histograms": [[name, labels, list(values)] for (name, labels), values in _histograms.items()],
+            "counters": [[name, labels, value] for (name, labels), value in _counters.items()],
+        }
+
+def flush():
+    """Write this process's totals to METRICS_DIR, if set."""
+    global _last_flush
+    _last_flush = time.monotonic()
+    if not METRICS_DIR:
+        return
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(_snapshot(), f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        logging.warning(f"Could not write metrics: {str(e)}")
+
+def _maybe_flush():
+    if METRICS_DIR and time.monotonic() - _last_flush >= METRICS_FLUSH_INTERVAL:
+        flush()
+
+atexit.register(flush)
+
+def collect():
+    """
+    Totals of this process plus, with METRICS_DIR, every other process.
+
+    Returns:
+        tuple: (histograms, counters) keyed by (name, labels)
+    """
+    snapshots = [_snapshot()]
+    if METRICS_DIR and os.path.isdir(METRICS_DIR):
+        own = f"{os.getpid()}.json"
+        for filename in os.listdir(METRICS_DIR):
+            if filename == own or not filename.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, filename)) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+
+    histograms, counters = {}, {}
+    for snapshot in snapshots:
+        for name, labels, values in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            total = histograms.setdefault(key, [0] * len(values))
+            for index, value in enumerate(values):
+                total[index] += value
+        for name, labels, value in snapshot["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+def render_prometheus():
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Returns:
+        str: The /metrics response body
+    """
+    histograms, counters = collect()
+    lines = []
+    seen = set()
+
+    def header(name, kind):
+        if name not in seen:
+            seen.add(name)
+            if name in DESCRIPTIONS:
+                lines.append(f"# HELP {name} {DESCRIPTIONS[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (name, labels), values in sorted(histograms.items()):
+        header(name, "histogram")
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, "+Inf"), values):
+            cumulative += count
+            lines.append(f"{name}_bucket{_format_labels(labels, [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {values[-1]}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+
+    for (name, labels), value in sorted(counters.items()):
+        header(name, "counter")
+        lines.append(f"{name}{_format_labels(labels)} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,205 @@
+"""
+OCR engine layer with warm, reusable Tesseract workers.
+
+When the optional ``tesserocr`` package is installed, each language gets a
+small pool of long-lived ``PyTessBaseAPI`` instances, so the traineddata is
+loaded once per worker instead of on every request. Without it, OCR falls
+back to ``pytesseract``, which starts a ``tesseract`` process per call.
+"""
+
+import os
+import queue
+import logging
+import threading
+import numpy as np
+import pytesseract
+from PIL import Image
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# 'auto' uses tesserocr when it is installed, 'pytesseract' forces the
+# subprocess path
+OCR_ENGINE = os.environ.get("OCR_ENGINE", "auto")
+OCR_POOL_SIZE = int(os.environ.get("OCR_POOL_SIZE", 2))
+# Seconds to wait for a free engine before giving up
+OCR_ACQUIRE_TIMEOUT = float(os.environ.get("OCR_ACQUIRE_TIMEOUT", 30))
+
+class TesseractPool:
+    """
+    A bounded pool of warm Tesseract engines for one language.
+
+    Engines are created on demand up to ``size`` and checked before reuse;
+    an engine that fails a health check or raises is discarded and
+    replaced on the next checkout.
+
+    Args:
+        lang (str): Tesseract language code, e.g. 'eng' or 'hin'
+        size (int): Maximum number of engines
+    """
+
+    def __init__(self, lang, size=OCR_POOL_SIZE):
+        self.lang = lang
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _create(self):
+        return tesserocr.PyTessBaseAPI(lang=self.lang)
+
+    def is_healthy(self, api):
+        try:
+            return api.GetInitLanguagesAsString() == self.lang
+        except Exception:
+            return False
+
+    def _discard(self, api):
+        try:
+            api.End()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+    def acquire(self, timeout=OCR_ACQUIRE_TIMEOUT):
+        while True:
+            try:
+                api = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_create = self._created < self.size
+                    if can_create:
+                        self._created += 1
+                if can_create:
+                    try:
+                        return self._create()
+                    except Exception:
+                        with self._lock:
+                            self._created -= 1
+                        raise
+                try:
+                    api = self._idle.get(timeout=timeout)
+                except queue.Empty:
+                    raise RuntimeError(f"No OCR engine for '{self.lang}' became free in {timeout:g}s")
+
+            if self.is_healthy(api):
+                return api
+            logging.warning(f"Discarding unhealthy OCR engine for '{self.lang}'")
+            self._discard(api)
+
+    def release(self, api, healthy=True):
+        if healthy:
+            self._idle.put(api)
+        else:
+            self._discard(api)
+
+    def recognize(self, image, timeout=0):
+        """
+        Run OCR on a PIL image with a pooled engine.
+
+        Args:
+            image: PIL image
+            timeout: Seconds before recognition is stopped (0 for no limit)
+
+        Returns:
+            str: The recognized text
+        """
+        api = self.acquire()
+        healthy = False
+        try:
+            api.SetImage(image)
+            if not api.Recognize(int(timeout * 1000)):
+                raise RuntimeError("Tesseract recognition failed or timed out")
+            text = api.GetUTF8Text()
+            healthy = True
+            return text
+        finally:
+            if healthy:
+                api.Clear()
+            self.release(api, healthy)
+
+    def warm_up(self):
+        """Create engines until the pool is full."""
+        engines = [self.acquire() for _ in range(self.size)]
+        for api in engines:
+            self.release(api)
+
+    def health_check(self):
+        """
+        Check every idle engine, replacing any that are unhealthy.
+
+        Returns:
+            dict: 'lang', 'size', 'engines' and 'healthy' counts
+        """
+        checked = []
+        while True:
+            try:
+                checked.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        healthy = 0
+        for api in checked:
+            if self.is_healthy(api):
+                healthy += 1
+                self._idle.put(api)
+            else:
+                self._discard(api)
+        with self._lock:
+            engines = self._created
+        return {'lang': self.lang, 'size': self.size, 'engines': engines, 'healthy': healthy}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def use_pool():
+    if OCR_ENGINE == "pytesseract":
+        return False
+    return tesserocr is not None
+
+def get_pool(lang):
+    with _pools_lock:
+        if lang not in _pools:
+            _pools[lang] = TesseractPool(lang)
+        return _pools[lang]
+
+def recognize_text(image, lang='eng', timeout=0):
+    """
+    Run OCR with a warm pooled engine, or pytesseract as a fallback.
+
+    Args:
+        image: PIL image or NumPy array
+        lang: Language code ('eng' for English, 'hin' for Hindi)
+        timeout: Seconds before OCR is stopped (0 for no limit)
+
+    Returns:
+        str: The raw recognized text
+    """
+    if not use_pool():
+        return pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    return get_pool(lang).recognize(image, timeout=timeout)
+
+def warm_up(languages=('eng', 'hin')):
+    """Load the engines for the given languages before traffic arrives."""
+    if not use_pool():
+        return
+    for lang in languages:
+        get_pool(lang).warm_up()
+
+def engine_status():
+    """
+    Report the active OCR engine and the health of each language pool.
+
+    Returns:
+        dict: 'engine' and, for the pooled engine, 'pools'
+    """
+    if not use_pool():
+        return {'engine': 'pytesseract'}
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {'engine': 'tesserocr', 'pools': [pool.health_check() for pool in pools]}
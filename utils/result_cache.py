@@ -0,0 +1,170 @@
+"""
+Result cache for OCR and Braille image recognition.
+
+Results are keyed by a SHA-256 of the image bytes plus the language,
+mapping format and pipeline version, so a re-uploaded image skips the
+whole pipeline. A bounded in-memory LRU sits in front of an optional
+SQLite file in RESULT_CACHE_DIR, which every gunicorn and job worker on
+the host shares.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# In-memory tier, in bytes of JSON per process
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# On-disk tier; leave RESULT_CACHE_DIR empty to keep the cache in memory only
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "")
+RESULT_CACHE_DISK_MAX_BYTES = int(os.environ.get("RESULT_CACHE_DISK_MAX_BYTES", 512 * 1024 * 1024))
+
+class ResultCache:
+    """
+    A two-tier cache of JSON-serializable results.
+
+    Args:
+        max_bytes (int): Size limit of the in-memory tier
+        cache_dir (str): Directory for the SQLite tier, or '' to disable it
+        disk_max_bytes (int): Size limit of the SQLite tier
+    """
+
+    def __init__(self, max_bytes=RESULT_CACHE_MAX_BYTES, cache_dir=RESULT_CACHE_DIR,
+                 disk_max_bytes=RESULT_CACHE_DISK_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.path = os.path.join(cache_dir, "results.sqlite3") if cache_dir else None
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if self.path:
+            os.makedirs(cache_dir, exist_ok=True)
+            try:
+                with self._connect() as db:
+                    db.execute("PRAGMA journal_mode=WAL")
+                    db.execute(
+                        "CREATE TABLE IF NOT EXISTS results ("
+                        "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                        "size INTEGER NOT NULL, accessed REAL NOT NULL)"
+                    )
+            except sqlite3.Error as e:
+                logging.warning(f"Result cache disk tier disabled: {str(e)}")
+                self.path = None
+
+    @staticmethod
+    def key(image_bytes, *parts):
+        """
+        Build a cache key from the image bytes and the parameters that
+        change the result (language, mapping format, pipeline version).
+        """
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        return ":".join([digest, *map(str, parts)])
+
+    def _connect(self):
+        # A short-lived connection per call is safe across threads and forks
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _remember(self, key, value, size):
+        # Caller holds the lock
+        if key in self._entries:
+            self._size -= self._entries.pop(key)[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, size)
+        self._size += size
+        while self._size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._size -= evicted
+            self._stats["evictions"] += 1
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return json.loads(entry[0])
+
+        row = None
+        if self.path:
+            try:
+                with self._connect() as db:
+                    row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+            except sqlite3.Error as e:
+                logging.warning(f"Result cache read failed: {str(e)}")
+
+        with self._lock:
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, row[0], len(row[0]))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        """Store a result in memory and, if enabled, on disk."""
+        data = json.dumps(value, ensure_ascii=False)
+        size = len(data)
+        with self._lock:
+            self._remember(key, data, size)
+
+        if not self.path:
+            return
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                    (key, data, size, time.time())
+                )
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                if total > self.disk_max_bytes:
+                    # Drop least recently used rows until back under the limit
+                    excess = total - self.disk_max_bytes
+                    stale = []
+                    for row_key, row_size in db.execute("SELECT key, size FROM results ORDER BY accessed"):
+                        if excess <= 0:
+                            break
+                        stale.append((row_key,))
+                        excess -= row_size
+                    db.executemany("DELETE FROM results WHERE key = ?", stale)
+        except sqlite3.Error as e:
+            logging.warning(f"Result cache write failed: {str(e)}")
+
+    def stats(self):
+        """
+        Hit and miss counts for this process.
+
+        Returns:
+            dict: Counters, 'hit_ratio', and the size of each tier
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        stats["disk_enabled"] = self.path is not None
+        if self.path:
+            try:
+                with self._connect() as db:
+                    stats["disk_entries"], stats["disk_bytes"] = db.execute(
+                        "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logging.warning(f"Result cache stats failed: {str(e)}")
+        return stats
+
+result_cache = ResultCache()
@@ -1,37 +1,379 @@
 # utils/speech_processor.py
 
 import os
+import re
 import uuid
+import time
+import shutil
+import hashlib
 import asyncio
-from edge_tts import Communicate
+import threading
+import subprocess
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import increment, timed, timer
 
 # Directory to save audio files
 AUDIO_DIR = "static/audio"
 os.makedirs(AUDIO_DIR, exist_ok=True)
 
+# Audio cache limits; files are named by a hash of (text, voice) and
+# evicted least recently used first
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get("AUDIO_CACHE_MAX_BYTES", 200 * 1024 * 1024))
+AUDIO_CACHE_MAX_AGE = float(os.environ.get("AUDIO_CACHE_MAX_AGE", 7 * 24 * 3600))
+
 # Map language to voice
 VOICE_MAP = {
     "english": "en-US-JennyNeural",
     "hindi": "hi-IN-SwaraNeural"
 }
 
+# Map language to the local espeak-ng voice
+LOCAL_VOICE_MAP = {
+    "english": "en-us",
+    "hindi": "hi"
+}
+
+# Engines to try in order, and how long each engine but the last may take
+# before the next one is used instead: a fixed budget plus time per
+# character, since synthesis time grows with the text
+TTS_ENGINES = os.environ.get("TTS_ENGINES", "edge-tts,espeak-ng").split(",")
+TTS_LATENCY_BUDGET = float(os.environ.get("TTS_LATENCY_BUDGET", 3.0))
+TTS_LATENCY_PER_CHAR = float(os.environ.get("TTS_LATENCY_PER_CHAR", 0.01))
+
+# Streaming: longest chunk sent to an engine, and how many chunks are
+# synthesized ahead of the one being played
+TTS_CHUNK_CHARS = int(os.environ.get("TTS_CHUNK_CHARS", 400))
+TTS_STREAM_PREFETCH = int(os.environ.get("TTS_STREAM_PREFETCH", 2))
+
+# Most edge-tts requests in flight at once per process; the rest wait
+# their turn on the shared event loop
+TTS_MAX_CONCURRENCY = int(os.environ.get("TTS_MAX_CONCURRENCY", 8))
+
+# Sentence ends, including the Devanagari danda and double danda
+SENTENCE_END = re.compile(r'(?<=[.!?।॥])\s+')
+
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+# One long-lived event loop thread per process runs every edge-tts call,
+# so concurrent requests overlap instead of each starting its own loop
+_loop = None
+_loop_lock = threading.Lock()
+_synthesis_slots = None
+
+def _reset_loop():
+    # The loop thread does not survive a fork; children start their own
+    global _loop, _loop_lock, _synthesis_slots
+    _loop = None
+    _loop_lock = threading.Lock()
+    _synthesis_slots = None
+
+os.register_at_fork(after_in_child=_reset_loop)
+
+def get_event_loop():
+    """The shared event loop, started in a daemon thread on first use."""
+    global _loop, _synthesis_slots
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="tts-event-loop", daemon=True).start()
+            _synthesis_slots = asyncio.Semaphore(TTS_MAX_CONCURRENCY)
+            _loop = loop
+        return _loop
+
+def run_async(coro, timeout=None):
+    """
+    Run a coroutine on the shared event loop and wait for its result.
+    
+    Args:
+        coro: The coroutine to run
+        timeout (float): Seconds before it is cancelled (None for no limit)
+        
+    Raises:
+        asyncio.TimeoutError: If the coroutine runs past ``timeout``
+    """
+    loop = get_event_loop()
+    return asyncio.run_coroutine_threadsafe(asyncio.wait_for(coro, timeout), loop).result()
+
 async def generate_audio(text, voice, filename):
+    # edge-tts pulls in aiohttp; import it on first use to keep startup fast
+    from edge_tts import Communicate
     communicate = Communicate(text, voice)
     await communicate.save(filename)
 
+async def generate_audio_limited(text, voice, filename):
+    # Waits for one of TTS_MAX_CONCURRENCY slots before calling edge-tts
+    async with _synthesis_slots:
+        await generate_audio(text, voice, filename)
+
+class TTSEngine:
+    """
+    Base class for speech synthesis backends.
+    
+    Subclasses set ``name`` and ``voices`` (language -> voice id) and
+    implement ``synthesize``.
+    """
+    name = None
+    voices = {}
+
+    def is_available(self):
+        return True
+
+    def voice_for(self, language):
+        return self.voices.get(language)
+
+    def synthesize(self, text, voice, filepath, timeout=None):
+        """
+        Write MP3 audio for ``text`` to ``filepath``.
+        
+        Raises:
+            TimeoutError: If synthesis takes longer than ``timeout`` seconds
+        """
+        raise NotImplementedError
+
+class EdgeTTSEngine(TTSEngine):
+    """Microsoft Edge online voices through edge-tts."""
+    name = "edge-tts"
+    voices = VOICE_MAP
+
+    def synthesize(self, text, voice, filepath, timeout=None):
+        # The latency budget includes waiting for a synthesis slot
+        run_async(generate_audio_limited(text, voice, filepath), timeout)
+
+class EspeakEngine(TTSEngine):
+    """Local espeak-ng voices, encoded to MP3 with ffmpeg; needs no network."""
+    name = "espeak-ng"
+    voices = LOCAL_VOICE_MAP
+
+    def is_available(self):
+        return shutil.which("espeak-ng") is not None and shutil.which("ffmpeg") is not None
+
+    def synthesize(self, text, voice, filepath, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        wav = subprocess.run(
+            ["espeak-ng", "-v", voice, "--stdin", "--stdout"],
+            input=text.encode("utf-8"), capture_output=True, check=True, timeout=timeout
+        ).stdout
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0.1)
+        subprocess.run(
+            # No ID3/Xing headers, so chunks can be concatenated when streaming
+            ["ffmpeg", "-y", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+             "-codec:a", "libmp3lame", "-q:a", "4", "-id3v2_version", "0",
+             "-write_xing", "0", "-f", "mp3", filepath],
+            input=wav, capture_output=True, check=True, timeout=remaining
+        )
+
+# Registered engines by name
+ENGINES = {engine.name: engine for engine in (EdgeTTSEngine(), EspeakEngine())}
+
+def get_engines(language):
+    """Engines from TTS_ENGINES that are installed and have a voice for the language."""
+    engines = []
+    for name in TTS_ENGINES:
+        engine = ENGINES.get(name.strip())
+        if engine and engine.is_available() and engine.voice_for(language):
+            engines.append(engine)
+    return engines
+
+def normalize_text(text):
+    # Same words read by the same voice should share one audio file
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+def audio_cache_key(text, voice):
+    return hashlib.sha256(f"{voice}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+def get_audio_cache_stats():
+    with _cache_lock:
+        return dict(_cache_stats)
+
+def evict_audio_cache(now=None):
+    """
+    Remove cached audio older than AUDIO_CACHE_MAX_AGE, then remove the least
+    recently used files until the cache fits in AUDIO_CACHE_MAX_BYTES.
+    """
+    now = now or time.time()
+    entries = []
+    for entry in os.scandir(AUDIO_DIR):
+        if entry.is_file() and entry.name.endswith(".mp3"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # Oldest access first (hits refresh the modification time)
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for mtime, size, path in entries:
+        if now - mtime <= AUDIO_CACHE_MAX_AGE and total <= AUDIO_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            evicted += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+
+    if evicted:
+        with _cache_lock:
+            _cache_stats["evictions"] += evicted
+
+def audio_filename(engine, text, language):
+    voice = engine.voice_for(language)
+    # Edge voices keep their plain name so existing cache entries stay valid
+    cache_voice = voice if engine.name == "edge-tts" else f"{engine.name}:{voice}"
+    # Content-addressed filename, so repeated text reuses its audio
+    return f"{audio_cache_key(text, cache_voice)}.mp3"
+
+@timed("tts_seconds")
 def text_to_speech(text, language='english'):
     try:
-        voice = VOICE_MAP.get(language.lower(), VOICE_MAP['english'])
+        language = language.lower()
+        if language not in VOICE_MAP:
+            language = 'english'
 
-        # Generate unique filename
-        filename = f"{uuid.uuid4().hex}.mp3"
+        engines = get_engines(language)
+        if not engines:
+            raise RuntimeError("No text-to-speech engine is available")
+
+        # Only the preferred engine's audio is served from the cache; audio
+        # from a fallback engine would otherwise replace it for good after
+        # one slow or failed request
+        filename = audio_filename(engines[0], text, language)
         filepath = os.path.join(AUDIO_DIR, filename)
+        if os.path.exists(filepath):
+            # Refresh the access time used for LRU eviction
+            os.utime(filepath)
+            with _cache_lock:
+                _cache_stats["hits"] += 1
+            increment("tts_requests_total", outcome="cache_hit")
+            return f"/static/audio/{filename}"
+
+        with _cache_lock:
+            _cache_stats["misses"] += 1
 
-        # Run the async function
-        asyncio.run(generate_audio(text, voice, filepath))
+        errors = []
+        for index, engine in enumerate(engines):
+            filename = audio_filename(engine, text, language)
+            filepath = os.path.join(AUDIO_DIR, filename)
 
-        # Return accessible URL path
-        return f"/static/audio/{filename}"
+            # Only the last engine may take as long as it needs
+            if index < len(engines) - 1:
+                timeout = TTS_LATENCY_BUDGET + TTS_LATENCY_PER_CHAR * len(text)
+            else:
+                timeout = None
+
+            # Write to a temporary name so a half-written file is never served
+            temp_path = os.path.join(AUDIO_DIR, f".{uuid.uuid4().hex}.tmp")
+            try:
+                with timer("tts_synthesis_seconds", engine=engine.name):
+                    engine.synthesize(text, engine.voice_for(language), temp_path, timeout=timeout)
+                os.replace(temp_path, filepath)
+            except Exception as e:
+                reason = "timed out" if isinstance(e, (asyncio.TimeoutError, subprocess.TimeoutExpired)) else str(e)
+                print(f"[TTS] {engine.name} failed: {reason}")
+                errors.append(f"{engine.name}: {reason}")
+                continue
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+            evict_audio_cache()
+            increment("tts_requests_total", outcome="synthesized")
+
+            # Return accessible URL path
+            return f"/static/audio/{filename}"
+
+        increment("tts_requests_total", outcome="failed")
+        raise RuntimeError("All text-to-speech engines failed: " + "; ".join(errors))
     except Exception as e:
         print(f"[TTS Error] {str(e)}")
         raise e
+
+def split_sentences(text, max_chars=TTS_CHUNK_CHARS):
+    """
+    Split text into sentence chunks for streaming synthesis.
+    
+    Sentences longer than ``max_chars`` are split again at word boundaries.
+    """
+    chunks = []
+    for sentence in SENTENCE_END.split(text.strip()):
+        while len(sentence) > max_chars:
+            cut = sentence.rfind(" ", 0, max_chars)
+            if cut <= 0:
+                cut = max_chars
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:].lstrip()
+        if sentence.strip():
+            chunks.append(sentence)
+    return chunks
+
+def sentence_audio(sentence, language='english'):
+    """
+    Synthesize one sentence and read its audio.
+    
+    The cached file may be evicted by another request between synthesis
+    and reading; it is then synthesized again.
+    
+    Returns:
+        bytes: MP3 audio data
+    """
+    for attempt in range(2):
+        audio_url = text_to_speech(sentence, language)
+        try:
+            with open(os.path.join(AUDIO_DIR, os.path.basename(audio_url)), "rb") as audio_file:
+                return audio_file.read()
+        except FileNotFoundError:
+            if attempt:
+                raise
+            print("[TTS] Audio was evicted before it was read, synthesizing again")
+
+def stream_speech(text, language='english', prefetch=TTS_STREAM_PREFETCH):
+    """
+    Synthesize text sentence by sentence and yield MP3 bytes in order.
+    
+    The next ``prefetch`` sentences are synthesized while the current one
+    is being sent, so playback can start after the first sentence. Each
+    sentence goes through ``text_to_speech``, so engine fallback and the
+    audio cache apply per sentence.
+    
+    Args:
+        text (str): The text to read aloud
+        language (str): A VOICE_MAP language
+        prefetch (int): Sentences synthesized ahead of playback
+        
+    Yields:
+        bytes: MP3 audio data
+        
+    Raises:
+        RuntimeError: If no sentence could be synthesized
+    """
+    sentences = iter(split_sentences(text))
+    produced = False
+    errors = []
+    with ThreadPoolExecutor(max_workers=max(prefetch, 1)) as pool:
+        pending = deque()
+        for sentence in sentences:
+            pending.append(pool.submit(sentence_audio, sentence, language))
+            if len(pending) >= max(prefetch, 1):
+                break
+
+        while pending:
+            future = pending.popleft()
+            sentence = next(sentences, None)
+            if sentence is not None:
+                pending.append(pool.submit(sentence_audio, sentence, language))
+
+            try:
+                data = future.result()
+            except Exception as e:
+                # Already logged by text_to_speech; keep the rest playing
+                errors.append(str(e))
+                continue
+
+            if data:
+                produced = True
+                yield data
+
+    if not produced:
+        raise RuntimeError("No audio could be produced" + (": " + errors[0] if errors else ""))
@@ -0,0 +1,141 @@
+"""
+Export the Braille translation tables for the browser.
+
+The tables are written as a JSON file and a JS module. The JS module sets
+``BRAILLE_TABLES`` for static/js/braille_engine.js, so the text page can
+convert as the user types without calling the API. File names carry a
+hash of the tables, so they can be cached forever and change whenever a
+table does.
+
+Run at build time:
+    python -m utils.table_export [output_dir]
+
+The app serves the files from TABLES_DIR when they exist, and renders
+them from the same tables otherwise.
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from utils.braille_converter import CHAR_TO_BRAILLE, NUMBER_SIGN, LETTER_SIGN
+from utils.hindi_braille_converter import HINDI_TO_BRAILLE, HINDI_CLUSTERS, HINDI_SEQUENCES
+
+TABLES_DIR = os.environ.get(
+    "TABLES_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static", "generated")
+)
+
+def tables_payload():
+    """
+    The tables and the rules the JS engine needs to match the Python one.
+
+    Returns:
+        dict: JSON-serializable tables
+    """
+    return {
+        'english': {
+            'table': CHAR_TO_BRAILLE,
+            'number_sign': NUMBER_SIGN,
+            # Inserted before a-j right after a digit, see braille_converter
+            'letter_sign': LETTER_SIGN,
+            'letter_sign_after_digit': 'abcdefghij',
+            'lowercase': True,
+        },
+        'hindi': {
+            'table': HINDI_TO_BRAILLE,
+            # Decomposed first, then the longest sequence wins, see translate_clusters
+            'decompositions': {chr(code): value or '' for code, value in HINDI_CLUSTERS.decompositions.items()},
+            'sequences': HINDI_SEQUENCES,
+            'lowercase': False,
+        },
+        # Kept as they are by both engines
+        'passthrough': '\n\r\t',
+    }
+
+def _serialize(payload):
+    # Sorted and compact, so the same tables always give the same bytes
+    return json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+TABLES_JSON = _serialize(tables_payload())
+TABLES_VERSION = hashlib.sha256(TABLES_JSON.encode('utf-8')).hexdigest()[:12]
+
+def render_tables_json():
+    """
+    Returns:
+        str: The versioned JSON document
+    """
+    return _serialize({'version': TABLES_VERSION, **tables_payload()})
+
+def render_tables_js():
+    """
+    Returns:
+        str: A script that defines ``BRAILLE_TABLES``, also loadable as a
+        CommonJS module
+    """
+    return (
+        "// Generated by utils/table_export.py from the Python translation tables; do not edit.\n"
+        "(function (root) {\n"
+        f"    var tables = {render_tables_json()};\n"
+        "    root.BRAILLE_TABLES = tables;\n"
+        "    if (typeof module !== 'undefined' && module.exports) module.exports = tables;\n"
+        "})(typeof self !== 'undefined' ? self : this);\n"
+    )
+
+def table_filename(extension):
+    """
+    Args:
+        extension (str): 'js' or 'json'
+
+    Returns:
+        str: The versioned file name
+    """
+    return f"braille_tables.{TABLES_VERSION}.{extension}"
+
+RENDERERS = {'js': render_tables_js, 'json': render_tables_json}
+
+def read_tables(extension):
+    """
+    The exported file from TABLES_DIR, or the same content rendered now
+    if it has not been built.
+
+    Args:
+        extension (str): 'js' or 'json'
+
+    Returns:
+        str: The file content
+    """
+    path = os.path.join(TABLES_DIR, table_filename(extension))
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+    return RENDERERS[extension]()
+
+def write_tables(output_dir=TABLES_DIR):
+    """
+    Write the versioned JS and JSON files, removing older versions.
+
+    Args:
+        output_dir (str): Directory to write to
+
+    Returns:
+        list: Paths written
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    current = {table_filename(extension) for extension in RENDERERS}
+    for name in os.listdir(output_dir):
+        if name.startswith("braille_tables.") and name not in current:
+            os.remove(os.path.join(output_dir, name))
+
+    paths = []
+    for extension, render in RENDERERS.items():
+        path = os.path.join(output_dir, table_filename(extension))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render())
+        paths.append(path)
+    return paths
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for path in write_tables(sys.argv[1] if len(sys.argv) > 1 else TABLES_DIR):
+        logging.info(f"Wrote {path}")
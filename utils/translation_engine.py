@@ -0,0 +1,213 @@
+"""
+Shared translation engine for the Braille converters.
+
+Character maps are compiled once at import time into ``str.translate``
+tables, so a conversion is a single linear pass done in C instead of a
+Python loop that rebuilds the result string character by character.
+
+Scripts whose symbols can span several code points (Devanagari conjuncts
+and nukta forms) add a sequence table: the text is first brought to
+decomposed form, then one regular expression scan replaces the longest
+sequence at each position, and the table handles everything else.
+"""
+
+import re
+import unicodedata
+from itertools import accumulate
+from collections import namedtuple
+
+
+def compile_table(mapping):
+    """
+    Compile a character-to-Braille mapping into a translation table.
+
+    Args:
+        mapping (dict): Single-character keys mapped to Braille strings
+            (values may be several cells long, e.g. digits)
+
+    Returns:
+        dict: A table suitable for ``str.translate``
+    """
+    return str.maketrans(mapping)
+
+
+def translate(text, table):
+    """
+    Translate text with a compiled table.
+
+    Characters that have no entry in the table are kept as they are,
+    matching the behaviour of the original per-character loops.
+
+    Args:
+        text (str): The text to convert
+        table (dict): A table returned by ``compile_table``
+
+    Returns:
+        str: The translated text
+    """
+    return text.translate(table)
+
+
+def translate_with_spans(text, table):
+    """
+    Translate text and record where each source character landed.
+    
+    Done in one pass over the text, so multi-cell symbols (digits,
+    brackets) keep correct offsets for every later character.
+    
+    Args:
+        text (str): The text to convert
+        table (dict): A table returned by ``compile_table``
+        
+    Returns:
+        tuple: (braille, offsets, lengths) where character ``i`` of the
+        text became ``braille[offsets[i]:offsets[i] + lengths[i]]``
+    """
+    pieces = list(map(table.get, map(ord, text), text))
+    lengths = list(map(len, pieces))
+    offsets = [0]
+    offsets.extend(accumulate(lengths[:-1]))
+    return "".join(pieces), offsets[:len(pieces)], lengths
+
+
+# A compiled table for scripts with multi-character symbols, see compile_clusters
+ClusterTable = namedtuple('ClusterTable', 'table decompositions decomposable pattern sequences')
+
+
+def compile_clusters(mapping, sequences, chars=(), dropped=()):
+    """
+    Compile a character map and its multi-character sequences.
+
+    Args:
+        mapping (dict): Single-character keys mapped to Braille strings
+        sequences (dict): Sequences of decomposed (NFD) characters mapped
+            to Braille strings
+        chars (iterable): Characters to bring to decomposed form when
+            they appear, e.g. a Unicode block
+        dropped (iterable): Characters to remove, e.g. joiners that only
+            affect rendering
+
+    Returns:
+        ClusterTable: The compiled tables
+    """
+    decompositions = {
+        ord(char): unicodedata.normalize('NFD', char)
+        for char in chars
+        if unicodedata.normalize('NFD', char) != char
+    }
+    decompositions.update((ord(char), None) for char in dropped)
+    # Most text needs no decomposition; finding that out with a search is
+    # much cheaper than a translate with a sparse table
+    decomposable = re.compile('[' + ''.join(map(re.escape, map(chr, decompositions))) + ']') if decompositions else None
+    # Longer sequences are tried first, so at each position the scan takes
+    # the longest one that matches
+    pattern = re.compile('|'.join(map(re.escape, sorted(sequences, key=len, reverse=True))))
+    return ClusterTable(compile_table(mapping), decompositions, decomposable, pattern, sequences)
+
+
+def _decompose(text, clusters):
+    if clusters.decomposable is not None and clusters.decomposable.search(text):
+        return text.translate(clusters.decompositions)
+    return text
+
+
+def translate_clusters(text, clusters):
+    """
+    Translate text whose symbols may be several characters long.
+
+    The text is brought to decomposed form, one scan replaces the longest
+    sequence at each position, and the character table does the rest.
+
+    Args:
+        text (str): The text to convert
+        clusters (ClusterTable): Tables returned by ``compile_clusters``
+
+    Returns:
+        str: The translated text
+    """
+    sequences = clusters.sequences
+    # Braille cells put in by the sequences have no entry in the table,
+    # so the final translate keeps them as they are
+    text = clusters.pattern.sub(lambda match: sequences[match.group()], _decompose(text, clusters))
+    return text.translate(clusters.table)
+
+
+def translate_clusters_with_spans(text, clusters):
+    """
+    Translate text like ``translate_clusters`` and record where each
+    source character landed.
+
+    Every character of a sequence gets the span of the whole sequence,
+    and a removed character gets an empty span.
+
+    Args:
+        text (str): The text to convert
+        clusters (ClusterTable): Tables returned by ``compile_clusters``
+
+    Returns:
+        tuple: (braille, offsets, lengths), see ``translate_with_spans``
+    """
+    table, decompositions, _, pattern, sequences = clusters
+    decomposed = _decompose(text, clusters)
+    # Index in the source text of each decomposed character
+    sources = None
+    if decomposed != text:
+        sources = [
+            index
+            for index, char in enumerate(text)
+            for _ in range(len(decompositions.get(ord(char), char) or ''))
+        ]
+
+    pieces = []
+    matches = []
+    position = 0
+    for match in pattern.finditer(decomposed):
+        start, end = match.span()
+        run = decomposed[position:start]
+        pieces.extend(map(table.get, map(ord, run), run))
+        matches.append((start, end))
+        pieces.append(sequences[match.group()])
+        pieces.extend([''] * (end - start - 1))
+        position = end
+    run = decomposed[position:]
+    pieces.extend(map(table.get, map(ord, run), run))
+
+    lengths = list(map(len, pieces))
+    offsets = [0]
+    offsets.extend(accumulate(lengths[:-1]))
+    del offsets[len(pieces):]
+    for start, end in matches:
+        offsets[start:end] = [offsets[start]] * (end - start)
+        lengths[start:end] = [lengths[start]] * (end - start)
+    braille = "".join(pieces)
+    if sources is None:
+        return braille, offsets, lengths
+
+    # Fold the spans of the decomposed characters back onto the source
+    source_offsets = [None] * len(text)
+    source_ends = [0] * len(text)
+    for index, offset, length in zip(sources, offsets, lengths):
+        if source_offsets[index] is None:
+            source_offsets[index] = offset
+        source_ends[index] = max(source_ends[index], offset + length)
+    source_lengths = [end - offset if offset is not None else 0 for offset, end in zip(source_offsets, source_ends)]
+    # A removed character inside a sequence (a joiner in a conjunct) takes
+    # the sequence's span, any other an empty span where it stood
+    following = [None] * len(text)
+    span = None
+    for index in range(len(text) - 1, -1, -1):
+        if source_offsets[index] is None:
+            following[index] = span
+        else:
+            span = (source_offsets[index], source_lengths[index])
+    end = 0
+    span = None
+    for index, offset in enumerate(source_offsets):
+        if offset is not None:
+            end = source_ends[index]
+            span = (offset, source_lengths[index])
+        elif span is not None and span == following[index]:
+            source_offsets[index], source_lengths[index] = span
+        else:
+            source_offsets[index] = end
+    return braille, source_offsets, source_lengths
@@ -0,0 +1,91 @@
+"""
+Warm-up before traffic arrives, used by gunicorn_config.py.
+
+``preload`` runs once in the gunicorn master after the app is loaded:
+it primes the translation tables and, optionally, imports the OpenCV,
+OCR and speech modules, so every forked worker shares them instead of
+paying for them on its first request. ``warm_up_worker`` runs in each
+worker after the fork, for state that must not be shared across a fork
+(Tesseract engines, OpenCV's thread pool).
+"""
+
+import os
+import time
+import logging
+from utils.braille_converter import braille_to_text
+from utils.conversion import convert_text
+
+# Load OpenCV/NumPy and run one tiny detection before traffic arrives
+WARM_UP_VISION = os.environ.get("WARM_UP_VISION", "1").lower() in ("1", "true", "yes")
+# Load Tesseract engines for these languages ('' to skip)
+WARM_UP_OCR = [lang.strip() for lang in os.environ.get("WARM_UP_OCR", "").split(",") if lang.strip()]
+# Import edge-tts and start the TTS event loop
+WARM_UP_SPEECH = os.environ.get("WARM_UP_SPEECH", "1").lower() in ("1", "true", "yes")
+
+def _timed(timings, name, func):
+    start = time.perf_counter()
+    func()
+    timings[name] = round(time.perf_counter() - start, 4)
+
+def _prime_tables():
+    # Every mapping format and both directions, for both languages
+    for mapping in ('legacy', 'spans', 'distinct'):
+        convert_text("Warm up 12ab, ready?", 'english', mapping)
+        convert_text("नमस्ते दुनिया, क़िला", 'hindi', mapping)
+        convert_text("Warm up the children, ready?", 'english', mapping, grade=2)
+    braille_to_text(convert_text("warm up 12ab", 'english', 'none')[0])
+
+def _import_vision():
+    import utils.braille_image_processor  # noqa: F401
+    import utils.image_processor  # noqa: F401
+    import utils.live_recognition  # noqa: F401
+
+def _import_speech():
+    import edge_tts  # noqa: F401
+
+def preload():
+    """
+    Prime shared state in the gunicorn master, before workers fork.
+
+    Returns:
+        dict: Seconds per step
+    """
+    timings = {}
+    _timed(timings, "tables", _prime_tables)
+    if WARM_UP_VISION or WARM_UP_OCR:
+        _timed(timings, "vision_imports", _import_vision)
+    if WARM_UP_SPEECH:
+        _timed(timings, "speech_imports", _import_speech)
+    logging.info(f"Preloaded in the master: {timings}")
+    return timings
+
+def _run_detection():
+    import numpy as np
+    import cv2
+    from utils.braille_image_processor import find_dots, dots_to_braille
+    page = np.full((60, 60), 255, dtype=np.uint8)
+    for x in (15, 25, 40):
+        cv2.circle(page, (x, 20), 3, 0, -1)
+    dots_to_braille(find_dots(page))
+
+def _start_speech_loop():
+    from utils.speech_processor import get_event_loop
+    get_event_loop()
+
+def warm_up_worker():
+    """
+    Warm up one worker process after the fork.
+
+    Returns:
+        dict: Seconds per step
+    """
+    timings = {}
+    if WARM_UP_VISION:
+        _timed(timings, "vision", _run_detection)
+    if WARM_UP_OCR:
+        from utils.ocr_engine import warm_up
+        _timed(timings, "ocr", lambda: warm_up(WARM_UP_OCR))
+    if WARM_UP_SPEECH:
+        _timed(timings, "speech_loop", _start_speech_loop)
+    logging.info(f"Worker {os.getpid()} warmed up: {timings}")
+    return timings